@@ -0,0 +1,169 @@
+"""Cache the campaigns and characters each user has rights to.
+
+Almost every view checks whether the current user may view or change some
+campaign or character. Rather than querying the database for each check, the
+IDs of the campaigns and characters a user owns or takes part in are gathered
+into an ``AccessMap`` and stored with Django's cache framework.
+
+A user's map is discarded whenever they gain or lose a campaign or character.
+The receivers in this module do so when a ``Campaign`` or ``Character`` is
+saved or deleted, including when its owner or campaign changes. Changes that
+bypass ``Model.save``, such as ``QuerySet.update``, are only seen once a map
+expires. See ``CACHE_TIMEOUT``.
+
+Maps must be stored in a cache shared by every process serving this
+application. Otherwise, a map discarded by one process lives on in the others,
+which keep granting rights that were taken away. Django's local-memory cache is
+private to each process, and must not be used when more than one process
+serves requests. See ``CACHES`` in ``main.settings``.
+
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from gurps_manager import models
+
+# How many seconds an access map may be cached for. This bounds how long a map
+# can be out of date if a change is not seen by the receivers in this module,
+# such as a change made with ``QuerySet.update``.
+CACHE_TIMEOUT = 300
+
+class AccessMap(object):
+    """The campaigns and characters that a single user has rights to.
+
+    ``owned_campaigns``, ``owned_characters`` and ``participating_campaigns``
+    are iterables of IDs. A user participates in the campaigns they own and in
+    the campaigns their characters belong to.
+
+    >>> access_map = AccessMap([1], [5], [1, 2])
+    >>> access_map.can_view_campaign(models.Campaign(id=2))
+    True
+    >>> access_map.owns_character(models.Character(id=6, campaign_id=1))
+    True
+    >>> access_map.owns_character(models.Character(id=7, campaign_id=2))
+    False
+
+    """
+    def __init__(
+            self,
+            owned_campaigns=(),
+            owned_characters=(),
+            participating_campaigns=()):
+        self.owned_campaigns = frozenset(owned_campaigns)
+        self.owned_characters = frozenset(owned_characters)
+        self.participating_campaigns = frozenset(participating_campaigns)
+
+    @classmethod
+    def build(cls, user):
+        """Query the database for ``user``'s ``AccessMap``.
+
+        Two queries are made.
+
+        """
+        owned_campaigns = list(models.Campaign.objects.filter( # pylint: disable=E1101
+            owner=user
+        ).values_list('id', flat=True))
+        characters = list(models.Character.objects.filter( # pylint: disable=E1101
+            owner=user
+        ).values_list('id', 'campaign'))
+        return cls(
+            owned_campaigns,
+            [character_id for character_id, _ in characters],
+            owned_campaigns + [campaign_id for _, campaign_id in characters],
+        )
+
+    def owns_character(self, character):
+        """Tell whether the user owns ``character``, directly or indirectly.
+
+        The user owns ``character`` indirectly if they own its campaign.
+
+        """
+        return character.id in self.owned_characters \
+            or character.campaign_id in self.owned_campaigns
+
+    def can_view_campaign(self, campaign):
+        """Tell whether the user participates in ``campaign``."""
+        return campaign.id in self.participating_campaigns
+
+    def can_view_character(self, character):
+        """Tell whether the user participates in ``character``'s campaign."""
+        return character.campaign_id in self.participating_campaigns
+
+def get_access_map(user):
+    """Return ``user``'s ``AccessMap``, building and caching it if needed.
+
+    >>> from gurps_manager import factories
+    >>> character = factories.CharacterFactory.create()
+    >>> access_map = get_access_map(character.owner)
+    >>> access_map.can_view_campaign(character.campaign)
+    True
+    >>> get_access_map(character.owner).owns_character(character)
+    True
+
+    """
+    key = _cache_key(user.pk)
+    access_map = cache.get(key)
+    if access_map is None:
+        access_map = AccessMap.build(user)
+        cache.set(key, access_map, CACHE_TIMEOUT)
+    return access_map
+
+def discard_access_maps(*user_ids):
+    """Discard the cached ``AccessMap`` of each user in ``user_ids``.
+
+    IDs which are ``None`` are ignored.
+
+    """
+    cache.delete_many([
+        _cache_key(user_id) for user_id in set(user_ids) if user_id is not None
+    ])
+
+def _cache_key(user_id):
+    """Return the cache key for the ``AccessMap`` of user ``user_id``.
+
+    >>> _cache_key(5)
+    'gurps-manager-access-map-5'
+
+    """
+    return 'gurps-manager-access-map-{}'.format(user_id)
+
+@receiver(post_init, sender=models.Campaign)
+@receiver(post_init, sender=models.Character)
+def _remember_previous_owner(sender, instance, **kwargs): # pylint: disable=W0613
+    """Record who owned ``instance`` when it was loaded or created.
+
+    The owner's ID is stored as ``instance._previous_owner_id``, for use by
+    ``_discard_owner_access_maps``. No query is made. If the owner was not
+    loaded, as with ``QuerySet.only``, ``None`` is stored.
+
+    """
+    # Reading a deferred ``owner_id`` would query the database.
+    instance._previous_owner_id = instance.__dict__.get('owner_id') # pylint: disable=W0212,C0301
+
+@receiver([post_save, post_delete], sender=models.Campaign)
+@receiver([post_save, post_delete], sender=models.Character)
+def _discard_owner_access_maps(sender, instance, **kwargs): # pylint: disable=W0613,C0301
+    """Discard the access maps of ``instance``'s current and previous owners.
+
+    Saving a character may change its campaign, so the owner's map is
+    discarded even if the owner did not change. The previous owner is the one
+    recorded by ``_remember_previous_owner``, and then the current owner once
+    ``instance`` is saved.
+
+    """
+    discard_access_maps(
+        instance.owner_id,
+        getattr(instance, '_previous_owner_id', None)
+    )
+    instance._previous_owner_id = instance.owner_id # pylint: disable=W0212
+
+@receiver([post_save, post_delete], sender=User)
+def _discard_user_access_map(sender, instance, **kwargs): # pylint: disable=W0613
+    """Discard the access map of ``instance``.
+
+    This ensures that a map cannot outlive its user, even if the user's ID is
+    later reused.
+
+    """
+    discard_access_maps(instance.pk)
@@ -5,12 +5,16 @@ fixtures. Rather than simply defining a static set of test data, factories can
 be used to generate disgustingly random data. (perfect for testing!)
 
 """
+from collections import OrderedDict
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
 from factory.django import DjangoModelFactory
 from factory.fuzzy import FuzzyAttribute
 from factory import Sequence, SubFactory
-from gurps_manager import models
+from gurps_manager import access, models
 import random
 
 # See ``user_username`` for details on why this charset was chosen.
@@ -829,6 +833,155 @@ def hitlocation_passive_defense():
     """
     return random.randrange(-1000, 10000)
 
+class BulkBuilder(object):
+    """Build many objects in memory, then insert them with ``bulk_create``.
+
+    A factory's ``create`` method saves one object at a time, along with a new
+    object for each ``SubFactory``. A ``BulkBuilder`` instead builds objects
+    with a factory's ``build_batch`` method and gives each a primary key, so
+    that objects built later can refer to it by ID. Pass related objects to
+    ``build`` explicitly, as a ``SubFactory`` left to its default builds an
+    object which is never inserted. ``insert`` then saves everything, a batch
+    of rows per query, parents before children.
+
+    >>> builder = BulkBuilder()
+    >>> owner = create_user()[0]
+    >>> campaign = builder.build(CampaignFactory, owner=owner)[0]
+    >>> characters = builder.build(
+    ...     CharacterFactory,
+    ...     3,
+    ...     campaign=campaign,
+    ...     owner=owner
+    ... )
+    >>> builder.insert()
+    >>> models.Character.objects.filter(campaign=campaign.id).count()
+    3
+
+    No signals are sent. ``build`` sets the ``key`` of skills, spells and
+    items, and ``insert`` rebuilds the cached stats of the characters it
+    inserts and discards the access maps of their owners. Do not let anything
+    else write to the database between calls to ``build`` and ``insert``, as
+    the primary keys given out could be taken.
+
+    """
+    def __init__(self, batch_size=None):
+        # If ``batch_size`` is ``None``, the database backend picks one.
+        self.batch_size = batch_size
+        self._objects = OrderedDict()
+        self._next_ids = {}
+
+    def build(self, factory, size=1, **kwargs):
+        """Build ``size`` objects with ``factory``, and return them."""
+        model = factory._meta.model # pylint: disable=W0212
+        next_id = self._next_ids.get(model)
+        if next_id is None:
+            next_id = (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        objects = factory.build_batch(size, **kwargs)
+        normalize_name = getattr(model, 'normalize_name', None)
+        for obj in objects:
+            obj.id = next_id
+            next_id += 1
+            if normalize_name is not None:
+                obj.key = normalize_name(obj.name)
+        self._next_ids[model] = next_id
+        self._objects.setdefault(model, []).extend(objects)
+        return objects
+
+    def add(self, objects):
+        """Add ``objects``, which were built some other way, to the insert.
+
+        Objects without a primary key are given one by the database.
+
+        """
+        for obj in objects:
+            self._objects.setdefault(type(obj), []).append(obj)
+
+    def insert(self):
+        """Insert every object built or added, and forget about them."""
+        for model, objects in self._objects.items():
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+        # Primary keys were given out by this builder, not by the database, so
+        # sequences such as PostgreSQL's must be moved past them.
+        cursor = connection.cursor()
+        for sql in connection.ops.sequence_reset_sql(
+                no_style(),
+                list(self._objects)):
+            cursor.execute(sql)
+
+        characters = self._objects.get(models.Character, [])
+        if characters:
+            ids = [character.id for character in characters]
+            models.Character.rebuild_cached_stats(
+                models.Character.objects.filter( # pylint: disable=E1101
+                    pk__gte=min(ids),
+                    pk__lte=max(ids)
+                )
+            )
+            access.discard_access_maps(
+                *set(character.owner_id for character in characters)
+            )
+        self._objects = OrderedDict()
+        self._next_ids = {}
+
+def build_campaigns(builder, owner, campaigns, characters, rows):
+    """Build ``campaigns`` campaigns owned by ``owner``, with ``builder``.
+
+    Each campaign has a skillset of ``rows`` skills, ``rows`` spells, ``rows``
+    items and ``characters`` characters owned by ``owner``. Each character has
+    every skill, spell and item in its campaign, five traits and five hit
+    locations. Return the campaigns and the characters. Neither are saved until
+    ``builder.insert`` is called.
+
+    >>> builder = BulkBuilder()
+    >>> _, characters = build_campaigns(builder, create_user()[0], 1, 2, 3)
+    >>> builder.insert()
+    >>> models.CharacterSkill.objects.filter(
+    ...     character=characters[1].id
+    ... ).count()
+    3
+    >>> models.Character.objects.get(
+    ...     pk=characters[1].id
+    ... ).cached_remaining_points is None
+    False
+
+    """
+    built_campaigns = builder.build(CampaignFactory, campaigns, owner=owner)
+    built_characters = []
+    for campaign in built_campaigns:
+        skillset = builder.build(SkillSetFactory)[0]
+        builder.add([models.Campaign.skillsets.through(
+            campaign_id=campaign.id,
+            skillset_id=skillset.id
+        )])
+        skills = builder.build(SkillFactory, rows, skillset=skillset)
+        spells = builder.build(SpellFactory, rows, campaign=campaign)
+        items = builder.build(ItemFactory, rows, campaign=campaign)
+        for character in builder.build(
+                CharacterFactory,
+                characters,
+                campaign=campaign,
+                owner=owner):
+            for skill, spell, item in zip(skills, spells, items):
+                builder.build(
+                    CharacterSkillFactory,
+                    character=character,
+                    skill=skill
+                )
+                builder.build(
+                    CharacterSpellFactory,
+                    character=character,
+                    spell=spell
+                )
+                builder.build(
+                    PossessionFactory,
+                    character=character,
+                    item=item
+                )
+            builder.build(TraitFactory, 5, character=character)
+            builder.build(HitLocationFactory, 5, character=character)
+            built_characters.append(character)
+    return built_campaigns, built_characters
+
 #-------------------------------------------------------------------------------
 
 def _random_int(lower, upper):
@@ -4,10 +4,29 @@ Unless otherwise noted, all forms defined herein can be used to either create or
 update an object.
 
 """
-from django.forms import CharField, Form, ModelChoiceField, ModelForm, widgets
-from django.forms.models import inlineformset_factory
+from collections import OrderedDict
+from django.core.exceptions import ValidationError
+from django.core.urlresolvers import reverse
+from django.core.validators import EMPTY_VALUES
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.forms import (
+    CharField,
+    Form,
+    ModelChoiceField,
+    ModelForm,
+    widgets,
+)
+from django.forms.models import (
+    BaseInlineFormSet,
+    inlineformset_factory,
+)
+from django.utils.encoding import force_text
 from gurps_manager import models
 
+# The label of the empty choice of a select widget, as used by Django.
+EMPTY_LABEL = '---------'
+
 # pylint: disable=R0903
 # "Too few public methods (0/2)"
 # It is both common and OK for a form to have no methods.
@@ -44,6 +63,412 @@ class CharacterForm(ModelForm):
         # display them all. If we want to display only some fields, use `fields`
         # or `exclude`.
 
+class ChoiceCache(object):
+    """The choices of a model choice field, shared by every form in a formset.
+
+    A formset makes a copy of each field for each of its forms. Normally, each
+    copy queries the database to validate submitted data. A
+    ``SharedModelChoiceField`` instead reads its choices from a
+    ``ChoiceCache``, which is shared by every copy.
+
+    The whole queryset can be fetched by calling ``objects``. If only a few
+    choices are needed, as when an ``AutocompleteSelect`` renders selected
+    choices, call ``prime`` with the values that will be rendered or
+    validated, and they are fetched in one query.
+
+    A ``ChoiceCache`` is never refreshed, so it should live no longer than a
+    request. The form factories in this module create one per form class.
+
+    """
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self._objects = None
+        self._primed = {}
+
+    def objects(self):
+        """Return an ``OrderedDict`` mapping primary keys to model objects.
+
+        Primary keys are strings, as submitted by browsers.
+
+        """
+        if self._objects is None:
+            self._objects = OrderedDict(
+                (force_text(obj.pk), obj) for obj in self.queryset
+            )
+        return self._objects
+
+    def get(self, value):
+        """Return the object whose primary key is ``value``.
+
+        Raise a ``KeyError`` if ``value`` is not one of the choices. If the
+        queryset has not been evaluated, and ``value`` has not been primed, it
+        is fetched on its own.
+
+        """
+        value = force_text(value)
+        if self._objects is not None:
+            return self._objects[value]
+        if value not in self._primed:
+            self.prime([value])
+        if self._primed[value] is None:
+            raise KeyError(value)
+        return self._primed[value]
+
+    def prime(self, values):
+        """Fetch the objects whose primary keys are in ``values``.
+
+        Empty and malformed values are ignored, and values already fetched are
+        not fetched again. At most one query is made.
+
+        """
+        if self._objects is not None:
+            return
+        pk_field = self.queryset.model._meta.pk
+        pks = {}
+        for value in values:
+            if value in EMPTY_VALUES or force_text(value) in self._primed:
+                continue
+            try:
+                pks[force_text(value)] = pk_field.to_python(value)
+            except ValidationError:
+                self._primed[force_text(value)] = None
+        if not pks:
+            return
+        for value in pks:
+            self._primed[value] = None
+        for obj in self.queryset.filter(pk__in=set(pks.values())):
+            self._primed[force_text(obj.pk)] = obj
+
+class AutocompleteSelect(widgets.Select):
+    """A ``Select`` widget which only lists its selected choice.
+
+    Other choices are fetched while the user types, from the JSON view at
+    ``url``. See ``gurps_manager/js/autocomplete.js``. Labels are read from a
+    ``ChoiceCache``, so the widget should belong to a
+    ``SharedModelChoiceField``. The size of the rendered widget does not depend
+    on how many choices there are.
+
+    """
+    def __init__(self, url, attrs=None):
+        attrs = dict(attrs or {})
+        attrs['data-autocomplete-url'] = url
+        super().__init__(attrs)
+        self.shared_choices = None
+
+    class Media(object):
+        """Static files needed by this widget."""
+        js = ('gurps_manager/js/autocomplete.js',)
+
+    def render_options(self, choices, selected_choices):
+        """Render an empty choice, the selected choices and ``choices``.
+
+        ``choices`` are the extra choices passed to ``render``, as for
+        ``Select``. ``self.choices`` is never iterated, as that would fetch
+        every choice.
+
+        """
+        selected_choices = set(force_text(value) for value in selected_choices)
+        rendered = {''}
+        output = [self.render_option(selected_choices, '', EMPTY_LABEL)]
+        for value in sorted(selected_choices - rendered):
+            try:
+                obj = self.shared_choices.get(value)
+            except KeyError:
+                continue
+            rendered.add(value)
+            output.append(self.render_option(selected_choices, value, obj))
+        for value, label in choices:
+            if force_text(value) not in rendered:
+                output.append(
+                    self.render_option(selected_choices, value, label)
+                )
+        return '\n'.join(output)
+
+class SharedModelChoiceField(ModelChoiceField):
+    """A ``ModelChoiceField`` whose choices are read from a ``ChoiceCache``.
+
+    ``choice_cache`` is a ``ChoiceCache``. Other arguments are as for
+    ``ModelChoiceField``, except that ``queryset`` is taken from
+    ``choice_cache``. Each copy of this field shares ``choice_cache``, and no
+    copy queries the database more than once.
+
+    >>> from gurps_manager import factories
+    >>> item = factories.ItemFactory.create()
+    >>> field = SharedModelChoiceField(
+    ...     ChoiceCache(models.Item.objects.filter(id=item.id))
+    ... )
+    >>> field.clean(str(item.id)) == item
+    True
+
+    """
+    def __init__(self, choice_cache, *args, **kwargs):
+        self.shared_choices = choice_cache
+        super().__init__(choice_cache.queryset, *args, **kwargs)
+        self.widget.shared_choices = choice_cache
+
+    def to_python(self, value):
+        """Look up ``value`` in ``self.shared_choices``, without querying."""
+        if value in self.empty_values:
+            return None
+        try:
+            return self.shared_choices.get(value)
+        except KeyError:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice'
+            )
+
+class SharedChoiceFormMixin(object):
+    """Skip model validation of fields which are ``SharedModelChoiceField``s.
+
+    Model validation checks that each foreign key exists, making one query per
+    key. A value cleaned by a ``SharedModelChoiceField`` is known to exist, so
+    this check is skipped. Mix this class in before ``ModelForm``.
+
+    """
+    def _get_validation_exclusions(self):
+        """Add the names of shared choice fields to the exclusions."""
+        exclude = super()._get_validation_exclusions()
+        exclude.extend(
+            name for name, field in self.fields.items() # pylint: disable=E1101
+            if isinstance(field, SharedModelChoiceField)
+            and name not in exclude
+        )
+        return exclude
+
+class SharedChoiceInlineFormSet(BaseInlineFormSet):
+    """An inline formset whose forms share the choices of their ID fields.
+
+    ``BaseModelFormSet`` gives each form a hidden ``ModelChoiceField`` holding
+    the ID of the object being edited, and validating it makes one query per
+    form. This formset replaces that field with a ``SharedModelChoiceField``
+    whose choices are the objects the formset already fetched for editing.
+
+    """
+    def add_fields(self, form, index):
+        """Add fields to ``form``, then replace its ID field."""
+        if not hasattr(self, '_primed'):
+            self._primed = True # pylint: disable=W0201
+            self._prime_shared_choices()
+        super().add_fields(form, index)
+        name = self._pk_field.name # pylint: disable=E1101
+        field = form.fields.get(name)
+        if isinstance(field, ModelChoiceField):
+            if not hasattr(self, '_pk_choices'):
+                self._pk_choices = ChoiceCache(self.get_queryset()) # pylint: disable=W0201,C0301
+                # The formset has already fetched the objects being edited, so
+                # this makes no query. Otherwise, validating each form's ID
+                # would make one query per form.
+                self._pk_choices.objects()
+            form.fields[name] = SharedModelChoiceField(
+                self._pk_choices,
+                initial=field.initial,
+                required=False,
+                widget=field.widget,
+            )
+
+    def _prime_shared_choices(self):
+        """Prime the ``ChoiceCache`` of each of the form's shared fields.
+
+        The values primed are those submitted, if the formset is bound, or
+        those of the objects being edited otherwise.
+
+        """
+        for name, field in self.form.base_fields.items():
+            if not isinstance(field, SharedModelChoiceField):
+                continue
+            if self.is_bound:
+                values = [
+                    self.data.get('{}-{}'.format(self.add_prefix(i), name))
+                    for i in range(self.total_form_count())
+                ]
+            else:
+                attname = self.model._meta.get_field(name).attname
+                values = [getattr(obj, attname) for obj in self.get_queryset()]
+            field.shared_choices.prime(values)
+
+class BulkInlineFormSet(SharedChoiceInlineFormSet):
+    """An inline formset which saves its objects in bulk.
+
+    ``BaseModelFormSet.save`` saves and deletes one object at a time, and each
+    object saved or deleted may refresh a character's cached stats. Instead,
+    ``save`` makes one query to delete every removed object, one ``UPDATE``
+    per batch of changed objects (see ``models.bulk_update``) and one query to
+    create every new object. Unchanged objects are not saved. All of this is
+    done in a single transaction.
+
+    ``pre_save`` and ``post_save`` are sent for each object saved, as
+    ``Model.save`` sends them. ``bulk_create`` does not set the primary keys of
+    new objects, so they are fetched again before ``post_save`` is sent: the
+    newest rows of the parent object are taken to be the ones just created.
+    This does not hold if another connection adds rows to the same parent
+    object while its formset is being saved, which SQLite's write lock
+    prevents. Cached stats are refreshed once, when saving is done. See
+    ``models.deferred_stat_refresh``.
+
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Set by ``save``, as ``BaseModelFormSet.save`` would set them.
+        self.deleted_objects = []
+        self.changed_objects = []
+        self.new_objects = []
+
+    def save(self, commit=True):
+        """Save every changed object in bulk, and return the objects saved.
+
+        Objects are saved one at a time if ``commit`` is false or the model
+        has many-to-many fields, as ``BaseInlineFormSet`` would save them.
+
+        """
+        if not commit or self.model._meta.many_to_many:
+            return super().save(commit)
+        with transaction.atomic(), models.deferred_stat_refresh():
+            self.deleted_objects = self._delete_objects()
+            self.changed_objects = self._update_objects()
+            self.new_objects = self._create_objects()
+        return [obj for obj, _ in self.changed_objects] + self.new_objects
+
+    def _delete_objects(self):
+        """Delete the objects of deleted initial forms. Return them."""
+        deleted = set(self.deleted_forms)
+        objs = [
+            form.instance for form in self.initial_forms if form in deleted
+        ]
+        if objs:
+            self.model._default_manager.filter(
+                pk__in=[obj.pk for obj in objs]
+            ).delete()
+        return objs
+
+    def _update_objects(self):
+        """Save the changed objects of initial forms.
+
+        Only changed fields are saved, along with fields which are not
+        editable, as ``pre_save`` receivers may set them. Return a list of
+        ``(object, changed field names)`` tuples.
+
+        """
+        deleted = set(self.deleted_forms)
+        changed = [
+            (form.instance, form.changed_data) for form in self.initial_forms
+            if form not in deleted and form.has_changed()
+        ]
+        groups = {}
+        for obj, changed_data in changed:
+            pre_save.send(sender=self.model, instance=obj, raw=False)
+            field_names = self._update_fields(changed_data)
+            groups.setdefault(field_names, []).append(obj)
+        for field_names, objs in groups.items():
+            models.bulk_update(objs, field_names)
+            for obj in objs:
+                post_save.send(
+                    sender=self.model,
+                    instance=obj,
+                    created=False,
+                    update_fields=frozenset(field_names),
+                    raw=False,
+                )
+        return changed
+
+    def _update_fields(self, changed_data):
+        """Return a tuple of the fields to save for a form.
+
+        ``changed_data`` is the form's list of changed field names.
+
+        """
+        return tuple(
+            field.name for field in self.model._meta.concrete_fields
+            if not field.primary_key
+            and (field.name in changed_data or not field.editable)
+        )
+
+    def _create_objects(self):
+        """Create the objects of changed extra forms, and return them."""
+        deleted = set(self.deleted_forms)
+        objs = []
+        for form in self.extra_forms:
+            if not form.has_changed() or form in deleted:
+                continue
+            obj = form.instance
+            setattr(obj, self.fk.get_attname(), self.instance.pk)
+            pre_save.send(sender=self.model, instance=obj, raw=False)
+            objs.append(obj)
+        if objs:
+            self.model._default_manager.bulk_create(objs)
+            self._fetch_primary_keys(objs)
+            for obj in objs:
+                post_save.send(
+                    sender=self.model,
+                    instance=obj,
+                    created=True,
+                    raw=False,
+                )
+        return objs
+
+    def _fetch_primary_keys(self, objs):
+        """Set the primary key of each object in ``objs``, just created.
+
+        The keys are those of the newest rows belonging to ``self.instance``,
+        in the order they were inserted.
+
+        """
+        manager = self.model._default_manager
+        if all(obj.pk is not None for obj in objs):
+            return
+        pks = list(manager.filter(**{self.fk.name: self.instance}).order_by(
+            '-pk'
+        ).values_list('pk', flat=True)[:len(objs)])
+        for obj, pk in zip(objs, reversed(pks)):
+            obj.pk = pk
+            obj._state.adding = False # pylint: disable=W0212
+            obj._state.db = manager.db # pylint: disable=W0212
+
+def skill_choices(character):
+    """Return a queryset of the skills which may be given to ``character``.
+
+    A skill may be given to ``character`` if that skill's skillset belongs to
+    ``character``'s campaign.
+
+    """
+    return models.Skill.objects.filter( # pylint: disable=E1101
+        skillset__campaign=character.campaign_id
+    )
+
+def spell_choices(character):
+    """Return a queryset of the spells which may be given to ``character``.
+
+    A spell may be given to ``character`` if that spell belongs to
+    ``character``'s campaign.
+
+    """
+    return models.Spell.objects.filter( # pylint: disable=E1101
+        campaign=character.campaign_id
+    )
+
+def item_choices(character):
+    """Return a queryset of the items which may be given to ``character``.
+
+    An item may be given to ``character`` if that item belongs to
+    ``character``'s campaign.
+
+    """
+    return models.Item.objects.filter( # pylint: disable=E1101
+        campaign=character.campaign_id
+    )
+
+def _autocomplete_field(queryset, url_name, character):
+    """Return a ``SharedModelChoiceField`` using an ``AutocompleteSelect``.
+
+    The field's choices are ``queryset``, and its widget fetches them from the
+    view named ``url_name`` for ``character``.
+
+    """
+    return SharedModelChoiceField(
+        ChoiceCache(queryset),
+        widget=AutocompleteSelect(reverse(url_name, args=[character.id]))
+    )
+
 def character_skill_form(character):
     """Generate a form class for ``CharacterSkill`` objects.
 
@@ -64,12 +489,12 @@ def character_skill_form(character):
     True
 
     """
-    class CharacterSkillForm(ModelForm):
+    class CharacterSkillForm(SharedChoiceFormMixin, ModelForm):
         """A form for creating or editing a ``CharacterSkill`` object."""
-        skill = ModelChoiceField(
-            queryset=models.Skill.objects.filter( # pylint: disable=E1101
-                skillset__in=character.campaign.skillsets.values_list('id', flat=True) # pylint: disable=C0301
-            )
+        skill = _autocomplete_field(
+            skill_choices(character),
+            'gurps-manager-character-id-skills-choices',
+            character
         )
 
         class Meta(object):
@@ -93,6 +518,7 @@ def character_skill_formset(character):
         models.Character,
         models.CharacterSkill,
         extra=5,
+        formset=BulkInlineFormSet,
         form=character_skill_form(character)
     )
 
@@ -116,12 +542,12 @@ def character_spell_form(character):
     True
 
     """
-    class CharacterSpellForm(ModelForm):
+    class CharacterSpellForm(SharedChoiceFormMixin, ModelForm):
         """A form for creating or editing a ``CharacterSpell`` object."""
-        spell = ModelChoiceField(
-            queryset=models.Spell.objects.filter( # pylint: disable=E1101
-                campaign=character.campaign
-            )
+        spell = _autocomplete_field(
+            spell_choices(character),
+            'gurps-manager-character-id-spells-choices',
+            character
         )
 
         class Meta(object):
@@ -141,6 +567,7 @@ def character_spell_formset(character):
         models.Character,
         models.CharacterSpell,
         extra=5,
+        formset=BulkInlineFormSet,
         form=character_spell_form(character)
     )
 
@@ -164,12 +591,12 @@ def possession_form(character):
     True
 
     """
-    class PossessionForm(ModelForm):
+    class PossessionForm(SharedChoiceFormMixin, ModelForm):
         """A form for creating or editing a ``Possession`` object."""
-        item = ModelChoiceField(
-            queryset=models.Item.objects.filter( # pylint: disable=E1101
-                campaign=character.campaign
-            )
+        item = _autocomplete_field(
+            item_choices(character),
+            'gurps-manager-character-id-possessions-choices',
+            character
         )
 
         class Meta(object):
@@ -189,6 +616,7 @@ def possession_formset(character):
         models.Character,
         models.Possession,
         extra=5,
+        formset=BulkInlineFormSet,
         form=possession_form(character)
     )
 
@@ -202,7 +630,8 @@ def trait_formset():
     return inlineformset_factory(
         models.Character,
         models.Trait,
-        extra=5
+        extra=5,
+        formset=BulkInlineFormSet
     )
 
 def hit_location_formset():
@@ -215,7 +644,8 @@ def hit_location_formset():
     return inlineformset_factory(
         models.Character,
         models.HitLocation,
-        extra=5
+        extra=5,
+        formset=BulkInlineFormSet
     )
 
 def campaign_spells_formset():
@@ -228,7 +658,8 @@ def campaign_spells_formset():
     return inlineformset_factory(
         models.Campaign,
         models.Spell,
-        extra=5
+        extra=5,
+        formset=BulkInlineFormSet
     )
 
 def campaign_items_formset():
@@ -241,5 +672,6 @@ def campaign_items_formset():
     return inlineformset_factory(
         models.Campaign,
         models.Item,
-        extra=5
+        extra=5,
+        formset=BulkInlineFormSet
     )
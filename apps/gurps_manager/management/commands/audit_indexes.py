@@ -0,0 +1,212 @@
+"""Create a command named ``audit_indexes``."""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.util import CursorWrapper
+from django.test.client import Client
+from gurps_manager import access, factories, urls
+from optparse import make_option
+from urllib.parse import urlencode
+import re
+
+# Every named URL in ``gurps_manager.urls`` is audited with an empty query
+# string. These URLs are also audited with, or instead with, other query
+# strings.
+QUERY_STRINGS = {
+    'gurps-manager-character-id-possessions-choices': ({'q': 'a'},),
+    'gurps-manager-character-id-skills': ({}, {'sort': 'score'}),
+    'gurps-manager-character-id-skills-choices': ({'q': 'a'},),
+    'gurps-manager-character-id-spells': ({}, {'sort': 'score'}),
+    'gurps-manager-character-id-spells-choices': ({'q': 'a'},),
+}
+
+# Matches a step of a query plan which reads every row of a table, such as
+# ``SCAN TABLE gurps_manager_item`` or ``SCAN gurps_manager_item``. Scans of an
+# index, a subquery or a constant row do not match. Depending on the version of
+# SQLite, the table may be named by its alias in the query, such as ``U0``.
+FULL_SCAN = re.compile(
+    r'^SCAN (?:TABLE )?(?!SUBQUERY\b|CONSTANT\b)(\w+)(?:\s+AS\s+\w+)?$'
+)
+
+# Tables which may be scanned, unless the ``GURPS_MANAGER_AUDIT_ALLOW`` setting
+# names others. The campaign and character forms list every user, skill set and
+# campaign as choices, so those tables are always scanned.
+DEFAULT_ALLOWED_SCANS = (
+    'auth_user',
+    'gurps_manager_campaign',
+    'gurps_manager_skillset',
+)
+
+class Command(BaseCommand):
+    """Defines how to register the ``audit_indexes`` command."""
+    help = (
+        'GET every named URL of the gurps_manager app, run EXPLAIN QUERY PLAN '
+        'on every query made, and report the queries which scan a whole '
+        'table. Sample data is created for the audit and then rolled back. '
+        'Only SQLite is supported.'
+    )
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--allow',
+            action='append',
+            dest='allow',
+            default=None,
+            help='a table which may be scanned, such as a small lookup '
+            'table, in addition to those returned by allowed_scans() (may be '
+            'given several times)'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        """Audit each view, and fail if any of them scans a table."""
+        if connection.vendor != 'sqlite':
+            raise CommandError('Only SQLite query plans can be audited.')
+        allow = set(allowed_scans())
+        allow.update(options['allow'] or ())
+        problems = []
+        user_ids = []
+        try:
+            with transaction.atomic():
+                sample = _sample_objects()
+                user_ids.append(sample[1]['character'].owner_id)
+                for url, queries in _capture_queries(sample):
+                    for sql, params in queries:
+                        tables = set(full_scans(sql, params))
+                        tables.difference_update(allow)
+                        if tables:
+                            problems.append(
+                                (url, sorted(tables), sql, params)
+                            )
+                raise _Rollback()
+        except _Rollback:
+            pass
+        finally:
+            # Access maps may have been cached for users who no longer exist.
+            access.discard_access_maps(*user_ids)
+
+        for url, tables, sql, params in problems:
+            self.stdout.write('{} scans {}:\n    {}\n    params: {}'.format(
+                url,
+                ', '.join(tables),
+                sql,
+                params
+            ))
+        if problems:
+            raise CommandError(
+                '{} queries scan a whole table.'.format(len(problems))
+            )
+        self.stdout.write('No query scans a whole table.')
+
+def allowed_scans():
+    """Return the tables which may be scanned without being reported."""
+    return getattr(
+        settings,
+        'GURPS_MANAGER_AUDIT_ALLOW',
+        DEFAULT_ALLOWED_SCANS
+    )
+
+def full_scans(sql, params=None):
+    """Yield the name of each table which query ``sql`` scans in full.
+
+    ``sql`` and ``params`` are as passed to ``cursor.execute``. Each name is as
+    it appears in the query plan. See ``FULL_SCAN``.
+
+    """
+    cursor = connection.cursor()
+    cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+    for row in cursor.fetchall():
+        match = FULL_SCAN.match(row[-1])
+        if match is not None:
+            yield match.group(1)
+
+class _Rollback(Exception):
+    """Raised to roll back the sample data created for an audit."""
+
+class _RecordingCursor(CursorWrapper):
+    """A cursor which records the SQL and parameters of each query executed.
+
+    The SQL is recorded as given to the cursor, with placeholders intact. The
+    SQL logged by Django's debug cursor cannot be used: it is the output of
+    ``last_executed_query``, which is not valid SQL on every backend.
+
+    """
+    def __init__(self, cursor, db, queries):
+        super().__init__(cursor, db)
+        self.queries = queries
+
+    def execute(self, sql, params=None):
+        """Record ``sql`` and ``params``, then execute them."""
+        self.queries.append((sql, params))
+        return super().execute(sql, params)
+
+def _sample_objects():
+    """Create a user, a character owned by them, and some related objects.
+
+    Return a ``Client`` logged in as the user, and a dict holding the character
+    and its campaign.
+
+    """
+    user, password = factories.create_user()
+    character = factories.CharacterFactory.create(owner=user)
+    campaign = character.campaign
+    campaign.owner = user
+    campaign.save()
+    skillset = factories.SkillSetFactory.create()
+    campaign.skillsets.add(skillset)
+    for _ in range(3):
+        factories.CharacterSkillFactory.create(
+            character=character,
+            skill=factories.SkillFactory.create(skillset=skillset)
+        )
+        factories.CharacterSpellFactory.create(
+            character=character,
+            spell=factories.SpellFactory.create(campaign=campaign)
+        )
+        factories.PossessionFactory.create(
+            character=character,
+            item=factories.ItemFactory.create(campaign=campaign)
+        )
+        factories.TraitFactory.create(character=character)
+        factories.HitLocationFactory.create(character=character)
+    client = Client()
+    client.login(username=user.username, password=password)
+    return client, {'campaign': campaign, 'character': character}
+
+def _capture_queries(sample):
+    """GET each named URL. Return a list of each URL and the queries made.
+
+    ``sample`` is the return value of ``_sample_objects``. Each query is a pair
+    of SQL and parameters, as passed to ``cursor.execute``. The queries made by
+    the client's authentication middleware are included.
+
+    """
+    client, objects = sample
+    queries = []
+    captured = []
+    old_debug_cursor = connection.use_debug_cursor
+    # Shadow the connection's method, so each debug cursor records queries.
+    connection.make_debug_cursor = lambda cursor: _RecordingCursor(
+        cursor,
+        connection,
+        queries
+    )
+    connection.use_debug_cursor = True
+    try:
+        for url_name, url in urls.named_urls(
+            objects['campaign'].id,
+            objects['character'].id
+        ):
+            for data in QUERY_STRINGS.get(url_name, ({},)):
+                del queries[:]
+                response = client.get(url, data)
+                if response.status_code != 200:
+                    raise CommandError('GET {} returned {}.'.format(
+                        url,
+                        response.status_code
+                    ))
+                path = '{}?{}'.format(url, urlencode(data)) if data else url
+                captured.append((path, list(queries)))
+    finally:
+        del connection.make_debug_cursor
+        connection.use_debug_cursor = old_debug_cursor
+    return captured
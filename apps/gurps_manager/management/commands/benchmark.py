@@ -0,0 +1,167 @@
+"""Create a command named ``benchmark``."""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from gurps_manager import access, factories, urls
+from optparse import make_option
+import json
+import math
+import time
+
+# The datasets which can be benchmarked. Each is a number of campaigns, a
+# number of characters in each campaign, and a number of skills, spells and
+# items in each campaign. Each character has one of each skill, spell and item.
+SIZES = {
+    'small': (1, 3, 10),
+    'medium': (3, 10, 30),
+    'large': (5, 20, 100),
+}
+
+# Query strings for the URLs which need one.
+QUERY_STRINGS = {
+    'gurps-manager-character-id-possessions-choices': {'q': 'a'},
+    'gurps-manager-character-id-skills-choices': {'q': 'a'},
+    'gurps-manager-character-id-spells-choices': {'q': 'a'},
+}
+
+class Command(BaseCommand):
+    """Defines how to register the ``benchmark`` command with ``manage.py``."""
+    help = (
+        'Create a synthetic dataset, GET every named URL of the gurps_manager '
+        'app with the test client, and print the latency, query count and '
+        'size of each response as JSON. The dataset is rolled back afterwards.'
+    )
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--size',
+            choices=sorted(SIZES),
+            dest='size',
+            default='small',
+            help='size of the dataset: {} (default: small)'.format(
+                ', '.join(sorted(SIZES))
+            )
+        ),
+        make_option(
+            '--iterations',
+            type='int',
+            dest='iterations',
+            default=10,
+            help='number of timed requests per URL (default: 10)'
+        ),
+        make_option(
+            '--warmup',
+            type='int',
+            dest='warmup',
+            default=2,
+            help='number of untimed requests per URL (default: 2)'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        """Seed a dataset, benchmark each URL and print the results."""
+        if options['iterations'] < 1:
+            raise CommandError('At least one iteration is needed.')
+        campaigns, characters, rows = SIZES[options['size']]
+        report = {
+            'size': options['size'],
+            'campaigns': campaigns,
+            'characters': campaigns * characters,
+            'rows_per_character': rows,
+            'warmup': options['warmup'],
+            'iterations': options['iterations'],
+        }
+        user_ids = []
+        try:
+            with transaction.atomic():
+                client, objects = _seed(campaigns, characters, rows)
+                user_ids.append(objects['user'].id)
+                report['urls'] = {
+                    url_name: _benchmark(
+                        client,
+                        url,
+                        QUERY_STRINGS.get(url_name, {}),
+                        options['warmup'],
+                        options['iterations'],
+                    )
+                    for url_name, url in urls.named_urls(
+                        objects['campaign'].id,
+                        objects['character'].id
+                    )
+                }
+                raise _Rollback()
+        except _Rollback:
+            pass
+        finally:
+            # Access maps may have been cached for users who no longer exist.
+            access.discard_access_maps(*user_ids)
+        self.stdout.write(json.dumps(report, indent=4, sort_keys=True))
+
+def percentile(values, percent):
+    """Return the ``percent`` percentile of ``values``, by nearest rank.
+
+    >>> percentile([5, 1, 4, 2, 3], 50)
+    3
+    >>> percentile(range(1, 101), 95)
+    95
+    >>> percentile([7], 95)
+    7
+
+    """
+    values = sorted(values)
+    rank = max(int(math.ceil(percent / 100 * len(values))), 1)
+    return values[rank - 1]
+
+class _Rollback(Exception):
+    """Raised to roll back the dataset created for a benchmark."""
+
+def _seed(campaigns, characters, rows):
+    """Create a dataset owned by a single user.
+
+    Return a ``Client`` logged in as the user, and a dict holding the user, the
+    first campaign and the first character.
+
+    """
+    user, password = factories.create_user()
+    builder = factories.BulkBuilder()
+    built_campaigns, built_characters = factories.build_campaigns(
+        builder,
+        user,
+        campaigns,
+        characters,
+        rows
+    )
+    builder.insert()
+    client = Client()
+    client.login(username=user.username, password=password)
+    return client, {
+        'user': user,
+        'campaign': built_campaigns[0],
+        'character': built_characters[0],
+    }
+
+def _benchmark(client, url, data, warmup, iterations):
+    """GET ``url`` with query string ``data`` repeatedly.
+
+    Return a dict describing the requests. The query count is that of the
+    request which made the most queries.
+
+    """
+    for _ in range(warmup):
+        client.get(url, data)
+    latencies = []
+    queries = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            start = time.time()
+            response = client.get(url, data)
+            latencies.append(time.time() - start)
+        queries.append(len(context))
+    return {
+        'url': url,
+        'status': response.status_code,
+        'bytes': len(response.content),
+        'queries': max(queries),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+    }
@@ -0,0 +1,166 @@
+"""Create a command named ``benchmark_sqlite``."""
+from django.core.management.base import BaseCommand
+from gurps_manager import sqlite
+from optparse import make_option
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+class Command(BaseCommand):
+    """Defines how to register the ``benchmark_sqlite`` command."""
+    help = (
+        'Compare concurrent reads and writes on SQLite with the default '
+        'connection settings and with the pragmas in gurps_manager.sqlite. '
+        'A scratch database is used, not the configured one.'
+    )
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--readers',
+            type='int',
+            dest='readers',
+            default=4,
+            help='number of reading threads (default: 4)'
+        ),
+        make_option(
+            '--seconds',
+            type='float',
+            dest='seconds',
+            default=5.0,
+            help='how long to run each configuration for (default: 5)'
+        ),
+        make_option(
+            '--rows',
+            type='int',
+            dest='rows',
+            default=10000,
+            help='number of rows in the scratch table (default: 10000)'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        """Benchmark each configuration and print a table of results."""
+        self.stdout.write(
+            '{:<8} {:>10} {:>10} {:>14} {:>8}'.format(
+                'pragmas', 'reads/s', 'writes/s', 'max read (ms)', 'errors'
+            )
+        )
+        for name, pragmas in (('default', ()), ('tuned', sqlite.PRAGMAS)):
+            result = run_benchmark(
+                pragmas,
+                options['readers'],
+                options['seconds'],
+                options['rows'],
+            )
+            self.stdout.write(
+                '{:<8} {:>10.0f} {:>10.0f} {:>14.1f} {:>8}'.format(
+                    name,
+                    result['reads'] / options['seconds'],
+                    result['writes'] / options['seconds'],
+                    result['max_read'] * 1000,
+                    result['errors'],
+                )
+            )
+
+def run_benchmark(pragmas, readers, seconds, rows):
+    """Read from and write to a scratch database at the same time.
+
+    Each connection executes ``pragmas``. ``readers`` threads repeatedly scan a
+    table of ``rows`` rows, while one thread repeatedly updates a hundred rows
+    per transaction, like a formset being saved. Return a dict with the number
+    of ``reads`` and ``writes`` completed in ``seconds`` seconds, the slowest
+    read in seconds as ``max_read``, and the number of operations which failed
+    because the database was locked as ``errors``.
+
+    """
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'benchmark.db')
+    try:
+        connection = _connect(path, pragmas)
+        connection.execute(
+            'CREATE TABLE possession '
+            '(id INTEGER PRIMARY KEY, quantity INTEGER)'
+        )
+        connection.executemany(
+            'INSERT INTO possession (quantity) VALUES (?)',
+            ((i % 10,) for i in range(rows))
+        )
+        connection.close()
+
+        result = {'reads': 0, 'writes': 0, 'max_read': 0.0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.time() + seconds
+        threads = [
+            threading.Thread(
+                target=_read,
+                args=(path, pragmas, deadline, result, lock)
+            )
+            for _ in range(readers)
+        ]
+        threads.append(threading.Thread(
+            target=_write,
+            args=(path, pragmas, deadline, rows, result, lock)
+        ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return result
+    finally:
+        shutil.rmtree(directory)
+
+def _connect(path, pragmas):
+    """Open an autocommitting connection to ``path`` and apply ``pragmas``."""
+    connection = sqlite3.connect(
+        path,
+        isolation_level=None,
+        check_same_thread=False
+    )
+    sqlite.apply_pragmas(connection.cursor(), pragmas)
+    return connection
+
+def _read(path, pragmas, deadline, result, lock):
+    """Scan the scratch table until ``deadline``. Record into ``result``."""
+    connection = _connect(path, pragmas)
+    while time.time() < deadline:
+        start = time.time()
+        try:
+            connection.execute(
+                'SELECT SUM(quantity) FROM possession'
+            ).fetchone()
+        except sqlite3.OperationalError:
+            with lock:
+                result['errors'] += 1
+            continue
+        elapsed = time.time() - start
+        with lock:
+            result['reads'] += 1
+            result['max_read'] = max(result['max_read'], elapsed)
+    connection.close()
+
+def _write(path, pragmas, deadline, rows, result, lock): # pylint: disable=R0913,C0301
+    """Update the scratch table until ``deadline``. Record into ``result``."""
+    connection = _connect(path, pragmas)
+    offset = 0
+    while time.time() < deadline:
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            for row_id in range(offset, offset + 100):
+                connection.execute(
+                    'UPDATE possession SET quantity = quantity + 1 '
+                    'WHERE id = ?',
+                    (row_id % rows + 1,)
+                )
+            connection.execute('COMMIT')
+        except sqlite3.OperationalError:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            with lock:
+                result['errors'] += 1
+            continue
+        offset += 100
+        with lock:
+            result['writes'] += 1
+    connection.close()
@@ -0,0 +1,24 @@
+"""Create a command named ``rebuild_character_stats``."""
+from django.core.management.base import BaseCommand, CommandError
+from gurps_manager.models import Character
+
+class Command(BaseCommand):
+    """Defines how to register the ``rebuild_character_stats`` command."""
+    args = '[character_id ...]'
+    help = (
+        'Recalculate the stats cached on characters. If no IDs are given, the '
+        'stats of every character are recalculated.'
+    )
+
+    def handle(self, *args, **options):
+        """Recalculate the cached stats of the requested characters."""
+        queryset = Character.objects.all() # pylint: disable=E1101
+        if args:
+            try:
+                queryset = queryset.filter(pk__in=[int(arg) for arg in args])
+            except ValueError:
+                raise CommandError('Character IDs must be integers.')
+        stats = Character.rebuild_cached_stats(queryset)
+        self.stdout.write(
+            'Rebuilt the cached stats of {} characters.'.format(len(stats))
+        )
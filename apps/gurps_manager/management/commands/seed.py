@@ -0,0 +1,81 @@
+"""Create a command named ``seed``."""
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from gurps_manager import factories
+from optparse import make_option
+import random
+
+# What one unit of ``--scale`` adds: a number of campaigns, a number of
+# characters in each campaign, and a number of skills, spells and items in each
+# campaign. Each character has one of each skill, spell and item.
+SCALE_UNIT = (1, 10, 20)
+
+class Command(BaseCommand):
+    """Defines how to register the ``seed`` command with ``manage.py``."""
+    help = (
+        'Fill the database with synthetic campaigns and characters, for load '
+        'testing. Each unit of scale adds {} campaign of {} characters, with '
+        '{} skills, spells and items each. Everything is owned by a new user, '
+        'whose username and password are printed.'.format(*SCALE_UNIT)
+    )
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--scale',
+            type='int',
+            dest='scale',
+            default=1,
+            help='how many units of data to create (default: 1)'
+        ),
+        make_option(
+            '--seed',
+            type='int',
+            dest='seed',
+            default=None,
+            help='seed for the random number generator, so that the same '
+            'data is made each time'
+        ),
+        make_option(
+            '--batch-size',
+            type='int',
+            dest='batch_size',
+            default=None,
+            help='number of rows inserted per query (default: as many as the '
+            'database allows)'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        """Create a user, and as much data as asked for."""
+        if options['scale'] < 1:
+            raise CommandError('The scale must be at least 1.')
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+        campaigns, characters, rows = SCALE_UNIT
+        builder = factories.BulkBuilder(options['batch_size'])
+        with transaction.atomic():
+            # Unlike ``create_user``, make a password that is easy to type.
+            password = User.objects.make_random_password()
+            user = factories.UserFactory.create( # pylint: disable=E1101
+                password=make_password(password)
+            )
+            # Insert one unit at a time, so memory use does not grow.
+            for _ in range(options['scale']):
+                factories.build_campaigns(
+                    builder,
+                    user,
+                    campaigns,
+                    characters,
+                    rows
+                )
+                builder.insert()
+        self.stdout.write(
+            'Created {} campaigns and {} characters owned by user {!r} with '
+            'password {!r}.'.format(
+                campaigns * options['scale'],
+                campaigns * characters * options['scale'],
+                user.username,
+                password,
+            )
+        )
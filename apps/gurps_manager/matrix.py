@@ -0,0 +1,277 @@
+"""Score every character in a campaign in every skill and spell at once.
+
+Calling ``CharacterSkill.score`` and ``CharacterSpell.score`` once per row is
+slow when scoring an entire campaign. The functions in this module instead
+fetch the needed columns with a single query per table and evaluate the GURPS
+3rd edition score curves for every row at once.
+
+If NumPy is installed, the score curves are evaluated as vectorized array
+operations. Otherwise, the curves in the ``models`` module are applied row by
+row. Both approaches produce the same scores.
+
+"""
+from gurps_manager import models
+from math import floor
+from types import SimpleNamespace
+try:
+    import numpy
+except ImportError: # pragma: no cover
+    numpy = None # pylint: disable=C0103
+
+class ScoreMatrix(object):
+    """The scores of several characters in several skills or spells.
+
+    ``characters`` and ``columns`` are lists of model objects, such as
+    ``Character`` and ``Skill`` objects. ``scores`` is a list with one row per
+    character, and each row holds one score per column. A score is ``None`` if
+    the character does not know that skill or spell.
+
+    >>> matrix = ScoreMatrix(
+    ...     ['Alice', 'Bob'],
+    ...     ['Running', 'Juggling'],
+    ...     [[12.0, -2.5], [None, 3.5]]
+    ... )
+    >>> matrix.rows()
+    [('Alice', [12, -3]), ('Bob', [None, 3])]
+
+    """
+    def __init__(self, characters, columns, scores):
+        self.characters = characters
+        self.columns = columns
+        self.scores = scores
+
+    def rows(self):
+        """Return a list of ``(character, scores)`` tuples.
+
+        Scores are rounded down to integers, as the score curves in
+        ``models`` round, so that negative scores are the same whether or not
+        NumPy is used.
+
+        """
+        return [
+            (character, [None if score is None else floor(score) for score in row]) # pylint: disable=C0301
+            for character, row in zip(self.characters, self.scores)
+        ]
+
+def campaign_skill_matrix(campaign):
+    """Return a ``ScoreMatrix`` of ``campaign``'s characters and their skills.
+
+    Only skills known by at least one character appear in the matrix.
+
+    """
+    characters = _campaign_characters(campaign)
+    rows = list(models.CharacterSkill.objects.filter( # pylint: disable=E1101
+        character__campaign=campaign
+    ).values_list(
+        'character_id',
+        'skill_id',
+        'skill__category',
+        'skill__difficulty',
+        'points',
+    ))
+    skills = list(models.Skill.objects.filter( # pylint: disable=E1101
+        id__in=set(row[1] for row in rows)
+    ).order_by('name', 'id'))
+    attributes = _attribute_columns(characters, [row[0] for row in rows])
+    scores = skill_scores(
+        attributes,
+        [row[2] for row in rows],
+        [row[3] for row in rows],
+        [row[4] for row in rows],
+    )
+    return _score_matrix(characters, skills, rows, scores)
+
+def campaign_spell_matrix(campaign):
+    """Return a ``ScoreMatrix`` of ``campaign``'s characters and their spells.
+
+    Only spells known by at least one character appear in the matrix.
+
+    """
+    characters = _campaign_characters(campaign)
+    rows = list(models.CharacterSpell.objects.filter( # pylint: disable=E1101
+        character__campaign=campaign
+    ).values_list(
+        'character_id',
+        'spell_id',
+        'spell__difficulty',
+        'points',
+    ))
+    spells = list(models.Spell.objects.filter( # pylint: disable=E1101
+        id__in=set(row[1] for row in rows)
+    ).order_by('name', 'id'))
+    attributes = _attribute_columns(characters, [row[0] for row in rows])
+    scores = spell_scores(
+        attributes,
+        [row[2] for row in rows],
+        [row[3] for row in rows],
+    )
+    return _score_matrix(characters, spells, rows, scores)
+
+def skill_scores(attributes, categories, difficulties, points):
+    """Calculate the scores of many skills at once.
+
+    ``attributes`` is a dict mapping the names of ``Character`` attributes
+    (such as "intelligence" and "muscle_memory") to sequences. ``categories``,
+    ``difficulties`` and ``points`` are sequences. All sequences have the same
+    length, and the n-th item of each describes the n-th skill to be scored.
+
+    Return a list of scores. Raise a ``ValueError`` if a category is not in
+    ``Skill.CATEGORY_CHOICES``.
+
+    >>> attributes = {
+    ...     'intelligence': [12, 12],
+    ...     'eidetic_memory': [30, 30],
+    ...     'dexterity': [10, 10],
+    ...     'muscle_memory': [0, 0],
+    ... }
+    >>> mental = models.Skill.get_category_id('Mental')
+    >>> physical = models.Skill.get_category_id('Physical')
+    >>> skill_scores(attributes, [mental, physical], [2, 2], [2, 16])
+    [13.0, 13.0]
+
+    """
+    if numpy is None:
+        characters = [
+            SimpleNamespace(**dict(zip(attributes, values)))
+            for values in zip(*attributes.values())
+        ]
+        return [
+            float(models._skill_score(*args)) # pylint: disable=W0212
+            for args in zip(categories, difficulties, points, characters)
+        ]
+
+    categories = numpy.asarray(categories, dtype=int)
+    difficulties = numpy.asarray(difficulties, dtype=float)
+    points = numpy.asarray(points, dtype=float)
+    if not numpy.isin(categories, list(models._SKILL_SCORE_RULES)).all(): # pylint: disable=W0212,C0301
+        raise ValueError('The category referenced is outside the known set')
+    scores = numpy.zeros(len(points))
+    for category, (attribute, memory, curve) in models._SKILL_SCORE_RULES.items(): # pylint: disable=W0212,C0301
+        mask = categories == category
+        if not mask.any():
+            continue
+        effective_points = points[mask]
+        if memory is not None:
+            effective_points = effective_points * _memory_factors(
+                numpy.asarray(attributes[memory], dtype=float)[mask]
+            )
+        scores[mask] = _VECTORIZED_CURVES[curve](
+            numpy.asarray(attributes[attribute], dtype=float)[mask],
+            difficulties[mask],
+            effective_points,
+        )
+    return scores.tolist()
+
+def spell_scores(attributes, difficulties, points):
+    """Calculate the scores of many spells at once.
+
+    ``attributes`` is a dict containing sequences named "intelligence",
+    "magery" and "eidetic_memory". Other arguments are as for
+    ``skill_scores``. Return a list of scores.
+
+    >>> attributes = {
+    ...     'intelligence': [12, 12],
+    ...     'magery': [2, 0],
+    ...     'eidetic_memory': [30, 0],
+    ... }
+    >>> spell_scores(attributes, [2, 4], [8, 0.25])
+    [18.0, 0.0]
+
+    """
+    magic_attributes = [
+        intelligence + magery + eidetic_memory // 30
+        for intelligence, magery, eidetic_memory in zip(
+            attributes['intelligence'],
+            attributes['magery'],
+            attributes['eidetic_memory'],
+        )
+    ]
+    if numpy is None:
+        return [
+            float(models._mental_score_curve(*args)) # pylint: disable=W0212
+            for args in zip(magic_attributes, difficulties, points)
+        ]
+    return _vectorized_mental_curve(
+        numpy.asarray(magic_attributes, dtype=float),
+        numpy.asarray(difficulties, dtype=float),
+        numpy.asarray(points, dtype=float),
+    ).tolist()
+
+def _campaign_characters(campaign):
+    """Return a list of the characters in ``campaign``, ordered by name."""
+    return list(models.Character.objects.filter( # pylint: disable=E1101
+        campaign=campaign
+    ).order_by('name', 'id'))
+
+def _attribute_columns(characters, character_ids):
+    """Return a dict of attribute sequences for use by ``skill_scores``.
+
+    ``characters`` is a list of ``Character`` objects, and ``character_ids`` is
+    a sequence of IDs of those characters. The n-th item of each sequence
+    returned is an attribute of the character with ID ``character_ids[n]``.
+
+    """
+    by_id = dict((character.id, character) for character in characters)
+    return dict(
+        (name, [getattr(by_id[id_], name) for id_ in character_ids])
+        for name in _ATTRIBUTE_NAMES
+    )
+
+def _score_matrix(characters, columns, rows, scores):
+    """Place ``scores`` into a ``ScoreMatrix``.
+
+    ``rows`` is a list of tuples whose first two items are a character ID and a
+    column ID. The n-th score belongs to the n-th row.
+
+    """
+    row_index = dict((obj.id, i) for i, obj in enumerate(characters))
+    column_index = dict((obj.id, i) for i, obj in enumerate(columns))
+    matrix = [[None] * len(columns) for _ in characters]
+    for row, score in zip(rows, scores):
+        matrix[row_index[row[0]]][column_index[row[1]]] = score
+    return ScoreMatrix(characters, columns, matrix)
+
+def _memory_factors(memory):
+    """A vectorized version of ``models._memory_factor``."""
+    return numpy.where(memory == 0, 1, memory / 15)
+
+def _vectorized_mental_curve(attribute, difficulty, points):
+    """A vectorized version of ``models._mental_score_curve``."""
+    base_score = attribute - difficulty
+    return numpy.select(
+        [points < 0.5, points < 1, points < 2, points < 4, difficulty < 4],
+        [
+            0,
+            base_score,
+            base_score + 1,
+            base_score + 2,
+            base_score + (points // 2) + 1,
+        ],
+        default=base_score + (points // 4) + 2,
+    )
+
+def _vectorized_physical_curve(attribute, difficulty, points):
+    """A vectorized version of ``models._physical_score_curve``."""
+    base_score = attribute - difficulty
+    return numpy.select(
+        [points < 0.5, points < 1, points < 2, points < 4, points < 8],
+        [0, base_score, base_score + 1, base_score + 2, base_score + 3],
+        default=base_score + (points // 8) + 3,
+    )
+
+# The vectorized counterpart of each score curve in ``models``.
+_VECTORIZED_CURVES = {
+    models._mental_score_curve: _vectorized_mental_curve, # pylint: disable=W0212,C0301
+    models._physical_score_curve: _vectorized_physical_curve, # pylint: disable=W0212,C0301
+}
+
+# The ``Character`` attributes needed to score any skill or spell.
+_ATTRIBUTE_NAMES = (
+    'intelligence',
+    'health',
+    'dexterity',
+    'strength',
+    'magery',
+    'eidetic_memory',
+    'muscle_memory',
+)
@@ -0,0 +1,169 @@
+"""Middleware for the ``gurps_manager`` app.
+
+``QueryCountMiddleware`` records how many SQL queries each request makes and
+how long they take. It should be listed first in ``MIDDLEWARE_CLASSES``, so the
+queries made by other middleware are counted too.
+
+``ProfileMiddleware`` profiles a view when a superuser asks for it. It should
+be listed last in ``MIDDLEWARE_CLASSES``, so that only the view is profiled.
+
+"""
+from django.conf import settings
+from django.db import connection
+from gurps_manager import profiling
+from gurps_manager.urls import QUERY_BUDGETS
+import cProfile
+import logging
+import os
+import tracemalloc
+
+logger = logging.getLogger(__name__) # pylint: disable=C0103
+
+class QueryCountMiddleware(object):
+    """Count and time the SQL queries made while handling each request.
+
+    Three headers are added to each response:
+
+    ``X-Query-Count``
+        The number of queries made.
+    ``X-Query-Time``
+        The time spent on those queries, in milliseconds.
+    ``X-Slowest-Query-Time``
+        The time spent on the slowest query, in milliseconds.
+
+    The same figures and the slowest query are logged at the ``INFO`` level.
+    If the request was for a URL named in ``gurps_manager.urls.QUERY_BUDGETS``
+    and it made more queries than budgeted, a warning is logged as well.
+
+    Queries are only recorded by Django if its debug cursor is used, and the
+    debug cursor keeps the SQL of every query in memory. So queries are only
+    counted if ``DEBUG`` or the ``GURPS_MANAGER_COUNT_QUERIES`` setting is on.
+    If so, the debug cursor is used for the duration of each request.
+    Otherwise, nothing is logged and no headers are added.
+
+    """
+    def process_request(self, request):
+        """Start recording queries, if they are to be counted."""
+        if not settings.DEBUG \
+                and not getattr(settings, 'GURPS_MANAGER_COUNT_QUERIES', False):
+            return None
+        request.query_count_start = (
+            len(connection.queries),
+            connection.use_debug_cursor
+        )
+        connection.use_debug_cursor = True
+
+    def process_response(self, request, response):
+        """Stop recording queries, and report on those made."""
+        # Queries may not be counted, or another middleware may have answered
+        # before ``process_request`` ran.
+        if not hasattr(request, 'query_count_start'):
+            return response
+        start, use_debug_cursor = request.query_count_start
+        connection.use_debug_cursor = use_debug_cursor
+        queries = connection.queries[start:]
+        count, total_time, slowest = summarize_queries(queries)
+        slowest_time = float(slowest['time']) if slowest else 0.0
+
+        response['X-Query-Count'] = str(count)
+        response['X-Query-Time'] = '{:.1f}'.format(total_time * 1000)
+        response['X-Slowest-Query-Time'] = '{:.1f}'.format(slowest_time * 1000)
+        logger.info(
+            '%s %s: %d queries in %.1f ms, slowest %.1f ms: %s',
+            request.method,
+            request.path,
+            count,
+            total_time * 1000,
+            slowest_time * 1000,
+            slowest['sql'] if slowest else None,
+        )
+
+        url_name = getattr(request.resolver_match, 'url_name', None)
+        budget = QUERY_BUDGETS.get(url_name)
+        if budget is not None and count > budget:
+            logger.warning(
+                '%s %s (%s) made %d queries, over its budget of %d.',
+                request.method,
+                request.path,
+                url_name,
+                count,
+                budget,
+            )
+        return response
+
+def summarize_queries(queries):
+    """Return the number, total time and slowest of ``queries``.
+
+    ``queries`` is a list of dicts like those in ``connection.queries``, with
+    times in seconds. The slowest query is ``None`` if there are no queries.
+
+    >>> queries = [
+    ...     {'sql': 'SELECT 1', 'time': '0.002'},
+    ...     {'sql': 'SELECT 2', 'time': '0.005'},
+    ... ]
+    >>> count, total_time, slowest = summarize_queries(queries)
+    >>> count, round(total_time, 3), slowest['sql']
+    (2, 0.007, 'SELECT 2')
+    >>> summarize_queries([])
+    (0, 0.0, None)
+
+    """
+    if not queries:
+        return 0, 0.0, None
+    total_time = sum(float(query['time']) for query in queries)
+    slowest = max(queries, key=lambda query: float(query['time']))
+    return len(queries), total_time, slowest
+
+class ProfileMiddleware(object):
+    """Profile a view if a superuser asks for it.
+
+    A request asks to be profiled if its query string has a ``profile``
+    parameter or if it has an ``X-Profile`` header. Other requests are passed
+    through untouched, and requests from users who are not superusers are
+    never profiled.
+
+    The view is run under ``cProfile`` while ``tracemalloc`` traces memory
+    allocations. Two files are written to ``profiling.profile_dir()``: a
+    ``.prof`` file, which can be read with the ``pstats`` module or a viewer
+    like SnakeViz, and a ``.txt`` report of the lines which allocated the most
+    memory. Their common name is sent back in the response's ``X-Profile``
+    header.
+
+    """
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Run ``view_func`` under the profilers, if asked to."""
+        if 'profile' not in request.GET \
+                and 'HTTP_X_PROFILE' not in request.META:
+            return None
+        if not request.user.is_superuser:
+            return None
+
+        profiler = cProfile.Profile()
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            response = profiler.runcall(
+                view_func,
+                request,
+                *view_args,
+                **view_kwargs
+            )
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+        name = profiling.profile_name(request)
+        directory = profiling.profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(directory, name + '.prof'))
+        # ``views.ProfileName`` serves reports as UTF-8, whatever the locale.
+        with open(
+            os.path.join(directory, name + '.txt'),
+            'w',
+            encoding='utf-8'
+        ) as report:
+            report.write(profiling.allocation_report(request, snapshot))
+        response['X-Profile'] = name
+        return response
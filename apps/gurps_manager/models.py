@@ -8,12 +8,21 @@ column named ``id``. Django will not generate ``id`` if you pass ``primary_key =
 True`` to some other column.
 
 """
+from contextlib import contextmanager
 from decimal import Decimal
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connection, models
+from django.db.models.query import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from gurps_manager import sqlite # pylint: disable=W0611
 from math import floor
-import re
+import functools
+import threading
+
+# ``sqlite`` is imported for its ``connection_created`` receiver. Models are
+# loaded before the first query, so every connection is tuned.
 
 # pylint: disable=E1101
 # no-member. Used when a variable is accessed for a nonexistent member.
@@ -79,10 +88,25 @@ class Campaign(models.Model):
         blank=True
     )
 
+    class Meta(object):
+        """Model attributes that are not fields."""
+        # Lists of campaigns are filtered by owner and sorted by name.
+        index_together = [['owner', 'name']]
+
     def __str__(self):
         """Returns a string representation of the object"""
         return self.name
 
+    def delete(self, *args, **kwargs):
+        """Delete this object, along with its characters, items and so on.
+
+        The rows deleted with this campaign would otherwise each refresh the
+        cached stats of a character. See ``deferred_stat_refresh``.
+
+        """
+        with deferred_stat_refresh():
+            super().delete(*args, **kwargs)
+
 class SkillSet(models.Model):
     """A grouping of similar skills"""
     MAX_LEN_NAME = 50
@@ -94,6 +118,169 @@ class SkillSet(models.Model):
         """Returns a string representation of the object"""
         return self.name
 
+def memoized(method):
+    """Cache the value returned by ``method`` on the object it is called on.
+
+    ``method`` must take no arguments other than ``self``. Values are cached in
+    a dict named ``_memo`` on the object, which lives for as long as the object
+    does. Typically, this means values are cached for a single request. Call
+    ``clear_memo`` to discard them.
+
+    >>> class Foo(object):
+    ...     calls = 0
+    ...     @memoized
+    ...     def bar(self):
+    ...         self.calls += 1
+    ...         return self.calls
+    >>> foo = Foo()
+    >>> foo.bar(), foo.bar()
+    (1, 1)
+    >>> clear_memo(foo)
+    >>> foo.bar()
+    2
+
+    """
+    @functools.wraps(method)
+    def wrapper(self):
+        """Return a cached value, or call ``method`` and cache its value."""
+        memo = self.__dict__.setdefault('_memo', {})
+        if method.__name__ not in memo:
+            memo[method.__name__] = method(self)
+        return memo[method.__name__]
+    return wrapper
+
+def clear_memo(obj):
+    """Discard all values cached on ``obj`` by ``memoized`` methods."""
+    obj.__dict__.pop('_memo', None)
+
+class PointLedger(object):
+    """A breakdown of the character points spent by a ``Character``.
+
+    ``character`` is a ``Character`` model object. ``skills``, ``spells``,
+    ``advantages`` and ``disadvantages`` are the number of points ``character``
+    has spent in each of those buckets. Points spent in attributes and special
+    traits are read directly from ``character``.
+
+    >>> character = Character(total_points=100, magery=0)
+    >>> ledger = PointLedger(character, 10, 2.5, 15, -20)
+    >>> ledger.skills, ledger.spells, ledger.advantages, ledger.disadvantages
+    (10.0, 2.5, 15, -20)
+    >>> ledger.spent() == ledger.attributes + ledger.special_traits + 7.5
+    True
+    >>> ledger.remaining() == 100 - ledger.spent()
+    True
+
+    """
+    # Names of the columns added by ``CharacterQuerySet.with_point_ledgers``.
+    BUCKETS = (
+        'skill_points',
+        'spell_points',
+        'advantage_points',
+        'disadvantage_points',
+    )
+
+    def __init__(self, character, skills=0, spells=0, advantages=0,
+                 disadvantages=0):
+        # pylint: disable=R0913
+        # Some database backends return sums as ``Decimal`` objects. Coerce
+        # them so that they can be mixed with the other buckets.
+        self.character = character
+        self.attributes = character.total_points_in_attributes()
+        self.special_traits = character.total_points_in_special_traits()
+        self.skills = float(skills)
+        self.spells = float(spells)
+        self.advantages = int(advantages)
+        self.disadvantages = int(disadvantages)
+
+    def spent(self):
+        """Returns the points spent in all buckets."""
+        return self.attributes \
+            + self.advantages \
+            + self.disadvantages \
+            + self.skills \
+            + self.spells \
+            + self.special_traits
+
+    def remaining(self):
+        """Returns the points left to spend."""
+        return self.character.total_points - self.spent()
+
+class CharacterQuerySet(QuerySet):
+    """A ``QuerySet`` with extra methods for ``Character`` objects."""
+    def with_point_ledgers(self):
+        """Annotate each character with the points it has spent.
+
+        Each character is given the attributes named in ``PointLedger.BUCKETS``.
+        They are computed with correlated subqueries, so the whole set of
+        characters is fetched in a single query. ``Character.point_ledger``
+        uses these attributes if they are present.
+
+        """
+        return self.extra(select=_point_ledger_sql())
+
+    def with_point_totals(self):
+        """Annotate each character with the points it has spent and has left.
+
+        Each character is given a ``spent_points`` and a ``remaining_points``
+        attribute, in addition to the attributes added by
+        ``with_point_ledgers``. Both are computed by the database, so the
+        returned queryset can be ordered and filtered by them.
+
+        """
+        return self.with_point_ledgers().extra(select=_point_totals_sql())
+
+    def with_possession_totals(self):
+        """Annotate each character with the weight and value of its possessions.
+
+        Each character is given a ``possession_weight`` and a
+        ``possession_value`` attribute. Both are summed by the database, so the
+        totals for a whole campaign can be fetched at once::
+
+            Character.objects.filter(campaign=campaign).with_possession_totals()
+
+        ``Character.total_possession_weight`` and
+        ``Character.total_possession_value`` use these attributes if they are
+        present.
+
+        """
+        return self.extra(select=_possession_totals_sql())
+
+    def for_sheet(self):
+        """Fetch everything shown on a character sheet with each character.
+
+        Each character's campaign and owner are fetched in the same query as the
+        character, and its skills, spells, possessions, traits and hit
+        locations are prefetched, along with their ``Skill``, ``Spell`` and
+        ``Item`` rows. The number of queries made does not depend on how many
+        of these objects a character has.
+
+        """
+        return self.select_related('campaign', 'owner').prefetch_related(
+            *Character.SHEET_RELATIONS
+        )
+
+class CharacterManager(models.Manager):
+    """The default manager for ``Character`` objects."""
+    def get_queryset(self):
+        """Return a ``CharacterQuerySet``."""
+        return CharacterQuerySet(self.model, using=self._db)
+
+    def with_point_ledgers(self):
+        """See ``CharacterQuerySet.with_point_ledgers``."""
+        return self.get_queryset().with_point_ledgers()
+
+    def with_point_totals(self):
+        """See ``CharacterQuerySet.with_point_totals``."""
+        return self.get_queryset().with_point_totals()
+
+    def with_possession_totals(self):
+        """See ``CharacterQuerySet.with_possession_totals``."""
+        return self.get_queryset().with_possession_totals()
+
+    def for_sheet(self):
+        """See ``CharacterQuerySet.for_sheet``."""
+        return self.get_queryset().for_sheet()
+
 class Character(models.Model):
     """An individual who can be role-played."""
     # pylint: disable=R0904
@@ -133,6 +320,39 @@ class Character(models.Model):
         (30, 'Partial'),
         (60, 'Full'),
     )
+    # Stats which are aggregated from other tables and cached on each character.
+    # Stat ``foo`` is stored in column ``cached_foo``.
+    CACHED_STATS = PointLedger.BUCKETS + (
+        'possession_weight',
+        'possession_value',
+        'remaining_points',
+    )
+    # The fields of a character from which its cached stats are calculated.
+    # Saving other fields leaves the cached stats as they are.
+    STAT_FIELDS = (
+        'strength',
+        'dexterity',
+        'intelligence',
+        'health',
+        'free_strength',
+        'free_dexterity',
+        'free_intelligence',
+        'free_health',
+        'magery',
+        'total_points',
+        'appearance',
+        'wealth',
+        'eidetic_memory',
+        'muscle_memory',
+    )
+    # The relations prefetched by ``Character.objects.for_sheet()``.
+    SHEET_RELATIONS = (
+        'characterskill_set__skill',
+        'characterspell_set__spell',
+        'possession_set__item',
+        'trait_set',
+        'hitlocation_set',
+    )
 
     # key fields
     campaign = models.ForeignKey(Campaign)
@@ -184,6 +404,30 @@ class Character(models.Model):
         default=0
     )
 
+    # cached fields
+    # These are kept up to date by ``refresh_cached_stats``. ``None`` means that
+    # a stat has not been calculated yet, in which case it is calculated when
+    # read.
+    cached_skill_points = models.FloatField(null=True, editable=False)
+    cached_spell_points = models.FloatField(null=True, editable=False)
+    cached_advantage_points = models.IntegerField(null=True, editable=False)
+    cached_disadvantage_points = models.IntegerField(null=True, editable=False)
+    cached_possession_weight = models.FloatField(null=True, editable=False)
+    cached_possession_value = models.FloatField(null=True, editable=False)
+    cached_remaining_points = models.FloatField(
+        null=True,
+        editable=False,
+        db_index=True
+    )
+
+    objects = CharacterManager()
+
+    class Meta(object):
+        """Model attributes that are not fields."""
+        # Finding the campaigns a user plays in filters characters by owner and
+        # reads only their campaign.
+        index_together = [['owner', 'campaign']]
+
     # derived fields
     def fatigue(self):
         """Returns a character's total fatigue"""
@@ -230,19 +474,38 @@ class Character(models.Model):
         """Returns a character's extra heavy encumbrance upper limit"""
         return self.strength * 20
 
+    @memoized
+    def _possession_totals(self):
+        """Returns the total weight and value of a character's possessions.
+
+        If this character was fetched with
+        ``Character.objects.with_possession_totals()`` or its cached stats are
+        set, no queries are made. Otherwise, both totals are fetched in a single
+        query, once per object. See ``memoized``.
+
+        """
+        totals = (
+            getattr(self, 'possession_weight', None),
+            getattr(self, 'possession_value', None),
+        )
+        if None not in totals:
+            return totals
+        totals = (self.cached_possession_weight, self.cached_possession_value)
+        if None not in totals:
+            return totals
+        if self.pk is None:
+            return 0, 0
+        return Character.objects.with_possession_totals().filter(
+            pk=self.pk
+        ).values_list('possession_weight', 'possession_value').get()
+
     def total_possession_weight(self):
         """Returns the total weight of a character's possessions"""
-        total_weight = 0
-        for possession in Possession.objects.filter(character=self):
-            total_weight += (possession.item.weight * possession.quantity)
-        return total_weight
+        return self._possession_totals()[0]
 
     def total_possession_value(self):
         """Returns the total value of a character's possessions"""
-        total_value = 0
-        for possession in Possession.objects.filter(character=self):
-            total_value += (possession.item.value * possession.quantity)
-        return total_value
+        return self._possession_totals()[1]
 
     def encumbrance_penalty(self):
         """Returns the movement penalty incurred by a character's total
@@ -252,15 +515,16 @@ class Character(models.Model):
             GURPS Basic Set 3rd Edition Revised, page 76
 
         """
-        if self.total_possession_weight() < self.no_encumbrance():
+        total_weight = self.total_possession_weight()
+        if total_weight < self.no_encumbrance():
             return 0
-        elif self.total_possession_weight() < self.light_encumbrance():
+        elif total_weight < self.light_encumbrance():
             return 1
-        elif self.total_possession_weight() < self.medium_encumbrance():
+        elif total_weight < self.medium_encumbrance():
             return 2
-        elif self.total_possession_weight() < self.heavy_encumbrance():
+        elif total_weight < self.heavy_encumbrance():
             return 3
-        elif self.total_possession_weight() < self.extra_heavy_encumbrance():
+        elif total_weight < self.extra_heavy_encumbrance():
             return 4
         else:
             # Returns a penatly such that the character's movement will be -1
@@ -275,13 +539,43 @@ class Character(models.Model):
         """Returns a character's movement"""
         # Factor in the running skill if they have it.
         running_bonus = 0
-        for skill in CharacterSkill.objects.filter(character=self):
-            if re.search('^running$', skill.skill.name, flags=re.IGNORECASE):
-                running_bonus = (skill.score() / 8)
+        running = self.special_skill('movement')
+        if running is not None:
+            running_bonus = _skill_score(
+                running.skill.category,
+                running.skill.difficulty,
+                running.points,
+                self,
+            ) / 8
         return floor(self.speed() + running_bonus) \
             - self.encumbrance_penalty() \
             + self.bonus_movement
 
+    def special_skill(self, rule):
+        """Return the ``CharacterSkill`` affecting ``rule``, or ``None``.
+
+        ``rule`` is a key from ``Skill.SPECIAL_SKILLS``. If the character has
+        several matching skills, the most recently added one is returned.
+
+        If this character was fetched with ``Character.objects.for_sheet()``,
+        its prefetched skills are searched and no queries are made.
+
+        """
+        key = Skill.SPECIAL_SKILLS[rule]
+        if 'characterskill' in getattr(self, '_prefetched_objects_cache', {}):
+            matches = [
+                character_skill
+                for character_skill in self.characterskill_set.all()
+                if character_skill.skill.key == key
+            ]
+            if not matches:
+                return None
+            return max(matches, key=lambda match: match.id)
+        return CharacterSkill.objects.filter( # pylint: disable=E1101
+            character=self,
+            skill__key=key
+        ).select_related('skill').order_by('id').last()
+
     def dodge(self):
         """Returns a character's speed"""
         return floor(self.speed()) \
@@ -344,33 +638,19 @@ class Character(models.Model):
 
     def total_points_in_skills(self):
         """Returns the points a character has spent in skills"""
-        total_points = 0
-        for skill in CharacterSkill.objects.filter(character=self):
-            total_points += skill.points
-        return total_points
+        return self.point_ledger().skills
 
     def total_points_in_spells(self):
         """Returns the points a character has spent in spells"""
-        total_points = 0
-        for spell in CharacterSpell.objects.filter(character=self):
-            total_points += spell.points
-        return total_points
+        return self.point_ledger().spells
 
     def total_points_in_advantages(self):
         """Returns the points a character has spent in advantages"""
-        total_points = 0
-        for trait in Trait.objects.filter(character=self):
-            if trait.points > 0:
-                total_points += trait.points
-        return total_points
+        return self.point_ledger().advantages
 
     def total_points_in_disadvantages(self):
         """Returns the points a character has spent in disadvantages"""
-        total_points = 0
-        for trait in Trait.objects.filter(character=self):
-            if trait.points < 0:
-                total_points += trait.points
-        return total_points
+        return self.point_ledger().disadvantages
 
     def total_points_in_special_traits(self):
         """Returns the points a character has spent in special traits"""
@@ -380,34 +660,129 @@ class Character(models.Model):
             + self.appearance \
             + self.points_in_magery()
 
+    def point_ledger(self):
+        """Returns a ``PointLedger`` for this character.
+
+        If this character was fetched with
+        ``Character.objects.with_point_ledgers()`` or its cached stats are set,
+        no queries are made. Otherwise, every bucket is fetched in a single
+        query.
+
+        """
+        buckets = [getattr(self, name, None) for name in PointLedger.BUCKETS]
+        if None in buckets:
+            buckets = [
+                getattr(self, 'cached_' + name) for name in PointLedger.BUCKETS
+            ]
+        if None in buckets:
+            buckets = self._point_buckets()
+        return PointLedger(self, *buckets)
+
+    @memoized
+    def _point_buckets(self):
+        """Fetch the values for ``PointLedger.BUCKETS`` from the database."""
+        return self._live_point_buckets()
+
+    def _live_point_buckets(self):
+        """Like ``_point_buckets``, but neither memoized nor cached."""
+        if self.pk is None:
+            return [0] * len(PointLedger.BUCKETS)
+        return Character.objects.with_point_ledgers().filter(
+            pk=self.pk
+        ).values_list(*PointLedger.BUCKETS).get()
+
     def total_points_spent(self):
         """Returns the points a character has spent in total"""
-        return self.total_points_in_attributes() \
-            + self.total_points_in_advantages() \
-            + self.total_points_in_disadvantages() \
-            + self.total_points_in_skills() \
-            + self.total_points_in_spells() \
-            + self.total_points_in_special_traits()
+        return self.point_ledger().spent()
 
     def points_remaining(self):
         """Returns the points a character has left to spend"""
-        return self.total_points - self.total_points_spent()
+        return self.point_ledger().remaining()
 
     def __str__(self):
         """Returns a string representation of the object"""
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Save this object, then refresh its cached stats if need be.
+
+        Cached stats are refreshed when this object is created, or when
+        ``update_fields`` is not given or names one of ``STAT_FIELDS``. They
+        are refreshed even if they were saved, as the values on this object may
+        be out of date.
+
+        """
+        created = self.pk is None
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if created or update_fields is None \
+                or set(update_fields).intersection(self.STAT_FIELDS):
+            self.refresh_cached_stats()
+
+    def delete(self, *args, **kwargs):
+        """Delete this object, along with its skills, spells and so on.
+
+        The rows deleted with this character would otherwise each refresh its
+        cached stats. See ``deferred_stat_refresh``.
+
+        """
+        with deferred_stat_refresh():
+            super().delete(*args, **kwargs)
+
+    def refresh_cached_stats(self):
+        """Recalculate and save this character's cached stats.
+
+        The new values are also set on this object, and any memoized derived
+        stats are discarded. Two queries are made.
+
+        """
+        if self.pk is not None:
+            stats = Character.rebuild_cached_stats(
+                Character.objects.filter(pk=self.pk) # pylint: disable=E1101
+            )
+            for column, value in stats.get(self.pk, {}).items():
+                setattr(self, column, value)
+        clear_memo(self)
+
+    @classmethod
+    def rebuild_cached_stats(cls, queryset=None):
+        """Recalculate and save the cached stats of each character in
+        ``queryset``.
+
+        ``queryset`` defaults to every character. Stats for all characters are
+        fetched in a single query, and then saved with ``bulk_update``, which
+        makes one update per batch of characters.
+
+        Return a dict mapping the ID of each character to a dict of the cached
+        values saved for that character.
+
+        """
+        if queryset is None:
+            queryset = cls.objects.all() # pylint: disable=E1101
+        columns = ['cached_' + stat for stat in cls.CACHED_STATS]
+        saved = {}
+        for row in queryset.with_point_totals().with_possession_totals(
+        ).values_list('pk', *cls.CACHED_STATS):
+            saved[row[0]] = dict(zip(columns, row[1:]))
+        bulk_update(
+            [cls(pk=pk, **values) for pk, values in saved.items()],
+            columns
+        )
+        return saved
+
     def clean(self):
         """Perform model-wide validation."""
-        # Don't allow the user to spend too many character points.
+        # Don't allow the user to spend too many character points. The points
+        # are summed from the database, as the cached stats may be out of date.
         try:
-            if self.total_points_spent() > self.total_points:
+            points_spent = PointLedger(
+                self,
+                *self._live_point_buckets()
+            ).spent()
+            if points_spent > self.total_points:
                 raise ValidationError(
                     'Too many character points spent. Only {} are available; '
-                    'you spent {}.'.format(
-                        self.total_points,
-                        self.total_points_spent()
-                    )
+                    'you spent {}.'.format(self.total_points, points_spent)
                 )
         except TypeError:
             # This error occurs if, say, total_points_spent is 150 and
@@ -459,17 +834,33 @@ class Skill(models.Model):
         (3, 'Hard'),
         (4, 'Very Hard'),
     )
+    # Skills which affect rules other than their own score. Each key is a rule,
+    # and each value is the ``key`` of the skill affecting that rule.
+    SPECIAL_SKILLS = {
+        'movement': 'running',
+    }
 
     # key fields
     skillset = models.ForeignKey(SkillSet)
 
     # string-based fields
     name = models.CharField(max_length=MAX_LEN_NAME)
+    key = models.CharField(
+        max_length=MAX_LEN_NAME,
+        db_index=True,
+        editable=False
+    ) # normalized ``name``, set whenever a skill is saved
 
     # lookup fields
     category = models.IntegerField(choices=CATEGORY_CHOICES)
     difficulty = models.IntegerField(choices=DIFFICULTY_CHOICES)
 
+    class Meta(object):
+        """Model attributes that are not fields."""
+        # Skills are searched for by a prefix of their key within skillsets,
+        # and listed by name within skillsets.
+        index_together = [['skillset', 'key'], ['skillset', 'name']]
+
     def __str__(self):
         """Returns a string representation of the object"""
         return self.name
@@ -486,6 +877,40 @@ class Skill(models.Model):
         """
         return _get_choice_id(cls.CATEGORY_CHOICES, name)
 
+    @staticmethod
+    def normalize_name(name):
+        """Return the ``key`` for a skill named ``name``.
+
+        Spells and items are given keys in the same way.
+
+        >>> Skill.normalize_name('RuNnInG')
+        'running'
+
+        """
+        return name.lower()
+
+class CharacterSkillQuerySet(QuerySet):
+    """A ``QuerySet`` with extra methods for ``CharacterSkill`` objects."""
+    def with_scores(self):
+        """Annotate each character skill with its score.
+
+        Each character skill is given a ``skill_score`` attribute, equal to
+        ``score()``. It is computed by the database, so the returned queryset
+        can be ordered and filtered by it.
+
+        """
+        return self.extra(select=_skill_score_sql())
+
+class CharacterSkillManager(models.Manager):
+    """The default manager for ``CharacterSkill`` objects."""
+    def get_queryset(self):
+        """Return a ``CharacterSkillQuerySet``."""
+        return CharacterSkillQuerySet(self.model, using=self._db)
+
+    def with_scores(self):
+        """See ``CharacterSkillQuerySet.with_scores``."""
+        return self.get_queryset().with_scores()
+
 class CharacterSkill(models.Model):
     """A skill that a character possesses"""
     MAX_LEN_COMMENTS = 50
@@ -503,6 +928,13 @@ class CharacterSkill(models.Model):
     # float fields
     points = models.FloatField(validators=[validate_quarter], default=0)
 
+    objects = CharacterSkillManager()
+
+    class Meta(object):
+        """Model attributes that are not fields."""
+        # A character's skills are read together with the skills themselves.
+        index_together = [['character', 'skill']]
+
     def score(self):
         """Returns a character's score in a given skill
 
@@ -510,32 +942,33 @@ class CharacterSkill(models.Model):
             GURPS Basic Set 3rd Edition Revised, page 44
 
         """
-        # intelligence based mental skill
-        if self.skill.category == Skill.get_category_id('Mental'):
-            return self._mental_skill_score(self.character.intelligence)
-
-        # health based mental skill
-        elif self.skill.category == Skill.get_category_id('Mental (health)'):
-            return self._mental_skill_score(self.character.health)
-
-        # dexterity based physical skill
-        elif self.skill.category == Skill.get_category_id('Physical'):
-            return self._physical_skill_score(self.character.dexterity)
-
-        # health based physical skill
-        elif self.skill.category == Skill.get_category_id('Physical (health)'):
-            return self._physical_skill_score(self.character.health)
+        return _skill_score(
+            self.skill.category,
+            self.skill.difficulty,
+            self.points,
+            self.character,
+        )
 
-        # strength based physical skill
-        elif self.skill.category == Skill.get_category_id('Physical (strength)'): # pylint: disable=C0301
-            return self._physical_skill_score(self.character.strength)
+    @classmethod
+    def scores(cls, character_skills, character=None):
+        """Returns the score of each ``CharacterSkill`` in ``character_skills``.
 
-        # psionic skill
-        elif self.skill.category == Skill.get_category_id('Psionic'):
-            return self._psionic_skill_score()
+        ``character_skills`` is an iterable of ``CharacterSkill`` objects. Their
+        skills should have been fetched with ``select_related('skill')`` or
+        similar. If ``character`` is given, it is used in place of each
+        object's own character. This allows a whole list of skills to be scored
+        without making any queries.
 
-        else:
-            raise ValueError("The category referenced is outside the known set")
+        """
+        return [
+            _skill_score(
+                character_skill.skill.category,
+                character_skill.skill.difficulty,
+                character_skill.points,
+                character_skill.character if character is None else character,
+            )
+            for character_skill in character_skills
+        ]
 
     def _effective_points_mental(self):
         """Calculate effective mental points.
@@ -546,27 +979,15 @@ class CharacterSkill(models.Model):
         True
 
         """
-        return self.points * (
-            1 if self.character.eidetic_memory == 0
-            else (self.character.eidetic_memory / 15)
-        )
+        return self.points * _memory_factor(self.character.eidetic_memory)
 
     def _mental_skill_score(self, attribute):
         """Calculates the score of a mental skill with a given base attribute"""
-        effective_points_mental = self._effective_points_mental()
-        base_score = attribute - self.skill.difficulty
-        if effective_points_mental < 0.5:
-            return 0
-        elif effective_points_mental < 1:
-            return base_score
-        elif effective_points_mental < 2:
-            return base_score + 1
-        elif effective_points_mental < 4:
-            return base_score + 2
-        elif self.skill.difficulty < 4:
-            return base_score + (effective_points_mental // 2) + 1
-        else:
-            return base_score + (effective_points_mental // 4) + 2
+        return _mental_score_curve(
+            attribute,
+            self.skill.difficulty,
+            self._effective_points_mental()
+        )
 
     def _effective_points_physical(self):
         """Calculate effective physical points.
@@ -577,43 +998,23 @@ class CharacterSkill(models.Model):
         True
 
         """
-        return self.points * (
-            1 if self.character.muscle_memory == 0
-            else (self.character.muscle_memory / 15)
-        )
+        return self.points * _memory_factor(self.character.muscle_memory)
 
     def _physical_skill_score(self, attribute):
         """Calculates the score of a mental skill with a given base attribute"""
-        effective_points_physical = self._effective_points_physical()
-        base_score = attribute - self.skill.difficulty
-        if effective_points_physical < 0.5:
-            return 0
-        elif effective_points_physical < 1:
-            return base_score
-        elif effective_points_physical < 2:
-            return base_score + 1
-        elif effective_points_physical < 4:
-            return base_score + 2
-        elif effective_points_physical < 8:
-            return base_score + 3
-        else:
-            return base_score + (effective_points_physical // 8) + 3
+        return _physical_score_curve(
+            attribute,
+            self.skill.difficulty,
+            self._effective_points_physical()
+        )
 
     def _psionic_skill_score(self):
         """Calculates the score of a mental skill with a given base attribute"""
-        base_score = self.character.intelligence - self.skill.difficulty
-        if self.points < 0.5:
-            return 0
-        elif self.points < 1:
-            return base_score
-        elif self.points < 2:
-            return base_score + 1
-        elif self.points < 4:
-            return base_score + 2
-        elif self.skill.difficulty < 4:
-            return base_score + (self.points // 2) + 1
-        else:
-            return base_score + (self.points // 4) + 2
+        return _mental_score_curve(
+            self.character.intelligence,
+            self.skill.difficulty,
+            self.points
+        )
 
 class Spell(models.Model):
     """A Spell available to characters
@@ -635,6 +1036,10 @@ class Spell(models.Model):
 
     # string-based fields
     name = models.CharField(max_length=MAX_LEN_NAME)
+    key = models.CharField(
+        max_length=MAX_LEN_NAME,
+        editable=False
+    ) # normalized ``name``, set whenever a spell is saved
     school = models.CharField(max_length=MAX_LEN_SCHOOL)
     resist = models.CharField(max_length=MAX_LEN_RESIST)
     duration = models.CharField(max_length=MAX_LEN_DURATION)
@@ -651,6 +1056,14 @@ class Spell(models.Model):
     # lookup fields
     difficulty = models.IntegerField(choices=DIFFICULTY_CHOICES)
 
+    normalize_name = staticmethod(Skill.normalize_name)
+
+    class Meta(object):
+        """Model attributes that are not fields."""
+        # Spells are searched for by a prefix of their key within a campaign,
+        # and listed by name within a campaign.
+        index_together = [['campaign', 'key'], ['campaign', 'name']]
+
     def __str__(self):
         """Returns a string representation of the object"""
         return self.name
@@ -667,6 +1080,28 @@ class Spell(models.Model):
         """
         return _get_choice_id(cls.DIFFICULTY_CHOICES, name)
 
+class CharacterSpellQuerySet(QuerySet):
+    """A ``QuerySet`` with extra methods for ``CharacterSpell`` objects."""
+    def with_scores(self):
+        """Annotate each character spell with its score.
+
+        Each character spell is given a ``spell_score`` attribute, equal to
+        ``score()``. It is computed by the database, so the returned queryset
+        can be ordered and filtered by it.
+
+        """
+        return self.extra(select=_spell_score_sql())
+
+class CharacterSpellManager(models.Manager):
+    """The default manager for ``CharacterSpell`` objects."""
+    def get_queryset(self):
+        """Return a ``CharacterSpellQuerySet``."""
+        return CharacterSpellQuerySet(self.model, using=self._db)
+
+    def with_scores(self):
+        """See ``CharacterSpellQuerySet.with_scores``."""
+        return self.get_queryset().with_scores()
+
 class CharacterSpell(models.Model):
     """A spell that a character may know"""
     # key fields
@@ -679,6 +1114,13 @@ class CharacterSpell(models.Model):
     # float fields
     points = models.FloatField(validators=[validate_quarter], default=0)
 
+    objects = CharacterSpellManager()
+
+    class Meta(object):
+        """Model attributes that are not fields."""
+        # A character's spells are read together with the spells themselves.
+        index_together = [['character', 'spell']]
+
     def _base_score(self):
         """Return a base score used to calculate an actual score.
 
@@ -728,12 +1170,24 @@ class Item(models.Model):
 
     # string-based fields
     name = models.CharField(max_length=MAX_LEN_NAME)
+    key = models.CharField(
+        max_length=MAX_LEN_NAME,
+        editable=False
+    ) # normalized ``name``, set whenever an item is saved
     description = models.TextField(max_length=MAX_LEN_DESCRIPTION, blank=True)
 
     # float fields
     value = models.FloatField(validators=[validate_not_negative])
     weight = models.FloatField(validators=[validate_not_negative])
 
+    normalize_name = staticmethod(Skill.normalize_name)
+
+    class Meta(object):
+        """Model attributes that are not fields."""
+        # Items are searched for by a prefix of their key within a campaign,
+        # and listed by name within a campaign.
+        index_together = [['campaign', 'key'], ['campaign', 'name']]
+
     def __str__(self):
         """Returns a string representation of the object"""
         return self.name
@@ -747,6 +1201,11 @@ class Possession(models.Model):
     # integer fields
     quantity = models.IntegerField(validators=[validate_not_negative])
 
+    class Meta(object):
+        """Model attributes that are not fields."""
+        # A character's possessions are read together with the items.
+        index_together = [['character', 'item']]
+
 class HitLocation(models.Model):
     """A location on a character that can be affected
 
@@ -772,6 +1231,613 @@ class HitLocation(models.Model):
         """Returns a string representation of the object"""
         return self.name
 
+@receiver(pre_save, sender=Skill)
+@receiver(pre_save, sender=Spell)
+@receiver(pre_save, sender=Item)
+def _set_key(sender, instance, **kwargs): # pylint: disable=W0613
+    """Set ``instance.key`` from ``instance.name``.
+
+    A signal is used rather than ``save`` so that objects loaded from fixtures
+    also get a key.
+
+    """
+    instance.key = sender.normalize_name(instance.name)
+
+# The characters and items whose dependent stats are out of date, recorded by
+# the receivers below while inside a ``deferred_stat_refresh`` block.
+_deferred = threading.local()
+
+@contextmanager
+def deferred_stat_refresh():
+    """Refresh cached character stats once, when the block ends.
+
+    Inside the block, the receivers below only record which characters' stats
+    are out of date. When the block ends without an exception, the stats of
+    all of them are rebuilt together with ``Character.rebuild_cached_stats``.
+    Characters already loaded into memory are not updated, and characters
+    deleted inside the block are skipped. Nested blocks are merged into the
+    outermost one.
+
+    This is useful when saving or deleting many objects at once::
+
+        with deferred_stat_refresh():
+            for character_skill in character_skills:
+                character_skill.save()
+
+    """
+    if getattr(_deferred, 'characters', None) is not None:
+        yield
+        return
+    _deferred.characters = set()
+    _deferred.items = set()
+    _deferred.deleted = set()
+    try:
+        yield
+        characters, items = _deferred.characters, _deferred.items
+        characters.difference_update(_deferred.deleted)
+    finally:
+        _deferred.characters = _deferred.items = _deferred.deleted = None
+    if items:
+        characters.update(Possession.objects.filter( # pylint: disable=E1101
+            item__in=items
+        ).values_list('character', flat=True))
+    if characters:
+        Character.rebuild_cached_stats(
+            Character.objects.filter(pk__in=characters) # pylint: disable=E1101
+        )
+
+def bulk_update(objs, field_names):
+    """Save the fields named ``field_names`` of each object in ``objs``.
+
+    ``objs`` are saved objects of a single model. Rather than making one query
+    per object, as ``Model.save`` does, one ``UPDATE`` is made per batch of
+    objects. Each column is set with a ``CASE`` on the primary key. No signals
+    are sent.
+
+    """
+    objs = list(objs)
+    if not objs or not field_names:
+        return
+    model = type(objs[0])
+    qn = connection.ops.quote_name
+    fields = [model._meta.get_field(name) for name in field_names]
+    pk_column = qn(model._meta.pk.column)
+    # Each object needs two parameters per field and one more in the WHERE
+    # clause. SQLite allows no more than 999 parameters per query.
+    batch_size = max(1, 999 // (2 * len(fields) + 1))
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        assignments = []
+        params = []
+        for field in fields:
+            placeholder = '%s'
+            if connection.vendor == 'postgresql':
+                # Parameters in a CASE are otherwise typed as text.
+                placeholder = 'CAST(%s AS {})'.format(
+                    field.db_type(connection)
+                )
+            assignments.append('{} = CASE {} {} END'.format(
+                qn(field.column),
+                pk_column,
+                ' '.join(['WHEN %s THEN ' + placeholder] * len(batch)),
+            ))
+            for obj in batch:
+                params.append(obj.pk)
+                params.append(field.get_db_prep_save(
+                    field.pre_save(obj, False),
+                    connection=connection
+                ))
+        params.extend(obj.pk for obj in batch)
+        connection.cursor().execute(
+            'UPDATE {} SET {} WHERE {} IN ({})'.format(
+                qn(model._meta.db_table),
+                ', '.join(assignments),
+                pk_column,
+                ', '.join(['%s'] * len(batch)),
+            ),
+            params
+        )
+
+@receiver([post_save, post_delete], sender=CharacterSkill)
+@receiver([post_save, post_delete], sender=CharacterSpell)
+@receiver([post_save, post_delete], sender=Trait)
+@receiver([post_save, post_delete], sender=Possession)
+def _refresh_character_stats(sender, instance, raw=False, **kwargs): # pylint: disable=W0613,C0301
+    """Refresh the cached stats of the character that owns ``instance``.
+
+    If a ``Character`` object is already cached on ``instance``, the new stats
+    are set on it and its memoized stats are discarded. Other copies of the
+    character, such as those loaded by other requests, are unaffected. Nothing
+    is done while loading fixtures, and the refresh is put off while inside a
+    ``deferred_stat_refresh`` block.
+
+    """
+    if raw:
+        return
+    if getattr(_deferred, 'characters', None) is not None:
+        _deferred.characters.add(instance.character_id)
+        return
+    character = getattr(
+        instance,
+        sender._meta.get_field('character').get_cache_name(),
+        None
+    )
+    if character is not None:
+        character.refresh_cached_stats()
+    else:
+        Character.rebuild_cached_stats(
+            Character.objects.filter(pk=instance.character_id) # pylint: disable=E1101,C0301
+        )
+
+@receiver([post_save, post_delete], sender=Item)
+def _refresh_item_owner_stats(sender, instance, raw=False, **kwargs): # pylint: disable=W0613,C0301
+    """Refresh the cached stats of every character possessing ``instance``.
+
+    Nothing is done while loading fixtures, and the refresh is put off while
+    inside a ``deferred_stat_refresh`` block. Nothing is done when an item is
+    deleted either: its possessions are deleted first, and their receivers
+    refresh the characters which possessed it.
+
+    """
+    if raw or kwargs['signal'] is post_delete:
+        return
+    if getattr(_deferred, 'items', None) is not None:
+        _deferred.items.add(instance.pk)
+        return
+    Character.rebuild_cached_stats(Character.objects.filter( # pylint: disable=E1101
+        pk__in=Possession.objects.filter( # pylint: disable=E1101
+            item=instance
+        ).values('character')
+    ))
+
+@receiver(post_delete, sender=Character)
+def _skip_deleted_character(sender, instance, **kwargs): # pylint: disable=W0613
+    """Record that ``instance`` was deleted inside a
+    ``deferred_stat_refresh`` block, so its stats are not rebuilt.
+
+    """
+    if getattr(_deferred, 'deleted', None) is not None:
+        _deferred.deleted.add(instance.pk)
+
+def _memory_factor(memory):
+    """Return the multiplier applied to skill points by a level of memory.
+
+    ``memory`` is a value from ``Character.EIDETIC_MEMORY_CHOICES`` or
+    ``Character.MUSCLE_MEMORY_CHOICES``.
+
+    >>> _memory_factor(0), _memory_factor(30), _memory_factor(60)
+    (1, 2.0, 4.0)
+
+    """
+    return 1 if memory == 0 else memory / 15
+
+def _mental_score_curve(attribute, difficulty, points):
+    """Calculate the score of a mental or psionic skill.
+
+    ``attribute`` is the base attribute, ``difficulty`` is a value from
+    ``Skill.DIFFICULTY_CHOICES`` and ``points`` is the number of (effective)
+    points spent in the skill.
+
+    >>> _mental_score_curve(10, 2, 0.25)
+    0
+    >>> _mental_score_curve(10, 2, 3)
+    10
+    >>> _mental_score_curve(10, 2, 8.0)
+    13.0
+    >>> _mental_score_curve(10, 4, 8.0)
+    10.0
+
+    """
+    base_score = attribute - difficulty
+    if points < 0.5:
+        return 0
+    elif points < 1:
+        return base_score
+    elif points < 2:
+        return base_score + 1
+    elif points < 4:
+        return base_score + 2
+    elif difficulty < 4:
+        return base_score + (points // 2) + 1
+    else:
+        return base_score + (points // 4) + 2
+
+def _physical_score_curve(attribute, difficulty, points):
+    """Calculate the score of a physical skill.
+
+    Arguments are as for ``_mental_score_curve``.
+
+    >>> _physical_score_curve(10, 2, 0.25)
+    0
+    >>> _physical_score_curve(10, 2, 6)
+    11
+    >>> _physical_score_curve(10, 2, 16.0)
+    13.0
+
+    """
+    base_score = attribute - difficulty
+    if points < 0.5:
+        return 0
+    elif points < 1:
+        return base_score
+    elif points < 2:
+        return base_score + 1
+    elif points < 4:
+        return base_score + 2
+    elif points < 8:
+        return base_score + 3
+    else:
+        return base_score + (points // 8) + 3
+
+# How each category in ``Skill.CATEGORY_CHOICES`` is scored. Each value is a
+# tuple of (base attribute, memory attribute, score curve). A memory attribute
+# of ``None`` means that points are not affected by memory.
+_SKILL_CATEGORY_RULES = {
+    'Mental': ('intelligence', 'eidetic_memory', _mental_score_curve),
+    'Mental (health)': ('health', 'eidetic_memory', _mental_score_curve),
+    'Physical': ('dexterity', 'muscle_memory', _physical_score_curve),
+    'Physical (health)': ('health', 'muscle_memory', _physical_score_curve),
+    'Physical (strength)': (
+        'strength',
+        'muscle_memory',
+        _physical_score_curve
+    ),
+    'Psionic': ('intelligence', None, _mental_score_curve),
+}
+
+# The rules above, keyed by category ID rather than category name.
+_SKILL_SCORE_RULES = dict(
+    (category_id, _SKILL_CATEGORY_RULES[name])
+    for category_id, name in Skill.CATEGORY_CHOICES
+)
+
+def _skill_score(category, difficulty, points, character):
+    """Calculate a character's score in a skill.
+
+    ``category`` and ``difficulty`` are values from ``Skill.CATEGORY_CHOICES``
+    and ``Skill.DIFFICULTY_CHOICES``. ``points`` is the number of points spent
+    in the skill, and ``character`` is a ``Character`` model object. No queries
+    are made.
+
+    >>> character = Character(intelligence=12, eidetic_memory=30)
+    >>> _skill_score(Skill.get_category_id('Mental'), 2, 2, character)
+    13.0
+    >>> _skill_score(Skill.get_category_id('Psionic'), 2, 2, character)
+    12
+    >>> try:
+    ...     _skill_score(7, 2, 2, character)
+    ... except ValueError:
+    ...     'an exception was raised'
+    'an exception was raised'
+
+    """
+    try:
+        attribute, memory, curve = _SKILL_SCORE_RULES[category]
+    except KeyError:
+        raise ValueError('The category referenced is outside the known set')
+    if memory is not None:
+        points = points * _memory_factor(getattr(character, memory))
+    return curve(getattr(character, attribute), difficulty, points)
+
+def _point_ledger_sql():
+    """Return SQL for computing the buckets in ``PointLedger.BUCKETS``.
+
+    A dict is returned. It is suitable for use as the ``select`` argument to
+    ``QuerySet.extra``. Each value is a correlated subquery against the
+    ``Character`` table.
+
+    >>> sorted(_point_ledger_sql().keys()) == sorted(PointLedger.BUCKETS)
+    True
+
+    """
+    qn = connection.ops.quote_name
+    character_id = '{}.{}'.format(
+        qn(Character._meta.db_table),
+        qn(Character._meta.pk.column),
+    )
+
+    def subquery(model, expression):
+        """Sum ``expression`` over the ``model`` rows owned by a character.
+
+        ``expression`` may reference the ``points`` column of ``model`` as
+        ``{points}``.
+
+        """
+        table = qn(model._meta.db_table)
+        return (
+            'SELECT COALESCE(SUM({expression}), 0) FROM {table} '
+            'WHERE {table}.{character_fk} = {character_id}'
+        ).format(
+            expression=expression.format(
+                points='{}.{}'.format(table, qn('points'))
+            ),
+            table=table,
+            character_fk=qn(model._meta.get_field('character').column),
+            character_id=character_id,
+        )
+
+    return {
+        'skill_points': subquery(CharacterSkill, '{points}'),
+        'spell_points': subquery(CharacterSpell, '{points}'),
+        'advantage_points': subquery(
+            Trait,
+            'CASE WHEN {points} > 0 THEN {points} ELSE 0 END'
+        ),
+        'disadvantage_points': subquery(
+            Trait,
+            'CASE WHEN {points} < 0 THEN {points} ELSE 0 END'
+        ),
+    }
+
+def _point_totals_sql():
+    """Return SQL for computing the points a character has spent and has left.
+
+    A dict with keys ``spent_points`` and ``remaining_points`` is returned. It
+    is suitable for use as the ``select`` argument to ``QuerySet.extra``. The
+    SQL mirrors ``Character.total_points_spent`` and
+    ``Character.points_remaining``.
+
+    >>> sorted(_point_totals_sql().keys())
+    ['remaining_points', 'spent_points']
+
+    """
+    qn = connection.ops.quote_name
+    table = qn(Character._meta.db_table)
+
+    def column(name):
+        """Return the fully qualified name of a ``Character`` column."""
+        return '{}.{}'.format(table, qn(name))
+
+    def attribute(name):
+        """Mirror ``Character._points_in_attribute`` for attribute ``name``."""
+        level = '({} - {})'.format(column(name), column('free_' + name))
+        return (
+            'CASE WHEN {0} < 8 THEN (9 - {0}) * -10 '
+            'WHEN {0} < 9 THEN -15 '
+            'WHEN {0} < 14 THEN ({0} - 10) * 10 '
+            'WHEN {0} < 15 THEN 45 '
+            'WHEN {0} < 18 THEN ({0} - 12) * 20 '
+            'ELSE ({0} - 13) * 25 END'
+        ).format(level)
+
+    ledger = _point_ledger_sql()
+    spent = ' + '.join(
+        ['({})'.format(attribute(name)) for name in (
+            'strength',
+            'dexterity',
+            'intelligence',
+            'health',
+        )] +
+        [column(name) for name in (
+            'eidetic_memory',
+            'muscle_memory',
+            'wealth',
+            'appearance',
+        )] +
+        ['(CASE WHEN {0} = 0 THEN 0 ELSE {0} * 10 + 5 END)'.format(
+            column('magery')
+        )] +
+        ['({})'.format(ledger[name]) for name in PointLedger.BUCKETS]
+    )
+    return {
+        'spent_points': spent,
+        'remaining_points': '{} - ({})'.format(column('total_points'), spent),
+    }
+
+def _possession_totals_sql():
+    """Return SQL for computing the weight and value of each character's items.
+
+    A dict with keys ``possession_weight`` and ``possession_value`` is
+    returned. It is suitable for use as the ``select`` argument to
+    ``QuerySet.extra``. Each value is a correlated subquery against the
+    ``Character`` table.
+
+    >>> sorted(_possession_totals_sql().keys())
+    ['possession_value', 'possession_weight']
+
+    """
+    qn = connection.ops.quote_name
+    possession = qn(Possession._meta.db_table)
+    item = qn(Item._meta.db_table)
+
+    def subquery(item_column):
+        """Sum ``item_column`` times quantity over a character's possessions."""
+        return (
+            'SELECT COALESCE(SUM({item}.{column} * {possession}.{quantity}), '
+            '0) FROM {possession} INNER JOIN {item} '
+            'ON {item}.{item_pk} = {possession}.{item_fk} '
+            'WHERE {possession}.{character_fk} = {character}.{character_pk}'
+        ).format(
+            item=item,
+            column=qn(item_column),
+            possession=possession,
+            quantity=qn('quantity'),
+            item_pk=qn(Item._meta.pk.column),
+            item_fk=qn(Possession._meta.get_field('item').column),
+            character_fk=qn(Possession._meta.get_field('character').column),
+            character=qn(Character._meta.db_table),
+            character_pk=qn(Character._meta.pk.column),
+        )
+
+    return {
+        'possession_weight': subquery('weight'),
+        'possession_value': subquery('value'),
+    }
+
+def _floor_sql(expression):
+    """Return SQL for rounding ``expression`` down to a whole number.
+
+    ``expression`` must not be negative. SQLite has no ``FLOOR`` function, but
+    casting a non-negative number to an integer has the same effect.
+
+    """
+    if connection.vendor == 'sqlite':
+        return 'CAST({} AS INTEGER)'.format(expression)
+    return 'FLOOR({})'.format(expression)
+
+def _memory_factor_sql(memory):
+    """Return SQL mirroring ``_memory_factor``.
+
+    ``memory`` is an SQL expression.
+
+    """
+    return '(CASE WHEN {0} = 0 THEN 1 ELSE {0} / 15.0 END)'.format(memory)
+
+def _mental_score_curve_sql(attribute, difficulty, points):
+    """Return SQL mirroring ``_mental_score_curve``.
+
+    Each argument is an SQL expression.
+
+    """
+    return (
+        'CASE WHEN {points} < 0.5 THEN 0 '
+        'WHEN {points} < 1 THEN {base} '
+        'WHEN {points} < 2 THEN {base} + 1 '
+        'WHEN {points} < 4 THEN {base} + 2 '
+        'WHEN {difficulty} < 4 THEN {base} + {half} + 1 '
+        'ELSE {base} + {quarter} + 2 END'
+    ).format(
+        points=points,
+        difficulty=difficulty,
+        base='({} - {})'.format(attribute, difficulty),
+        half=_floor_sql('{} / 2'.format(points)),
+        quarter=_floor_sql('{} / 4'.format(points)),
+    )
+
+def _physical_score_curve_sql(attribute, difficulty, points):
+    """Return SQL mirroring ``_physical_score_curve``.
+
+    Arguments are as for ``_mental_score_curve_sql``.
+
+    """
+    return (
+        'CASE WHEN {points} < 0.5 THEN 0 '
+        'WHEN {points} < 1 THEN {base} '
+        'WHEN {points} < 2 THEN {base} + 1 '
+        'WHEN {points} < 4 THEN {base} + 2 '
+        'WHEN {points} < 8 THEN {base} + 3 '
+        'ELSE {base} + {eighth} + 3 END'
+    ).format(
+        points=points,
+        base='({} - {})'.format(attribute, difficulty),
+        eighth=_floor_sql('{} / 8'.format(points)),
+    )
+
+# The SQL counterpart of each score curve above.
+_SQL_SCORE_CURVES = {
+    _mental_score_curve: _mental_score_curve_sql,
+    _physical_score_curve: _physical_score_curve_sql,
+}
+
+def _skill_score_sql():
+    """Return SQL for computing the score of each ``CharacterSkill``.
+
+    A dict with key ``skill_score`` is returned. It is suitable for use as the
+    ``select`` argument to ``QuerySet.extra``. The value is a correlated
+    subquery against the ``CharacterSkill`` table which mirrors
+    ``_skill_score``. A skill whose category is not in ``_SKILL_SCORE_RULES``
+    has a score of ``NULL``.
+
+    >>> list(_skill_score_sql().keys())
+    ['skill_score']
+
+    """
+    qn = connection.ops.quote_name
+    character_skill = qn(CharacterSkill._meta.db_table)
+    skill = qn(Skill._meta.db_table)
+    character = qn(Character._meta.db_table)
+
+    def column(table, name):
+        """Return the fully qualified name of a column."""
+        return '{}.{}'.format(table, qn(name))
+
+    whens = []
+    for category_id, (attribute, memory, curve) in sorted(
+            _SKILL_SCORE_RULES.items()):
+        points = column(character_skill, 'points')
+        if memory is not None:
+            points = '({} * {})'.format(
+                points,
+                _memory_factor_sql(column(character, memory))
+            )
+        whens.append('WHEN {} THEN {}'.format(
+            category_id,
+            _SQL_SCORE_CURVES[curve](
+                column(character, attribute),
+                column(skill, 'difficulty'),
+                points,
+            )
+        ))
+    return {'skill_score': (
+        'SELECT CASE {category} {whens} END '
+        'FROM {skill}, {character} '
+        'WHERE {skill_pk} = {skill_fk} AND {character_pk} = {character_fk}'
+    ).format(
+        category=column(skill, 'category'),
+        whens=' '.join(whens),
+        skill=skill,
+        character=character,
+        skill_pk=column(skill, Skill._meta.pk.column),
+        skill_fk=column(
+            character_skill,
+            CharacterSkill._meta.get_field('skill').column
+        ),
+        character_pk=column(character, Character._meta.pk.column),
+        character_fk=column(
+            character_skill,
+            CharacterSkill._meta.get_field('character').column
+        ),
+    )}
+
+def _spell_score_sql():
+    """Return SQL for computing the score of each ``CharacterSpell``.
+
+    A dict with key ``spell_score`` is returned. It is suitable for use as the
+    ``select`` argument to ``QuerySet.extra``. The value is a correlated
+    subquery against the ``CharacterSpell`` table which mirrors
+    ``CharacterSpell.score``.
+
+    >>> list(_spell_score_sql().keys())
+    ['spell_score']
+
+    """
+    qn = connection.ops.quote_name
+    character_spell = qn(CharacterSpell._meta.db_table)
+    spell = qn(Spell._meta.db_table)
+    character = qn(Character._meta.db_table)
+
+    def column(table, name):
+        """Return the fully qualified name of a column."""
+        return '{}.{}'.format(table, qn(name))
+
+    attribute = '({} + {} + {})'.format(
+        column(character, 'intelligence'),
+        column(character, 'magery'),
+        _floor_sql('{} / 30'.format(column(character, 'eidetic_memory'))),
+    )
+    return {'spell_score': (
+        'SELECT {curve} FROM {spell}, {character} '
+        'WHERE {spell_pk} = {spell_fk} AND {character_pk} = {character_fk}'
+    ).format(
+        curve=_mental_score_curve_sql(
+            attribute,
+            column(spell, 'difficulty'),
+            column(character_spell, 'points'),
+        ),
+        spell=spell,
+        character=character,
+        spell_pk=column(spell, Spell._meta.pk.column),
+        spell_fk=column(
+            character_spell,
+            CharacterSpell._meta.get_field('spell').column
+        ),
+        character_pk=column(character, Character._meta.pk.column),
+        character_fk=column(
+            character_spell,
+            CharacterSpell._meta.get_field('character').column
+        ),
+    )}
+
 def _get_choice_id(choices, choice_name):
     """Given a name from ``choices``, return its ID.
 
@@ -0,0 +1,102 @@
+"""Find and describe the profiles written by ``ProfileMiddleware``.
+
+See ``gurps_manager.middleware.ProfileMiddleware`` for how a view is profiled.
+Superusers can list and download profiles from the admin site.
+
+"""
+from datetime import datetime
+from django.conf import settings
+import cProfile
+import os
+import re
+import tracemalloc
+
+# Where profiles are written, unless the ``GURPS_MANAGER_PROFILE_DIR`` setting
+# names another directory.
+DEFAULT_PROFILE_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    '..',
+    'profiles',
+))
+
+# How many of the lines which allocated the most memory are reported.
+TOP_ALLOCATIONS = 25
+
+# Matches the name of a file written by ``ProfileMiddleware``.
+PROFILE_FILE_NAME = re.compile(r'^[\w-]+\.(?:prof|txt)$')
+
+def profile_dir():
+    """Return the directory to which profiles are written."""
+    return getattr(settings, 'GURPS_MANAGER_PROFILE_DIR', DEFAULT_PROFILE_DIR)
+
+def profile_name(request, now=None):
+    """Return a name for the profile of ``request``, without an extension.
+
+    The name is made of the time and the name of the URL requested.
+
+    >>> from django.test.client import RequestFactory
+    >>> request = RequestFactory().get('/')
+    >>> profile_name(request, datetime(2014, 5, 1, 12, 30, 15, 5))
+    '20140501-123015-000005-view'
+
+    """
+    if now is None:
+        now = datetime.now()
+    url_name = getattr(request.resolver_match, 'url_name', None) or 'view'
+    return '{:%Y%m%d-%H%M%S-%f}-{}'.format(now, url_name)
+
+def allocation_report(request, snapshot):
+    """Describe the lines which allocated the most memory in ``snapshot``.
+
+    ``snapshot`` is a ``tracemalloc.Snapshot`` taken while handling
+    ``request``. Allocations made by the profilers themselves are left out.
+
+    """
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+    ))
+    lines = ['{} {}'.format(request.method, request.get_full_path()), '']
+    for statistic in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+        lines.append(str(statistic))
+    return '\n'.join(lines) + '\n'
+
+def profile_files():
+    """Return a list describing each profile file, newest first.
+
+    Each item is a dict with the file's ``name``, its ``size`` in bytes and
+    the time it was ``modified``.
+
+    """
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    files = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if PROFILE_FILE_NAME.match(name) and os.path.isfile(path):
+            files.append({
+                'name': name,
+                'size': os.path.getsize(path),
+                'modified': datetime.fromtimestamp(os.path.getmtime(path)),
+            })
+    files.sort(key=lambda file_: file_['name'], reverse=True)
+    return files
+
+def profile_file_path(name):
+    """Return the path to profile file ``name``, or ``None`` if there is none.
+
+    Only names of the form written by ``ProfileMiddleware`` are accepted, so a
+    name cannot reach outside of ``profile_dir()``.
+
+    >>> profile_file_path('../settings.py') is None
+    True
+
+    """
+    if PROFILE_FILE_NAME.match(name) is None:
+        return None
+    path = os.path.join(profile_dir(), name)
+    if not os.path.isfile(path):
+        return None
+    return path
@@ -0,0 +1,66 @@
+"""A session engine which only writes sessions whose data has changed.
+
+Django's ``SessionMiddleware`` saves a session whenever it is marked as
+modified. A session is marked as modified by any assignment or deletion, even
+one which leaves its data as it was, such as logging in as the user who is
+already logged in. With SQLite, each of those saves takes the database's only
+write lock.
+
+The ``SessionStore`` in this module is a ``cached_db`` store, so reads are
+served from Django's cache framework. It also remembers the data it last read
+from or wrote to the database, and skips a save if the data is unchanged. To
+use it, set ``SESSION_ENGINE`` to ``'gurps_manager.sessions'``.
+
+A skipped save does not push back the session's expiry date in the database.
+This is no different from a request which does not touch the session at all.
+
+"""
+from copy import deepcopy
+from django.contrib.sessions.backends import cached_db
+
+class SessionStore(cached_db.SessionStore):
+    """A ``cached_db`` session store which skips saves that change nothing.
+
+    >>> store = SessionStore()
+    >>> store.is_stored({})
+    False
+    >>> store._stored_data = {'a': 1}
+    >>> store.is_stored({'a': 1})
+    True
+    >>> store.is_stored({'a': 2})
+    False
+
+    """
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # The session data as it is in the database, or ``None`` if unknown.
+        self._stored_data = None
+
+    def is_stored(self, data):
+        """Tell whether ``data`` is what the database already holds."""
+        return self._stored_data is not None and data == self._stored_data
+
+    def load(self):
+        """Load the session data, and remember it as the stored data."""
+        data = super().load()
+        self._stored_data = deepcopy(data)
+        return data
+
+    def save(self, must_create=False):
+        """Save the session data, unless the database already holds it.
+
+        A new session is always saved.
+
+        """
+        data = self._get_session(no_load=must_create)
+        if not must_create and self.session_key is not None \
+                and self.is_stored(data):
+            return
+        super().save(must_create)
+        self._stored_data = deepcopy(data)
+
+    def delete(self, session_key=None):
+        """Delete a session, and forget the stored data if it is this one."""
+        super().delete(session_key)
+        if session_key is None or session_key == self.session_key:
+            self._stored_data = None
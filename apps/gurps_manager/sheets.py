@@ -0,0 +1,66 @@
+"""Load everything shown on a character sheet in a fixed number of queries."""
+from django.db.models.query import prefetch_related_objects
+from gurps_manager import models
+
+class CharacterSheet(object):
+    """A character and the stats and objects shown on its sheet.
+
+    ``character`` is a ``Character`` model object, preferably fetched with
+    ``Character.objects.for_sheet()``. The following attributes are set:
+
+    ``character``
+        The ``character`` passed in.
+    ``ledger``
+        The ``PointLedger`` for ``character``.
+    ``skills``, ``spells``, ``possessions``, ``traits``, ``hit_locations``
+        Lists of the ``CharacterSkill``, ``CharacterSpell``, ``Possession``,
+        ``Trait`` and ``HitLocation`` objects belonging to ``character``.
+    ``movement``, ``dodge``
+        Derived stats which depend on the objects above.
+
+    >>> sheet = CharacterSheet(models.Character(total_points=100))
+    >>> sheet.skills, sheet.ledger.remaining() == 100
+    ([], True)
+
+    """
+    def __init__(self, character):
+        self.character = character
+        if character.pk is None:
+            self.skills = []
+            self.spells = []
+            self.possessions = []
+            self.traits = []
+            self.hit_locations = []
+        else:
+            self.skills = list(character.characterskill_set.all())
+            self.spells = list(character.characterspell_set.all())
+            self.possessions = list(character.possession_set.all())
+            self.traits = list(character.trait_set.all())
+            self.hit_locations = list(character.hitlocation_set.all())
+        self.ledger = character.point_ledger()
+        self.movement = character.movement()
+        self.dodge = character.dodge()
+
+    @classmethod
+    def load(cls, character_id):
+        """Fetch the character with ID ``character_id`` and its sheet.
+
+        Raise ``Character.DoesNotExist`` if no such character exists.
+
+        """
+        return cls(models.Character.objects.for_sheet().get( # pylint: disable=E1101
+            id=character_id
+        ))
+
+    @classmethod
+    def prefetch(cls, character):
+        """Fetch the objects shown on ``character``'s sheet. Return the sheet.
+
+        ``character`` is a ``Character`` model object, preferably fetched with
+        its campaign and owner. The same relations are prefetched as by
+        ``Character.objects.for_sheet()``. This lets a view check that a user
+        may see ``character`` before fetching the rest of its sheet.
+
+        """
+        prefetch_related_objects([character], models.Character.SHEET_RELATIONS)
+        return cls(character)
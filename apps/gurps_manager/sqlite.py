@@ -0,0 +1,53 @@
+"""Tune each new SQLite connection for serving concurrent requests.
+
+By default, SQLite uses a rollback journal. A transaction which writes to the
+database locks out every reader while it commits, so pages which only read,
+such as a character sheet, wait on any formset being saved. In write-ahead log
+(WAL) mode, readers are never blocked by a writer, and a writer is only blocked
+by another writer.
+
+The receiver in this module executes ``PRAGMAS`` on every new connection to a
+SQLite database. Connections to other databases are left alone. To measure the
+effect of ``PRAGMAS``, run ``manage.py benchmark_sqlite``.
+
+"""
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Statements executed on each new SQLite connection, in order.
+#
+# ``journal_mode`` is stored in the database file, and the rest only last as
+# long as the connection. ``synchronous=NORMAL`` is safe in WAL mode: a power
+# loss may roll back the last few transactions, but cannot corrupt the
+# database. A negative ``cache_size`` is in KiB.
+PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA cache_size=-16384',
+    'PRAGMA mmap_size=67108864',
+    'PRAGMA temp_store=MEMORY',
+)
+
+def apply_pragmas(cursor, pragmas=PRAGMAS):
+    """Execute each of ``pragmas`` with ``cursor``.
+
+    >>> import sqlite3
+    >>> cursor = sqlite3.connect(':memory:').cursor()
+    >>> apply_pragmas(cursor)
+    >>> cursor.execute('PRAGMA synchronous').fetchone()
+    (1,)
+    >>> cursor.execute('PRAGMA busy_timeout').fetchone()
+    (5000,)
+
+    """
+    for pragma in pragmas:
+        # Some pragmas, like ``journal_mode``, return a row. Consume it.
+        cursor.execute(pragma).fetchall()
+
+@receiver(connection_created)
+def _tune_sqlite_connection(sender, connection, **kwargs): # pylint: disable=W0613,C0301
+    """Apply ``PRAGMAS`` to ``connection`` if it is a SQLite connection."""
+    if connection.vendor == 'sqlite':
+        # Use the DB-API connection, so the pragmas are not logged as queries.
+        apply_pragmas(connection.connection.cursor())
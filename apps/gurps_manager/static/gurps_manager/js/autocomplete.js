@@ -0,0 +1,75 @@
+/* Fill in the choices of autocompleting select widgets.
+ *
+ * Each <select> with a "data-autocomplete-url" attribute is given a search box.
+ * As the user types, the choices whose names start with the search text are
+ * fetched from that URL and listed in the <select>. The URL must return a JSON
+ * list of objects with an "id" and a "text", as the "*Choices" views in
+ * views.py do. See class AutocompleteSelect in forms.py.
+ */
+(function () {
+    'use strict';
+
+    // How long to wait after a keystroke before searching, in milliseconds.
+    var DELAY = 200;
+
+    // Replace the unselected options of `select` with `results`.
+    function setChoices(select, results) {
+        var i, option;
+        for (i = select.options.length - 1; i >= 0; i -= 1) {
+            option = select.options[i];
+            if (option.value !== '' && !option.selected) {
+                select.removeChild(option);
+            }
+        }
+        for (i = 0; i < results.length; i += 1) {
+            if (String(results[i].id) !== select.value) {
+                select.appendChild(new Option(results[i].text, results[i].id));
+            }
+        }
+    }
+
+    // Fetch the choices matching `query`, then list them in `select`.
+    function search(select, query) {
+        var request = new XMLHttpRequest();
+        var url = select.getAttribute('data-autocomplete-url');
+        request.open('GET', url + '?q=' + encodeURIComponent(query));
+        request.onload = function () {
+            if (request.status === 200) {
+                setChoices(select, JSON.parse(request.responseText));
+            }
+        };
+        request.send();
+    }
+
+    // Give `select` a search box. Until the user searches, the first choices
+    // are fetched when `select` is first focused.
+    function attach(select) {
+        var input = document.createElement('input');
+        var searched = false;
+        var timer = null;
+        input.type = 'search';
+        input.placeholder = 'Search';
+        input.addEventListener('input', function () {
+            searched = true;
+            window.clearTimeout(timer);
+            timer = window.setTimeout(function () {
+                search(select, input.value);
+            }, DELAY);
+        });
+        select.addEventListener('focus', function () {
+            if (!searched) {
+                searched = true;
+                search(select, '');
+            }
+        });
+        select.parentNode.insertBefore(input, select);
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        var selects = document.querySelectorAll('select[data-autocomplete-url]');
+        var i;
+        for (i = 0; i < selects.length; i += 1) {
+            attach(selects[i]);
+        }
+    });
+}());
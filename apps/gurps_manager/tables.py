@@ -6,6 +6,7 @@ https://github.com/bradleyayers/django-tables2
 
 """
 from django.core.urlresolvers import reverse
+from django.db.models.query import QuerySet
 from django.utils.safestring import mark_safe
 from gurps_manager import models
 import django_tables2 as tables
@@ -23,6 +24,43 @@ import django_tables2 as tables
 #
 # pylint: disable=R0201
 # Framework requires use of methods rather than functions
+
+class RelatedTable(tables.Table):
+    """A table which fetches the related objects its columns read.
+
+    Subclasses list the relations read when rendering a row in
+    ``select_related`` and ``prefetch_related``. If a table is given a
+    ``QuerySet``, those relations are fetched along with the rows, so rendering
+    a table makes the same number of queries no matter how many rows it has.
+
+    """
+    select_related = ()
+    prefetch_related = ()
+
+    def __init__(self, data, *args, **kwargs):
+        if isinstance(data, QuerySet):
+            data = self.fetch_related(data)
+        super().__init__(data, *args, **kwargs)
+
+    @classmethod
+    def fetch_related(cls, queryset):
+        """Return ``queryset``, set to fetch the relations this table reads.
+
+        >>> from gurps_manager import models
+        >>> queryset = PossessionTable.fetch_related(
+        ...     models.Possession.objects.all()
+        ... )
+        >>> queryset.query.select_related
+        {'item': {}}
+
+        """
+        # Calling select_related() without arguments follows every relation.
+        if cls.select_related:
+            queryset = queryset.select_related(*cls.select_related)
+        if cls.prefetch_related:
+            queryset = queryset.prefetch_related(*cls.prefetch_related)
+        return queryset
+
 def campaign_table(user):
     """Generate a table class for ``Campaign`` objects.
 
@@ -43,8 +81,9 @@ def campaign_table(user):
     True
 
     """
-    class CampaignTable(tables.Table):
+    class CampaignTable(RelatedTable):
         """An HTML table displaying ``Campaign`` objects."""
+        select_related = ('owner',)
         actions = tables.Column(empty_values=(), orderable=False)
 
         class Meta(object):
@@ -68,7 +107,7 @@ def campaign_table(user):
             consequently, a row in the table).
 
             """
-            if record.owner == user or user.is_superuser:
+            if record.owner_id == user.id or user.is_superuser:
                 return mark_safe(_restful_links('campaign', record.id))
             else:
                 return mark_safe('<a href="{}">View</a>'.format(
@@ -97,9 +136,12 @@ def character_table(user):
     True
 
     """
-    class CharacterTable(tables.Table):
+    class CharacterTable(RelatedTable):
         """An HTML table displaying ``Character`` objects."""
-        spent_points = tables.Column(empty_values=(), orderable=False)
+        # These columns can only be ordered if the table's data is fetched with
+        # ``Character.objects.with_point_totals()``.
+        spent_points = tables.Column(empty_values=())
+        remaining_points = tables.Column(empty_values=())
         actions = tables.Column(empty_values=(), orderable=False)
 
         class Meta(object):
@@ -113,7 +155,15 @@ def character_table(user):
             ``record`` represents a row of data from this table.
 
             """
-            return record.total_points_spent()
+            return record.point_ledger().spent()
+
+        def render_remaining_points(self, record):
+            """Define how the ``remaining_points`` column should be rendered.
+
+            ``record`` represents a row of data from this table.
+
+            """
+            return record.point_ledger().remaining()
 
         def render_description(self, value):
             """Define how the ``description`` column should be rendered.
@@ -138,7 +188,7 @@ def character_table(user):
             consequently, a row in the table).
 
             """
-            if record.owner == user or user.is_superuser:
+            if record.owner_id == user.id or user.is_superuser:
                 return mark_safe(_restful_links('character', record.id))
             else:
                 return mark_safe('<a href="{}">View</a>'.format(
@@ -147,11 +197,14 @@ def character_table(user):
 
     return CharacterTable
 
-class CharacterSkillTable(tables.Table):
+class CharacterSkillTable(RelatedTable):
     """An HTML table displaying ``CharacterSkill`` objects."""
-    score = tables.Column(empty_values=(), orderable=False)
-    category = tables.Column(empty_values=(), orderable=False)
-    difficulty = tables.Column(empty_values=(), orderable=False)
+    select_related = ('skill', 'character')
+    # Ordering by score requires a queryset from
+    # ``CharacterSkill.objects.with_scores``.
+    score = tables.Column(empty_values=(), order_by=('skill_score',))
+    category = tables.Column(empty_values=(), order_by=('skill.category',))
+    difficulty = tables.Column(empty_values=(), order_by=('skill.difficulty',))
 
     class Meta(object):
         """Table attributes that are not custom fields."""
@@ -178,21 +231,34 @@ class CharacterSkillTable(tables.Table):
     def render_score(self, record):
         """Define how the ``score`` column should be rendered.
 
-        ``record`` represents a row of data from this table
+        ``record`` represents a row of data from this table. Its
+        ``skill_score`` annotation is used if present.
 
         """
-        return int(record.score())
+        score = getattr(record, 'skill_score', None)
+        if score is None:
+            score = record.score()
+        return int(score)
 
-class CharacterSpellTable(tables.Table):
+class CharacterSpellTable(RelatedTable):
     """An HTML table displaying ``CharacterSpell`` objects."""
-    score = tables.Column(empty_values=(), orderable=False)
-    school = tables.Column(empty_values=(), orderable=False)
-    resist = tables.Column(empty_values=(), orderable=False)
-    duration = tables.Column(empty_values=(), orderable=False)
-    cast_time = tables.Column(empty_values=(), orderable=False)
-    initial_fatigue_cost = tables.Column(empty_values=(), orderable=False)
-    maintenance_fatigue_cost = tables.Column(empty_values=(), orderable=False)
-    difficulty = tables.Column(empty_values=(), orderable=False)
+    select_related = ('spell', 'character')
+    # Ordering by score requires a queryset from
+    # ``CharacterSpell.objects.with_scores``.
+    score = tables.Column(empty_values=(), order_by=('spell_score',))
+    school = tables.Column(empty_values=(), order_by=('spell.school',))
+    resist = tables.Column(empty_values=(), order_by=('spell.resist',))
+    duration = tables.Column(empty_values=(), order_by=('spell.duration',))
+    cast_time = tables.Column(empty_values=(), order_by=('spell.cast_time',))
+    initial_fatigue_cost = tables.Column(
+        empty_values=(),
+        order_by=('spell.initial_fatigue_cost',)
+    )
+    maintenance_fatigue_cost = tables.Column(
+        empty_values=(),
+        order_by=('spell.maintenance_fatigue_cost',)
+    )
+    difficulty = tables.Column(empty_values=(), order_by=('spell.difficulty',))
 
     class Meta(object):
         """Table attributes that are not custom fields."""
@@ -203,10 +269,14 @@ class CharacterSpellTable(tables.Table):
     def render_score(self, record):
         """Define how the ``score`` column should be rendered.
 
-        ``record`` represents a row of data from this table
+        ``record`` represents a row of data from this table. Its
+        ``spell_score`` annotation is used if present.
 
         """
-        return int(record.score())
+        score = getattr(record, 'spell_score', None)
+        if score is None:
+            score = record.score()
+        return int(score)
 
     def render_school(self, record):
         """Define how the ``school`` column should be rendered.
@@ -266,8 +336,9 @@ class CharacterSpellTable(tables.Table):
         return record.spell.get_difficulty_display
 
 
-class PossessionTable(tables.Table):
+class PossessionTable(RelatedTable):
     """An HTML table displaying ``Possession`` objects."""
+    select_related = ('item',)
     value = tables.Column(empty_values=(), orderable=False)
     total_value = tables.Column(empty_values=(), orderable=False)
     weight = tables.Column(empty_values=(), orderable=False)
@@ -320,7 +391,7 @@ class PossessionTable(tables.Table):
         """
         return '{:.2f} lbs.'.format(record.item.weight * record.quantity)
 
-class TraitTable(tables.Table):
+class TraitTable(RelatedTable):
     """An HTML table displaying ``Trait`` objects."""
 
     class Meta(object):
@@ -337,7 +408,7 @@ class TraitTable(tables.Table):
         """
         return _truncate_string(value)
 
-class HitLocationTable(tables.Table):
+class HitLocationTable(RelatedTable):
     """An HTML table displaying ``HitLocation`` objects."""
 
     class Meta(object):
@@ -354,13 +425,13 @@ class HitLocationTable(tables.Table):
         """
         return _truncate_string(value)
 
-class ItemTable(tables.Table):
+class ItemTable(RelatedTable):
     """An HTML table displaying ``Item`` objects."""
 
     class Meta(object):
         """Table attributes that are not custom fields."""
         model = models.Item
-        exclude = ('campaign', 'id',)
+        exclude = ('campaign', 'id', 'key')
 
     def render_description(self, value):
         """Define how the ``description`` column should be rendered.
@@ -370,14 +441,14 @@ class ItemTable(tables.Table):
         """
         return _truncate_string(value)
 
-class SpellTable(tables.Table):
+class SpellTable(RelatedTable):
     """An HTML table displaying ``Spell`` objects."""
 
     class Meta(object):
         """Table attributes that are not custom fields."""
         model = models.Spell
         sequence = ('name', 'difficulty', '...',)
-        exclude = ('campaign', 'id',)
+        exclude = ('campaign', 'id', 'key')
 
     def render_difficulty(self, record):
         """Define how the ``difficulty`` column should be rendered.
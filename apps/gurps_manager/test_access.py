@@ -0,0 +1,87 @@
+"""Unit tests for the ``access`` module."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from gurps_manager import access, factories, models
+
+# pylint: disable=E1101
+# Class 'CampaignFactory' has no 'create' member (no-member)
+#
+# pylint: disable=R0904
+# Classes inheriting from TestCase will have 60+ too many public methods, and
+# that's not something I have control over. Ignore it.
+
+class GetAccessMapTestCase(TestCase):
+    """Tests for ``get_access_map``."""
+    def setUp(self):
+        """Create a character and cache its owner's access map."""
+        self.character = factories.CharacterFactory.create()
+        self.user = self.character.owner
+        access.get_access_map(self.user)
+
+    def test_cached(self):
+        """Ensure a cached access map is used without querying."""
+        with self.assertNumQueries(0):
+            access_map = access.get_access_map(self.user)
+        self.assertTrue(access_map.owns_character(self.character))
+        self.assertTrue(access_map.can_view_campaign(self.character.campaign))
+
+    def test_campaign_owner_changes(self):
+        """Give ``self.character``'s campaign to ``self.user``, and back."""
+        campaign = self.character.campaign
+        previous_owner = campaign.owner
+        other_character = factories.CharacterFactory.create(campaign=campaign)
+        self.assertFalse(
+            access.get_access_map(self.user).owns_character(other_character)
+        )
+        self.assertTrue(
+            access.get_access_map(previous_owner).owns_character(
+                other_character
+            )
+        )
+        campaign.owner = self.user
+        campaign.save()
+        self.assertTrue(
+            access.get_access_map(self.user).owns_character(other_character)
+        )
+        self.assertFalse(
+            access.get_access_map(previous_owner).owns_character(
+                other_character
+            )
+        )
+
+    def test_character_campaign_changes(self):
+        """Move ``self.character`` to another campaign."""
+        old_campaign = self.character.campaign
+        self.character.campaign = factories.CampaignFactory.create()
+        self.character.save()
+        access_map = access.get_access_map(self.user)
+        self.assertFalse(access_map.can_view_campaign(old_campaign))
+        self.assertTrue(access_map.can_view_campaign(self.character.campaign))
+
+    def test_character_deleted(self):
+        """Delete ``self.character``."""
+        campaign = self.character.campaign
+        self.character.delete()
+        self.assertFalse(
+            access.get_access_map(self.user).can_view_campaign(campaign)
+        )
+
+    def test_save_query_count(self):
+        """Ensure saving does not query for the previous owner."""
+        character = models.Character.objects.get(pk=self.character.pk)
+        with CaptureQueriesContext(connection) as context:
+            character.save(update_fields=['name'])
+        self.assertEqual(len(context), 1)
+
+    def test_character_owner_changes(self):
+        """Give ``self.character`` to another user."""
+        character = models.Character.objects.get(pk=self.character.pk)
+        character.owner = factories.create_user()[0]
+        character.save()
+        self.assertFalse(
+            access.get_access_map(self.user).owns_character(character)
+        )
+        self.assertTrue(
+            access.get_access_map(character.owner).owns_character(character)
+        )
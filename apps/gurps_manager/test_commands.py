@@ -0,0 +1,85 @@
+"""Unit tests for the commands in ``management.commands``."""
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from gurps_manager.management.commands import audit_indexes
+from io import StringIO
+
+# pylint: disable=R0904
+# Classes inheriting from TestCase will have 60+ too many public methods, and
+# that's not something I have control over. Ignore it.
+
+class AuditIndexesTestCase(TestCase):
+    """Tests for the ``audit_indexes`` command."""
+    def test_full_scans(self):
+        """Ensure ``full_scans`` explains queries with parameters."""
+        sql = 'SELECT * FROM gurps_manager_item WHERE {} = %s'
+        self.assertEqual(
+            list(audit_indexes.full_scans(sql.format('description'), ['x'])),
+            ['gurps_manager_item']
+        )
+        self.assertEqual(
+            list(audit_indexes.full_scans(sql.format('id'), [1])),
+            []
+        )
+
+    def test_capture_queries(self):
+        """Ensure the raw SQL and parameters of each query are captured."""
+        sample = audit_indexes._sample_objects() # pylint: disable=W0212
+        captured = audit_indexes._capture_queries(sample) # pylint: disable=W0212,C0301
+        self.assertTrue(any(queries for _, queries in captured))
+        for _, queries in captured:
+            for sql, params in queries:
+                self.assertFalse(sql.startswith('QUERY ='), sql)
+                list(audit_indexes.full_scans(sql, params))
+
+    def test_every_url(self):
+        """Ensure every named URL is audited, with extra query strings."""
+        sample = audit_indexes._sample_objects() # pylint: disable=W0212
+        paths = [
+            path for path, _
+            in audit_indexes._capture_queries(sample) # pylint: disable=W0212
+        ]
+        for url_name in ('gurps-manager-login', 'gurps-manager-index'):
+            self.assertIn(reverse(url_name), paths)
+        skills_url = reverse(
+            'gurps-manager-character-id-skills',
+            args=[sample[1]['character'].id]
+        )
+        self.assertIn(skills_url, paths)
+        self.assertIn(skills_url + '?sort=score', paths)
+
+    def test_command(self):
+        """Ensure the audit passes when the default tables may be scanned."""
+        stdout = StringIO()
+        call_command('audit_indexes', stdout=stdout)
+        self.assertIn('No query scans a whole table.', stdout.getvalue())
+
+    def test_command_failure(self):
+        """Ensure queries which scan a table are reported, and fail the audit.
+
+        The campaign and character forms scan ``auth_user``. That table is
+        allowed by default, so nothing may be scanned for this test.
+
+        """
+        stdout = StringIO()
+        with self.settings(GURPS_MANAGER_AUDIT_ALLOW=()):
+            with self.assertRaises(CommandError) as context:
+                call_command('audit_indexes', stdout=stdout)
+        count = int(str(context.exception).split()[0])
+        self.assertGreater(count, 0)
+        self.assertEqual(stdout.getvalue().count(' scans '), count)
+        self.assertIn('auth_user', stdout.getvalue())
+        self.assertNotIn('No query scans a whole table.', stdout.getvalue())
+
+    def test_command_allow(self):
+        """Ensure the ``--allow`` option adds to the tables allowed."""
+        stdout = StringIO()
+        with self.settings(GURPS_MANAGER_AUDIT_ALLOW=()):
+            call_command(
+                'audit_indexes',
+                allow=list(audit_indexes.DEFAULT_ALLOWED_SCANS),
+                stdout=stdout
+            )
+        self.assertIn('No query scans a whole table.', stdout.getvalue())
@@ -4,8 +4,11 @@ Each test case in this module tests a single form. For example, the
 ``CampaignFormTestCase`` tests just the ``CampaignForm`` form.
 
 """
+from django.db import connection
+from django.db.models.signals import post_save
 from django.test import TestCase
-from gurps_manager import factories, forms
+from django.test.utils import CaptureQueriesContext
+from gurps_manager import factories, forms, models
 
 # pylint: disable=E1101
 # Class 'FooForm' has no 'create' member (no-member)
@@ -293,3 +296,196 @@ class CharacterFormTestCase(TestCase):
         del attributes['used_fatigue']
         form = forms.CharacterForm(attributes)
         self.assertFalse(form.is_valid())
+
+class PossessionFormsetTestCase(TestCase):
+    """Tests for ``possession_formset``."""
+    def setUp(self):
+        """Create a character and several items in its campaign."""
+        self.character = factories.CharacterFactory.create()
+        self.items = factories.ItemFactory.create_batch(
+            4,
+            campaign=self.character.campaign
+        )
+
+    def _add_possessions(self, items):
+        """Give ``self.character`` one of each item in ``items``."""
+        for item in items:
+            factories.PossessionFactory.create(
+                character=self.character,
+                item=item
+            )
+
+    def _formset(self, data=None):
+        """Return a possession formset for ``self.character``."""
+        formset_cls = forms.possession_formset(self.character)
+        return formset_cls(data, instance=self.character)
+
+    def _data(self):
+        """Return POST data resubmitting ``self.character``'s possessions."""
+        possessions = list(self.character.possession_set.order_by('id'))
+        data = {
+            'possession_set-INITIAL_FORMS': str(len(possessions)),
+            'possession_set-TOTAL_FORMS': str(len(possessions)),
+            'possession_set-MAX_NUM_FORMS': '1000',
+        }
+        for i, possession in enumerate(possessions):
+            data['possession_set-{}-id'.format(i)] = str(possession.id)
+            data['possession_set-{}-item'.format(i)] = str(possession.item_id)
+            data['possession_set-{}-quantity'.format(i)] = str(
+                possession.quantity
+            )
+        return data
+
+    def test_render_query_count(self):
+        """Ensure rendering does not query once per form."""
+        def render():
+            """Render a formset and return the number of queries made."""
+            with CaptureQueriesContext(connection) as context:
+                html = self._formset().as_p()
+            return len(context), html
+
+        self._add_possessions(self.items[:1])
+        num_queries = render()[0]
+        self._add_possessions(self.items[1:])
+        self.assertEqual(render()[0], num_queries)
+
+        # Each item is selected in exactly one form.
+        html = render()[1]
+        for item in self.items:
+            self.assertEqual(
+                html.count('<option value="{}" selected'.format(item.id)),
+                1
+            )
+
+    def test_validate_query_count(self):
+        """Ensure validation does not query once per form."""
+        def validate():
+            """Validate a formset and return the number of queries made."""
+            formset = self._formset(self._data())
+            with CaptureQueriesContext(connection) as context:
+                self.assertTrue(formset.is_valid())
+            return len(context)
+
+        self._add_possessions(self.items[:1])
+        num_queries = validate()
+        self._add_possessions(self.items[1:])
+        self.assertEqual(validate(), num_queries)
+
+    def test_invalid_item(self):
+        """Submit an item from some other campaign."""
+        self._add_possessions(self.items[:1])
+        data = self._data()
+        data['possession_set-0-item'] = str(factories.ItemFactory.create().id)
+        self.assertFalse(self._formset(data).is_valid())
+
+    def test_save(self):
+        """Change, delete and add possessions, then save the formset."""
+        self._add_possessions(self.items[:3])
+        possessions = list(self.character.possession_set.order_by('id'))
+        data = self._data()
+        data['possession_set-1-quantity'] = '7'
+        data['possession_set-2-DELETE'] = 'on'
+        data['possession_set-TOTAL_FORMS'] = '4'
+        data['possession_set-3-item'] = str(self.items[3].id)
+        data['possession_set-3-quantity'] = '2'
+        formset = self._formset(data)
+        self.assertTrue(formset.is_valid())
+        formset.save()
+
+        self.assertEqual(
+            [obj.id for obj, _ in formset.changed_objects],
+            [possessions[1].id]
+        )
+        self.assertEqual(
+            [obj.id for obj in formset.deleted_objects],
+            [possessions[2].id]
+        )
+        quantities = self.character.possession_set.values_list(
+            'item',
+            'quantity'
+        )
+        self.assertEqual(
+            dict(quantities),
+            {
+                self.items[0].id: possessions[0].quantity,
+                self.items[1].id: 7,
+                self.items[3].id: 2,
+            }
+        )
+        self.assertAlmostEqual(
+            models.Character.objects.get(
+                pk=self.character.pk
+            ).cached_possession_weight,
+            self.items[0].weight * possessions[0].quantity
+            + self.items[1].weight * 7
+            + self.items[3].weight * 2
+        )
+
+    def test_save_new_primary_keys(self):
+        """Ensure objects created in bulk have their primary keys set.
+
+        ``post_save`` receivers must see them, and ``new_objects`` must hold
+        them in the order of their forms.
+
+        """
+        self._add_possessions(self.items[:1])
+        data = self._data()
+        data['possession_set-TOTAL_FORMS'] = '3'
+        for i, item in enumerate(self.items[1:3], 1):
+            data['possession_set-{}-item'.format(i)] = str(item.id)
+            data['possession_set-{}-quantity'.format(i)] = '1'
+        saved = []
+
+        def receiver(instance, created, **kwargs): # pylint: disable=W0613
+            """Record the primary key of each object created."""
+            if created:
+                saved.append(instance.pk)
+
+        formset = self._formset(data)
+        self.assertTrue(formset.is_valid())
+        post_save.connect(receiver, sender=models.Possession)
+        try:
+            formset.save()
+        finally:
+            post_save.disconnect(receiver, sender=models.Possession)
+
+        self.assertEqual(saved, [obj.pk for obj in formset.new_objects])
+        self.assertEqual(
+            [(obj.pk, obj.item_id) for obj in formset.new_objects],
+            list(models.Possession.objects.filter(
+                character=self.character,
+                item__in=self.items[1:3]
+            ).order_by('pk').values_list('pk', 'item'))
+        )
+
+class AutocompleteSelectTestCase(TestCase):
+    """Tests for ``AutocompleteSelect``."""
+    def setUp(self):
+        """Create a field whose widget is an ``AutocompleteSelect``."""
+        self.items = factories.ItemFactory.create_batch(3)
+        self.field = forms.SharedModelChoiceField(
+            forms.ChoiceCache(models.Item.objects.all()),
+            widget=forms.AutocompleteSelect('/choices/')
+        )
+
+    def test_selected_only(self):
+        """Ensure only the empty and selected choices are rendered."""
+        html = self.field.widget.render('item', self.items[0].id)
+        self.assertEqual(html.count('<option'), 2)
+        self.assertIn(
+            '<option value="{}" selected'.format(self.items[0].id),
+            html
+        )
+
+    def test_extra_choices(self):
+        """Ensure extra choices passed to ``render`` are rendered once."""
+        html = self.field.widget.render(
+            'item',
+            self.items[0].id,
+            choices=[(self.items[0].id, 'first'), (self.items[1].id, 'second')]
+        )
+        self.assertEqual(html.count('<option'), 3)
+        self.assertIn(
+            '<option value="{}">second'.format(self.items[1].id),
+            html
+        )
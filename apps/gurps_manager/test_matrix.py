@@ -0,0 +1,140 @@
+"""Unit tests for the ``matrix`` module."""
+from django.test import TestCase
+from gurps_manager import factories, matrix, models
+from math import floor
+
+# pylint: disable=E1101
+# Class 'CampaignFactory' has no 'create' member (no-member)
+#
+# pylint: disable=R0904
+# Classes inheriting from TestCase will have 60+ too many public methods, and
+# that's not something I have control over. Ignore it.
+
+class CampaignMatrixTestCase(TestCase):
+    """Tests for ``campaign_skill_matrix`` and ``campaign_spell_matrix``."""
+    def setUp(self):
+        """Create a campaign with several characters, skills and spells."""
+        self.campaign = factories.CampaignFactory.create()
+        self.characters = factories.CharacterFactory.create_batch(
+            3,
+            campaign=self.campaign
+        )
+        self.character_skills = []
+        self.character_spells = []
+        for category_id, _ in models.Skill.CATEGORY_CHOICES:
+            skill = factories.SkillFactory.create(category=category_id)
+            for character in self.characters[:2]:
+                self.character_skills.append(
+                    factories.CharacterSkillFactory.create(
+                        character=character,
+                        skill=skill
+                    )
+                )
+        for _ in range(3):
+            spell = factories.SpellFactory.create(campaign=self.campaign)
+            self.character_spells.append(factories.CharacterSpellFactory.create(
+                character=self.characters[0],
+                spell=spell
+            ))
+
+    def _check_matrix(self, score_matrix, character_objects, attribute):
+        """Assert ``score_matrix`` agrees with each object's ``score``.
+
+        ``character_objects`` are ``CharacterSkill`` or ``CharacterSpell``
+        objects, and ``attribute`` names their skill or spell attribute.
+
+        """
+        self.assertEqual(
+            [character.id for character in score_matrix.characters],
+            [character.id for character in models.Character.objects.filter(
+                campaign=self.campaign
+            ).order_by('name', 'id')]
+        )
+        for obj in character_objects:
+            row = score_matrix.characters.index(obj.character)
+            column = score_matrix.columns.index(getattr(obj, attribute))
+            self.assertEqual(score_matrix.scores[row][column], obj.score())
+        known = set(
+            (obj.character.id, getattr(obj, attribute).id)
+            for obj in character_objects
+        )
+        for character, scores in zip(
+                score_matrix.characters,
+                score_matrix.scores):
+            for column, score in zip(score_matrix.columns, scores):
+                if (character.id, column.id) not in known:
+                    self.assertIsNone(score)
+
+    def test_campaign_skill_matrix(self):
+        """Compare ``campaign_skill_matrix`` to ``CharacterSkill.score``."""
+        with self.assertNumQueries(3):
+            score_matrix = matrix.campaign_skill_matrix(self.campaign)
+        self._check_matrix(score_matrix, self.character_skills, 'skill')
+
+    def test_campaign_spell_matrix(self):
+        """Compare ``campaign_spell_matrix`` to ``CharacterSpell.score``."""
+        with self.assertNumQueries(3):
+            score_matrix = matrix.campaign_spell_matrix(self.campaign)
+        self._check_matrix(score_matrix, self.character_spells, 'spell')
+
+    def test_without_numpy(self):
+        """Ensure scores are the same whether or not NumPy is used."""
+        numpy = matrix.numpy
+        try:
+            matrix.numpy = None
+            skill_matrix = matrix.campaign_skill_matrix(self.campaign)
+            spell_matrix = matrix.campaign_spell_matrix(self.campaign)
+        finally:
+            matrix.numpy = numpy
+        self._check_matrix(skill_matrix, self.character_skills, 'skill')
+        self._check_matrix(spell_matrix, self.character_spells, 'spell')
+
+    def test_empty_campaign(self):
+        """Build the matrices for a campaign without any characters."""
+        campaign = factories.CampaignFactory.create()
+        self.assertEqual(matrix.campaign_skill_matrix(campaign).rows(), [])
+        self.assertEqual(matrix.campaign_spell_matrix(campaign).rows(), [])
+
+class SkillScoresTestCase(TestCase):
+    """Tests for ``skill_scores``."""
+    def test_negative_scores(self):
+        """Ensure negative scores are the same whether or not NumPy is used.
+
+        Each skill is scored with an attribute well below its difficulty, and
+        with fractional points once multiplied by a memory factor.
+
+        """
+        categories = [
+            category_id for category_id, _ in models.Skill.CATEGORY_CHOICES
+        ]
+        size = len(categories)
+        attributes = dict(
+            (name, [1] * size) for name in matrix._ATTRIBUTE_NAMES # pylint: disable=W0212,C0301
+        )
+        attributes['eidetic_memory'] = [30] * size
+        attributes['muscle_memory'] = [60] * size
+        args = (attributes, categories, [4] * size, [0.75] * size)
+        scores = matrix.skill_scores(*args)
+        numpy = matrix.numpy
+        try:
+            matrix.numpy = None
+            fallback_scores = matrix.skill_scores(*args)
+        finally:
+            matrix.numpy = numpy
+        self.assertEqual(scores, fallback_scores)
+        self.assertTrue(all(score < 0 for score in scores))
+
+        character = models.Character(id=1)
+        rows = matrix.ScoreMatrix([character], categories, [scores]).rows()
+        fallback_rows = matrix.ScoreMatrix(
+            [character],
+            categories,
+            [fallback_scores]
+        ).rows()
+        self.assertEqual(rows, fallback_rows)
+        self.assertEqual(rows[0][1], [floor(score) for score in scores])
+
+    def test_bad_category(self):
+        """Pass a category that is not in ``Skill.CATEGORY_CHOICES``."""
+        with self.assertRaises(ValueError):
+            matrix.skill_scores({'intelligence': [10]}, [7], [2], [2])
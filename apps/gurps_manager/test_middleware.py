@@ -0,0 +1,127 @@
+"""Unit tests for the ``middleware`` module."""
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import override_settings
+from gurps_manager import factories, urls
+import os
+import shutil
+import tempfile
+
+# pylint: disable=E1101
+# Class 'CharacterFactory' has no 'create' member (no-member)
+#
+# pylint: disable=R0904
+# Classes inheriting from TestCase will have 60+ too many public methods, and
+# that's not something I have control over. Ignore it.
+
+@override_settings(GURPS_MANAGER_COUNT_QUERIES=True)
+class QueryCountMiddlewareTestCase(TestCase):
+    """Tests for ``QueryCountMiddleware``."""
+    URL_NAME = 'gurps-manager-character-id'
+
+    def setUp(self):
+        """Create a character and log in as its owner."""
+        user, password = factories.create_user()
+        self.character = factories.CharacterFactory.create(owner=user)
+        self.client.login(username=user.username, password=password)
+        self.path = reverse(self.URL_NAME, args=[self.character.id])
+
+    def test_headers(self):
+        """Ensure the query count and times are sent as headers."""
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['X-Query-Count']), 0)
+        self.assertGreaterEqual(
+            float(response['X-Query-Time']),
+            float(response['X-Slowest-Query-Time'])
+        )
+
+    def test_within_budget(self):
+        """Ensure a request within its budget is only logged at INFO level."""
+        with self.assertLogs('gurps_manager.middleware', 'INFO') as logs:
+            self.client.get(self.path)
+        self.assertEqual(
+            [record.levelname for record in logs.records],
+            ['INFO']
+        )
+
+    def test_over_budget(self):
+        """Ensure a warning is logged when a request goes over its budget."""
+        budget = urls.QUERY_BUDGETS[self.URL_NAME]
+        urls.QUERY_BUDGETS[self.URL_NAME] = 0
+        try:
+            with self.assertLogs('gurps_manager.middleware') as logs:
+                self.client.get(self.path)
+        finally:
+            urls.QUERY_BUDGETS[self.URL_NAME] = budget
+        warnings = [
+            record for record in logs.records if record.levelname == 'WARNING'
+        ]
+        self.assertEqual(len(warnings), 1)
+        self.assertIn(self.URL_NAME, warnings[0].getMessage())
+
+    def test_disabled(self):
+        """Ensure queries are not recorded unless they are to be counted."""
+        with self.settings(DEBUG=False, GURPS_MANAGER_COUNT_QUERIES=False):
+            response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Query-Count', response)
+        self.assertEqual(connection.queries, [])
+
+class ProfileMiddlewareTestCase(TestCase):
+    """Tests for ``ProfileMiddleware``."""
+    def setUp(self):
+        """Create a character, and a directory for profiles."""
+        self.user, self.password = factories.create_user()
+        self.character = factories.CharacterFactory.create(owner=self.user)
+        self.path = reverse(
+            'gurps-manager-character-id',
+            args=[self.character.id]
+        )
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the directory for profiles."""
+        shutil.rmtree(self.directory)
+
+    def _get(self, data, **extra):
+        """Log in, then GET ``self.path``. Return the response."""
+        self.client.login(username=self.user.username, password=self.password)
+        with self.settings(GURPS_MANAGER_PROFILE_DIR=self.directory):
+            return self.client.get(self.path, data, **extra)
+
+    def test_superuser(self):
+        """Ensure a superuser's request is profiled when asked."""
+        self.user.is_superuser = True
+        self.user.save()
+        response = self._get({'profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Profile']
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            [name + '.prof', name + '.txt']
+        )
+
+    def test_header(self):
+        """Ensure a superuser's request is profiled when asked by a header."""
+        self.user.is_superuser = True
+        self.user.save()
+        response = self._get({}, HTTP_X_PROFILE='1')
+        self.assertIn('X-Profile', response)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_not_asked(self):
+        """Ensure a superuser's request is not profiled unless asked."""
+        self.user.is_superuser = True
+        self.user.save()
+        response = self._get({})
+        self.assertNotIn('X-Profile', response)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_ordinary_user(self):
+        """Ensure an ordinary user's request is never profiled."""
+        response = self._get({'profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile', response)
+        self.assertEqual(os.listdir(self.directory), [])
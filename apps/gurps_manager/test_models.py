@@ -4,7 +4,9 @@ Each test case in this module tests a single model. For example, the
 ``CampaignTestCase`` tests just the ``Campaign`` model.
 
 """
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from gurps_manager import factories, models
 from math import floor
 import random
@@ -25,6 +27,28 @@ class CampaignTestCase(TestCase):
         campaign = factories.CampaignFactory.build(name=name)
         self.assertEqual(name, str(campaign))
 
+    def test_delete(self):
+        """Ensure deleting a campaign does not refresh stats per row deleted."""
+        queries = []
+        for count in (1, 3):
+            campaign = factories.CampaignFactory.create()
+            for character in factories.CharacterFactory.create_batch(
+                    count,
+                    campaign=campaign
+            ):
+                factories.CharacterSkillFactory.create(character=character)
+                factories.PossessionFactory.create(
+                    character=character,
+                    item=factories.ItemFactory.create(campaign=campaign)
+                )
+            with CaptureQueriesContext(connection) as context:
+                campaign.delete()
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+        self.assertFalse(models.Character.objects.filter(
+            campaign=campaign
+        ).exists())
+
 class CharacterTestCase(TestCase):
     """Tests for ``Character``."""
     def test_str(self):
@@ -196,6 +220,198 @@ class CharacterTestCase(TestCase):
             floor(character.speed()) + character.bonus_movement + 1
         )
 
+    def test_possessions_fetched_once(self):
+        """Ensure possession-derived stats share a single query."""
+        character = factories.CharacterFactory.create()
+        factories.PossessionFactory.create(character=character)
+        factories.PossessionFactory.create(character=character)
+        _clear_cached_stats(character)
+        with self.assertNumQueries(1):
+            character.total_possession_weight()
+            character.total_possession_value()
+            character.encumbrance_penalty()
+            character.dodge()
+
+    def test_with_possession_totals(self):
+        """Test the ``with_possession_totals`` manager method."""
+        campaign = factories.CampaignFactory.create()
+        characters = [
+            factories.CharacterFactory.create(campaign=campaign)
+            for _ in range(2)
+        ]
+        for character in characters:
+            factories.PossessionFactory.create(character=character)
+        factories.PossessionFactory.create()
+        with self.assertNumQueries(1):
+            annotated = list(
+                models.Character.objects.filter(
+                    campaign=campaign
+                ).with_possession_totals().order_by('id')
+            )
+            totals = [
+                (
+                    character.total_possession_weight(),
+                    character.total_possession_value(),
+                )
+                for character in annotated
+            ]
+        self.assertEqual(
+            totals,
+            [
+                (
+                    character.total_possession_weight(),
+                    character.total_possession_value(),
+                )
+                for character in characters
+            ]
+        )
+
+    def test_save_clears_memo(self):
+        """Ensure saving a character discards its memoized stats."""
+        character = factories.CharacterFactory.create()
+        self.assertEqual(0, character.total_possession_weight())
+        possession = factories.PossessionFactory.create()
+        models.Possession.objects.filter(pk=possession.pk).update(
+            character=character
+        )
+        self.assertEqual(0, character.total_possession_weight())
+        character.save()
+        self.assertEqual(
+            possession.item.weight * possession.quantity,
+            character.total_possession_weight()
+        )
+
+    def test_cached_stats(self):
+        """Ensure cached stats are kept up to date and are used when read."""
+        character = factories.CharacterFactory.create()
+        factories.CharacterSkillFactory.create(character=character)
+        factories.CharacterSpellFactory.create(character=character)
+        factories.TraitFactory.create(character=character)
+        possession = factories.PossessionFactory.create(character=character)
+        fetched = models.Character.objects.get(pk=character.pk)
+        with self.assertNumQueries(0):
+            ledger = fetched.point_ledger()
+            weight = fetched.total_possession_weight()
+            value = fetched.total_possession_value()
+        _clear_cached_stats(character)
+        self.assertEqual(ledger.spent(), character.total_points_spent())
+        self.assertEqual(weight, character.total_possession_weight())
+        self.assertEqual(value, character.total_possession_value())
+        self.assertEqual(
+            fetched.cached_remaining_points,
+            character.points_remaining()
+        )
+
+        # Deleting a possession or changing an item also refreshes the stats.
+        possession.item.weight += 1
+        possession.item.save()
+        self.assertAlmostEqual(
+            models.Character.objects.get(pk=character.pk)
+            .cached_possession_weight,
+            weight + possession.quantity
+        )
+        possession.delete()
+        self.assertEqual(
+            models.Character.objects.get(pk=character.pk)
+            .cached_possession_weight,
+            0
+        )
+
+    def test_rebuild_cached_stats(self):
+        """Test the ``rebuild_cached_stats`` method."""
+        character = factories.CharacterFactory.create()
+        possession = factories.PossessionFactory.create(character=character)
+        models.Character.objects.update(cached_possession_weight=None)
+        stats = models.Character.rebuild_cached_stats()
+        self.assertEqual(
+            stats[character.pk]['cached_possession_weight'],
+            possession.item.weight * possession.quantity
+        )
+        self.assertEqual(
+            models.Character.objects.get(pk=character.pk)
+            .cached_possession_weight,
+            possession.item.weight * possession.quantity
+        )
+
+    def test_rebuild_cached_stats_queries(self):
+        """Ensure ``rebuild_cached_stats`` saves every character at once."""
+        factories.CharacterFactory.create_batch(3)
+        with self.assertNumQueries(2):
+            self.assertEqual(len(models.Character.rebuild_cached_stats()), 3)
+
+    def test_save_update_fields(self):
+        """Ensure cached stats are only refreshed when their inputs change."""
+        character = factories.CharacterFactory.create()
+        with CaptureQueriesContext(connection) as context:
+            character.save(update_fields=['name', 'story'])
+        renamed = len(context)
+        with self.assertNumQueries(renamed + 2):
+            character.save(update_fields=['name', 'strength'])
+        with self.assertNumQueries(renamed + 2):
+            character.save()
+
+    def test_clean_live_stats(self):
+        """Ensure ``clean`` checks the points spent, not the cached stats."""
+        character = factories.CharacterFactory.create()
+        skill = factories.CharacterSkillFactory.create(character=character)
+        models.Character.objects.filter(pk=character.pk).update(
+            total_points=character.total_points_spent()
+        )
+        models.CharacterSkill.objects.filter(pk=skill.pk).update(
+            points=skill.points + 1
+        )
+        character = models.Character.objects.get(pk=character.pk)
+        self.assertEqual(
+            character.total_points,
+            character.total_points_spent()
+        )
+        with self.assertRaises(models.ValidationError):
+            character.clean()
+
+    def test_delete(self):
+        """Ensure deleting a character does not refresh its stats per row."""
+        queries = []
+        for count in (1, 5):
+            character = factories.CharacterFactory.create()
+            for _ in range(count):
+                factories.CharacterSkillFactory.create(character=character)
+                factories.TraitFactory.create(character=character)
+                factories.PossessionFactory.create(character=character)
+            with CaptureQueriesContext(connection) as context:
+                character.delete()
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+        self.assertFalse(models.Character.objects.filter(
+            pk=character.pk
+        ).exists())
+
+    def test_deferred_stat_refresh(self):
+        """Test ``deferred_stat_refresh``.
+
+        Create several possessions inside a ``deferred_stat_refresh`` block,
+        and ensure stats are only refreshed once the block ends.
+
+        """
+        character = factories.CharacterFactory.create()
+        with models.deferred_stat_refresh():
+            possessions = factories.PossessionFactory.create_batch(
+                3,
+                character=character
+            )
+            self.assertEqual(
+                models.Character.objects.get(pk=character.pk)
+                .cached_possession_weight,
+                0
+            )
+        self.assertEqual(
+            models.Character.objects.get(pk=character.pk)
+            .cached_possession_weight,
+            sum(
+                possession.item.weight * possession.quantity
+                for possession in possessions
+            )
+        )
+
     def test_speed(self):
         """Test the ``speed`` method."""
         char = factories.CharacterFactory.create()
@@ -225,6 +441,20 @@ class CharacterTestCase(TestCase):
         # With the running skills
         self.assertEqual(character.movement(), character_movement)
 
+    def test_special_skill(self):
+        """Test the ``special_skill`` method."""
+        character = factories.CharacterFactory.create()
+        self.assertIsNone(character.special_skill('movement'))
+        factories.CharacterSkillFactory.create(character=character)
+        char_skill = factories.CharacterSkillFactory.create(
+            character=character,
+            skill=factories.SkillFactory.create(name='Running')
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(character.special_skill('movement'), char_skill)
+        fetched = models.Character.objects.for_sheet().get(pk=character.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(fetched.special_skill('movement'), char_skill)
 
     def test_dodge(self):
         """Test the ``dodge`` method."""
@@ -438,6 +668,106 @@ class CharacterTestCase(TestCase):
                 + character.total_points_in_special_traits()
         )
 
+    def test_point_ledger(self):
+        """Test the ``point_ledger`` method."""
+        character = factories.CharacterFactory.create()
+        skill = factories.CharacterSkillFactory.create(character=character)
+        spell = factories.CharacterSpellFactory.create(character=character)
+        advantage = factories.TraitFactory.create(character=character, points=5)
+        disadvantage = factories.TraitFactory.create(
+            character=character,
+            points=-10
+        )
+        _clear_cached_stats(character)
+        with self.assertNumQueries(1):
+            ledger = character.point_ledger()
+        self.assertEqual(ledger.skills, skill.points)
+        self.assertEqual(ledger.spells, spell.points)
+        self.assertEqual(ledger.advantages, advantage.points)
+        self.assertEqual(ledger.disadvantages, disadvantage.points)
+        self.assertEqual(
+            ledger.attributes,
+            character.total_points_in_attributes()
+        )
+        self.assertEqual(
+            ledger.special_traits,
+            character.total_points_in_special_traits()
+        )
+        self.assertEqual(
+            ledger.remaining(),
+            character.total_points - ledger.spent()
+        )
+
+    def test_point_ledger_unsaved(self):
+        """Test the ``point_ledger`` method on an unsaved character."""
+        character = factories.CharacterFactory.build()
+        with self.assertNumQueries(0):
+            ledger = character.point_ledger()
+        self.assertEqual(
+            ledger.spent(),
+            character.total_points_in_attributes() \
+                + character.total_points_in_special_traits()
+        )
+
+    def test_with_point_ledgers(self):
+        """Test the ``with_point_ledgers`` manager method."""
+        character = factories.CharacterFactory.create()
+        factories.CharacterSkillFactory.create(character=character)
+        factories.TraitFactory.create(character=character)
+        annotated = models.Character.objects.with_point_ledgers().get(
+            pk=character.pk
+        )
+        with self.assertNumQueries(0):
+            ledger = annotated.point_ledger()
+        self.assertEqual(ledger.spent(), character.total_points_spent())
+
+    def test_with_point_totals(self):
+        """Test the ``with_point_totals`` manager method."""
+        characters = [factories.CharacterFactory.create() for _ in range(3)]
+        for character in characters:
+            factories.CharacterSkillFactory.create(character=character)
+            factories.CharacterSpellFactory.create(character=character)
+            factories.TraitFactory.create(character=character)
+        annotated = list(
+            models.Character.objects.with_point_totals().order_by(
+                'spent_points'
+            )
+        )
+        self.assertEqual(
+            [character.pk for character in annotated],
+            [character.pk for character in sorted(
+                characters,
+                key=lambda character: character.total_points_spent()
+            )]
+        )
+        for character in annotated:
+            self.assertEqual(
+                character.spent_points,
+                character.total_points_spent()
+            )
+            self.assertEqual(
+                character.remaining_points,
+                character.points_remaining()
+            )
+
+class BulkUpdateTestCase(TestCase):
+    """Tests for ``bulk_update``."""
+    def test_bulk_update(self):
+        """Update two fields of several objects with one query."""
+        character_skills = factories.CharacterSkillFactory.create_batch(3)
+        for i, character_skill in enumerate(character_skills):
+            character_skill.points = i + 0.5
+            character_skill.comments = 'comment {}'.format(i)
+        with self.assertNumQueries(1):
+            models.bulk_update(character_skills[:2], ['points', 'comments'])
+        for i, character_skill in enumerate(character_skills):
+            saved = models.CharacterSkill.objects.get(pk=character_skill.pk)
+            if i < 2:
+                self.assertEqual(saved.points, i + 0.5)
+                self.assertEqual(saved.comments, 'comment {}'.format(i))
+            else:
+                self.assertNotEqual(saved.comments, 'comment {}'.format(i))
+
 class SkillSetTestCase(TestCase):
     """Tests for ``SkillSet``."""
     def test_str(self):
@@ -454,6 +784,17 @@ class SkillTestCase(TestCase):
         skill = factories.SkillFactory.build(name=name)
         self.assertEqual(name, str(skill))
 
+    def test_key(self):
+        """Ensure ``key`` is set whenever a skill is saved."""
+        skill = factories.SkillFactory.create(name='Running')
+        self.assertEqual(skill.key, 'running')
+        skill.name = 'Swimming'
+        skill.save()
+        self.assertEqual(
+            models.Skill.objects.get(id=skill.id).key,
+            'swimming'
+        )
+
 class TraitTestCase(TestCase):
     """Tests for ``Trait``."""
     def test_str(self):
@@ -470,6 +811,11 @@ class ItemTestCase(TestCase):
         item = factories.ItemFactory.build(name=name)
         self.assertEqual(name, str(item))
 
+    def test_key(self):
+        """Ensure ``key`` is set whenever an item is saved."""
+        item = factories.ItemFactory.create(name='Fireball')
+        self.assertEqual(item.key, 'fireball')
+
 class SpellTestCase(TestCase):
     """Tests for ``Spell``."""
     def test_str(self):
@@ -478,6 +824,11 @@ class SpellTestCase(TestCase):
         spell = factories.SpellFactory.build(name=name)
         self.assertEqual(name, str(spell))
 
+    def test_key(self):
+        """Ensure ``key`` is set whenever a spell is saved."""
+        spell = factories.SpellFactory.create(name='Fireball')
+        self.assertEqual(spell.key, 'fireball')
+
 class HitLocationTestCase(TestCase):
     """Tests for ``HitLocation``."""
     def test_str(self):
@@ -573,6 +924,41 @@ class CharacterSkillTestCase(TestCase):
         character_skill = factories.CharacterSkillFactory.create(skill=skill)
         self.assertRaises(ValueError, character_skill.score)
 
+    def test_scores(self):
+        """Test method ``scores``."""
+        character = factories.CharacterFactory.create()
+        for _ in range(3):
+            factories.CharacterSkillFactory.create(character=character)
+        character_skills = list(models.CharacterSkill.objects.filter(
+            character=character
+        ).select_related('skill'))
+        with self.assertNumQueries(0):
+            scores = models.CharacterSkill.scores(character_skills, character)
+        self.assertEqual(
+            scores,
+            [character_skill.score() for character_skill in character_skills]
+        )
+
+    def test_with_scores(self):
+        """Test ``CharacterSkill.objects.with_scores``.
+
+        Score several skills of each category, and ensure the scores computed
+        by the database equal those computed by ``score``.
+
+        """
+        for _ in range(3):
+            character = factories.CharacterFactory.create()
+            for category_id, _ in models.Skill.CATEGORY_CHOICES:
+                factories.CharacterSkillFactory.create(
+                    character=character,
+                    skill=factories.SkillFactory.create(category=category_id)
+                )
+        character_skills = models.CharacterSkill.objects.with_scores(
+        ).select_related('skill', 'character').order_by('skill_score', 'id')
+        scores = [obj.score() for obj in character_skills]
+        self.assertEqual([obj.skill_score for obj in character_skills], scores)
+        self.assertEqual(scores, sorted(scores))
+
     def test_mental_skill_score_v1(self):
         """Test method ``_mental_skill_score``."""
         character_skill = factories.CharacterSkillFactory.create()
@@ -829,3 +1215,29 @@ class CharacterSpellTestCase(TestCase):
             char_spell.score(),
             char_spell._base_score() + (char_spell.points // 4) + 2 # pylint: disable=W0212
         )
+
+    def test_with_scores(self):
+        """Test ``CharacterSpell.objects.with_scores``.
+
+        Ensure the scores computed by the database equal those computed by
+        ``score``.
+
+        """
+        for difficulty_id, _ in models.Spell.DIFFICULTY_CHOICES:
+            for _ in range(3):
+                spell = factories.SpellFactory.create(difficulty=difficulty_id)
+                factories.CharacterSpellFactory.create(spell=spell)
+        character_spells = models.CharacterSpell.objects.with_scores(
+        ).select_related('spell', 'character').order_by('spell_score', 'id')
+        scores = [obj.score() for obj in character_spells]
+        self.assertEqual([obj.spell_score for obj in character_spells], scores)
+        self.assertEqual(scores, sorted(scores))
+
+def _clear_cached_stats(character):
+    """Unset the cached stats on ``character``, but not in the database.
+
+    This forces ``character`` to calculate its stats when they are read.
+
+    """
+    for stat in models.Character.CACHED_STATS:
+        setattr(character, 'cached_' + stat, None)
@@ -0,0 +1,48 @@
+"""Unit tests for the ``sessions`` module."""
+from django.contrib.sessions.models import Session
+from django.test import TestCase
+from gurps_manager import sessions
+
+# pylint: disable=R0904
+# Classes inheriting from TestCase will have 60+ too many public methods, and
+# that's not something I have control over. Ignore it.
+
+class SessionStoreTestCase(TestCase):
+    """Tests for ``SessionStore``."""
+    def setUp(self):
+        """Save a session, then open it in a new ``SessionStore``."""
+        store = sessions.SessionStore()
+        store['key'] = 'value'
+        store.save()
+        self.store = sessions.SessionStore(store.session_key)
+
+    def test_unchanged(self):
+        """Ensure a session is not written if its data is unchanged."""
+        self.store['key'] = 'value'
+        self.assertTrue(self.store.modified)
+        with self.assertNumQueries(0):
+            self.store.save()
+
+    def test_changed(self):
+        """Ensure a session is written if its data changes."""
+        self.store['key'] = 'other value'
+        self.store.save()
+        self.assertEqual(_stored_data(self.store)['key'], 'other value')
+
+    def test_cycle_key(self):
+        """Ensure a session is written after its key changes."""
+        old_key = self.store.session_key
+        self.assertEqual(self.store['key'], 'value')
+        self.store.cycle_key()
+        self.assertNotEqual(self.store.session_key, old_key)
+        self.store['key'] = 'other value'
+        self.store.save()
+        self.assertEqual(_stored_data(self.store)['key'], 'other value')
+
+def _stored_data(store):
+    """Return the data the database holds for ``store``'s session.
+
+    The cache is bypassed.
+
+    """
+    return Session.objects.get(session_key=store.session_key).get_decoded()
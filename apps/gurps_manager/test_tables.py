@@ -64,6 +64,14 @@ class CharacterTableTestCase(TestCase):
             character.total_points_spent()
         )
 
+    def test_render_remaining_points(self):
+        """Test method ``render_remaining_points``."""
+        character = factories.CharacterFactory.create()
+        self.assertEqual(
+            self.table.render_remaining_points(character),
+            character.points_remaining()
+        )
+
     def test_render_description(self):
         """Test method ``render_description``."""
         string = factories._random_str(130, 150)
@@ -5,8 +5,14 @@ Each test case  in this module tests a single view. For example,
 
 """
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test import TestCase
-from gurps_manager import factories, models
+from django.test.utils import CaptureQueriesContext
+from gurps_manager import factories, models, views
+import json
+import os
+import shutil
+import tempfile
 
 # pylint: disable=E1101
 # Class 'Campaign' has no 'objects' member (no-member)
@@ -68,7 +74,7 @@ class LoginTestCase(TestCase):
     def test_post_failure_v1(self):
         """Log in, but do not provide any credentials."""
         response = self.client.post(self.PATH, {})
-        self.assertRedirects(response, self.PATH)
+        _test_rerendered(self, response, views.Login)
 
     def test_post_failure_v2(self):
         """Log in with an invalid username/password combination."""
@@ -76,7 +82,7 @@ class LoginTestCase(TestCase):
             self.PATH,
             {'username': 'foo', 'password': 'bar'}
         )
-        self.assertRedirects(response, self.PATH)
+        _test_rerendered(self, response, views.Login)
 
     def test_post_failure_v3(self):
         """Log in with an inactive user."""
@@ -87,7 +93,7 @@ class LoginTestCase(TestCase):
             self.PATH,
             {'username': user.username, 'password': password}
         )
-        self.assertRedirects(response, self.PATH)
+        _test_rerendered(self, response, views.Login)
 
     def test_get(self):
         """Get the login page."""
@@ -139,10 +145,7 @@ class CampaignTestCase(TestCase):
     def test_post_failure(self):
         """POST ``self.PATH``, incorrectly."""
         response = self.client.post(self.PATH, {})
-        self.assertRedirects(
-            response,
-            reverse('gurps-manager-campaign-create-form')
-        )
+        _test_rerendered(self, response, views.CampaignCreateForm)
 
     def test_get(self):
         """GET ``self.PATH``."""
@@ -249,12 +252,17 @@ class CampaignIdTestCase(TestCase):
         # A CampaignForm requires more than just a name.
         data = {'_method': 'PUT', 'name': ''}
         response = self.client.post(self.path, data)
-        self.assertRedirects(
-            response,
-            reverse(
-                'gurps-manager-campaign-id-update-form',
-                args=[self.campaign.id]
-            )
+        _test_rerendered(self, response, views.CampaignIdUpdateForm)
+
+    def test_put_failure_title(self):
+        """Ensure a re-rendered form shows the campaign's saved name."""
+        data = {'_method': 'PUT', 'name': 'unsaved name', 'owner': ''}
+        response = self.client.post(self.path, data)
+        _test_rerendered(self, response, views.CampaignIdUpdateForm)
+        self.assertEqual(response.context['campaign'].name, self.campaign.name)
+        self.assertEqual(
+            response.context['form'].instance.name,
+            'unsaved name'
         )
 
     def test_put_failure_v2(self):
@@ -501,13 +509,7 @@ class CampaignIdSpellsTestCase(TestCase):
             'spell_set-0-duration': ['-1'],
         }
         response = self.client.post(self.path, data)
-        self.assertRedirects(
-            response,
-            reverse(
-                'gurps-manager-campaign-id-spells-update-form',
-                args=[self.campaign.id]
-            )
-        )
+        _test_rerendered(self, response, views.CampaignIdSpellsUpdateForm)
 
     def test_post_failure_v3(self):
         """Create a spell for a campaign, but without rights to do so."""
@@ -659,13 +661,7 @@ class CampaignIdItemsTestCase(TestCase):
             'item_set-0-weight': ['-1.0'],
         }
         response = self.client.post(self.path, data)
-        self.assertRedirects(
-            response,
-            reverse(
-                'gurps-manager-campaign-id-items-update-form',
-                args=[self.campaign.id]
-            )
-        )
+        _test_rerendered(self, response, views.CampaignIdItemsUpdateForm)
 
     def test_post_failure_v3(self):
         """Create an item for a campaign, but without rights to do so."""
@@ -709,6 +705,61 @@ class CampaignIdItemsTestCase(TestCase):
         response = self.client.delete(self.path, {'_method': 'DELETE'})
         self.assertEqual(response.status_code, 405)
 
+class CampaignIdSkillMatrixTestCase(TestCase):
+    """Tests for the ``campaign/<id>/skill-matrix/`` path."""
+    def setUp(self):
+        """Create a campaign and set ``self.path``.
+
+        The created campaign is accessible as ``self.campaign``.
+
+        """
+        user = _login(self.client)[0]
+        self.campaign = factories.CampaignFactory.create(owner=user)
+        self.path = reverse(
+            'gurps-manager-campaign-id-skill-matrix',
+            args=[self.campaign.id]
+        )
+
+    def test_login_required(self):
+        """Ensure user must be logged in to GET this URL."""
+        _test_login_required(self, self.path)
+
+    def test_post(self):
+        """POST ``self.path``."""
+        response = self.client.post(self.path)
+        self.assertEqual(response.status_code, 405)
+
+    def test_get(self):
+        """GET ``self.path``."""
+        character = factories.CharacterFactory.create(campaign=self.campaign)
+        factories.CharacterSkillFactory.create(character=character)
+        factories.CharacterSpellFactory.create(character=character)
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_bad_id(self):
+        """GET ``self.path`` with a bad ID."""
+        self.campaign.delete()
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_failure(self):
+        """Let some other user own ``self.campaign``, then GET ``self.path``.""" # pylint: disable=C0301
+        self.campaign.owner = factories.UserFactory.create()
+        self.campaign.save()
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 403)
+
+    def test_put(self):
+        """POST ``self.path`` and emulate a PUT request."""
+        response = self.client.put(self.path, {'_method': 'PUT'})
+        self.assertEqual(response.status_code, 405)
+
+    def test_delete(self):
+        """POST ``self.path`` and emulate a DELETE request."""
+        response = self.client.delete(self.path, {'_method': 'DELETE'})
+        self.assertEqual(response.status_code, 405)
+
 class CharacterTestCase(TestCase):
     """Tests for the ``character/`` path."""
     PATH = reverse('gurps-manager-character')
@@ -746,10 +797,7 @@ class CharacterTestCase(TestCase):
     def test_post_failure(self):
         """POST ``self.PATH``, incorrectly."""
         response = self.client.post(self.PATH, {})
-        self.assertRedirects(
-            response,
-            reverse('gurps-manager-character-create-form')
-        )
+        _test_rerendered(self, response, views.CharacterCreateForm)
 
     def test_get(self):
         """GET ``self.PATH``."""
@@ -841,6 +889,40 @@ class CharacterIdTestCase(TestCase):
         response = self.client.get(self.path)
         self.assertEqual(response.status_code, 403)
 
+    def test_get_failure_skips_sheet(self):
+        """Ensure the sheet is not fetched for a user who may not view it."""
+        self.character.owner = factories.UserFactory.create()
+        self.character.save()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 403)
+        for query in context.captured_queries:
+            self.assertNotIn('gurps_manager_characterskill', query['sql'])
+
+    def test_get_other_player(self):
+        """GET a character owned by another player in the same campaign."""
+        character = factories.CharacterFactory.create(
+            campaign=self.character.campaign
+        )
+        response = self.client.get(reverse(
+            'gurps-manager-character-id',
+            args=[character.id]
+        ))
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_query_count(self):
+        """Ensure the number of queries made does not grow with the sheet."""
+        def add_rows():
+            """Give ``self.character`` more of everything on its sheet."""
+            for factory in (
+                    factories.CharacterSkillFactory,
+                    factories.CharacterSpellFactory,
+                    factories.PossessionFactory,
+                    factories.TraitFactory,
+                    factories.HitLocationFactory):
+                factory.create_batch(3, character=self.character)
+        _test_query_count(self, self.path, add_rows)
+
     def test_put(self):
         """Update ``self.character``."""
         data = factories.CharacterFactory.attributes()
@@ -855,12 +937,20 @@ class CharacterIdTestCase(TestCase):
         # A CharacterForm requires more than just a name.
         data = {'_method': 'PUT', 'name': ''}
         response = self.client.post(self.path, data)
-        self.assertRedirects(
-            response,
-            reverse(
-                'gurps-manager-character-id-update-form',
-                args=[self.character.id]
-            )
+        _test_rerendered(self, response, views.CharacterIdUpdateForm)
+
+    def test_put_failure_title(self):
+        """Ensure a re-rendered form shows the character's saved name."""
+        data = {'_method': 'PUT', 'name': 'unsaved name'}
+        response = self.client.post(self.path, data)
+        _test_rerendered(self, response, views.CharacterIdUpdateForm)
+        self.assertEqual(
+            response.context['character'].name,
+            self.character.name
+        )
+        self.assertEqual(
+            response.context['form'].instance.name,
+            'unsaved name'
         )
 
     def test_put_failure_2(self):
@@ -1038,6 +1128,57 @@ class CharacterIdSkillsUpdateFormTestCase(TestCase):
         response = self.client.delete(self.path, {'_method': 'DELETE'})
         self.assertEqual(response.status_code, 405)
 
+class CharacterIdSkillsChoicesTestCase(TestCase):
+    """Tests for the ``character/<id>/skills/choices/`` path."""
+    def setUp(self):
+        """Create a character, several skills and set ``self.path``.
+
+        The created character is accessible as ``self.character``. The skills
+        named "Running", "riding" and "Swimming" may be given to it, and the
+        one named "Rowing" may not.
+
+        """
+        user = _login(self.client)[0]
+        self.character = factories.CharacterFactory.create(owner=user)
+        skillset = factories.SkillSetFactory.create()
+        self.character.campaign.skillsets.add(skillset)
+        for name in ('Running', 'riding', 'Swimming'):
+            factories.SkillFactory.create(name=name, skillset=skillset)
+        factories.SkillFactory.create(name='Rowing')
+        self.path = reverse(
+            'gurps-manager-character-id-skills-choices',
+            args=[self.character.id]
+        )
+
+    def test_login_required(self):
+        """Ensure user must be logged in to GET this URL."""
+        _test_login_required(self, self.path)
+
+    def test_post(self):
+        """POST ``self.path``."""
+        response = self.client.post(self.path)
+        self.assertEqual(response.status_code, 405)
+
+    def test_get(self):
+        """GET ``self.path``."""
+        _test_choices(self, {}, ['riding', 'Running', 'Swimming'])
+        _test_choices(self, {'q': 'R'}, ['riding', 'Running'])
+        _test_choices(self, {'q': 'run'}, ['Running'])
+        _test_choices(self, {'q': 'x'}, [])
+
+    def test_get_bad_id(self):
+        """GET ``self.path`` with a bad ID."""
+        self.character.delete()
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_failure(self):
+        """Let some other user own ``self.character``, then GET ``self.path``.""" # pylint: disable=C0301
+        self.character.owner = factories.UserFactory.create()
+        self.character.save()
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 403)
+
 class CharacterIdSkillsTestCase(TestCase):
     """Tests for the ``character/<id>/skills/`` path."""
     def setUp(self):
@@ -1096,13 +1237,7 @@ class CharacterIdSkillsTestCase(TestCase):
             'characterskill_set-MAX_NUM_FORMS': ['10'],
         }
         response = self.client.post(self.path, data)
-        self.assertRedirects(
-            response,
-            reverse(
-                'gurps-manager-character-id-skills-update-form',
-                args=[self.character.id]
-            )
-        )
+        _test_rerendered(self, response, views.CharacterIdSkillsUpdateForm)
 
     def test_post_failure_v2(self):
         """Update a character's skills, without the rights to do so."""
@@ -1116,6 +1251,30 @@ class CharacterIdSkillsTestCase(TestCase):
         response = self.client.get(self.path)
         self.assertEqual(response.status_code, 200)
 
+    def test_get_query_count(self):
+        """Ensure the number of queries made does not grow with the table."""
+        _test_query_count(
+            self,
+            self.path,
+            lambda: factories.CharacterSkillFactory.create_batch(
+                3,
+                character=self.character
+            )
+        )
+
+    def test_get_sorted_by_score(self):
+        """GET ``self.path`` with the table sorted by score."""
+        factories.CharacterSkillFactory.create_batch(
+            5,
+            character=self.character
+        )
+        response = self.client.get(self.path, {'sort': '-score'})
+        self.assertEqual(response.status_code, 200)
+        scores = [
+            row.record.score() for row in response.context['table'].rows
+        ]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
     def test_get_bad_id(self):
         """GET ``self.path`` with a bad ID."""
         self.character.delete()
@@ -1191,6 +1350,58 @@ class CharacterIdSpellsUpdateFormTestCase(TestCase):
         response = self.client.delete(self.path, {'_method': 'DELETE'})
         self.assertEqual(response.status_code, 405)
 
+class CharacterIdSpellsChoicesTestCase(TestCase):
+    """Tests for the ``character/<id>/spells/choices/`` path."""
+    def setUp(self):
+        """Create a character, several spells and set ``self.path``.
+
+        The created character is accessible as ``self.character``. The spells
+        named "Running", "riding" and "Swimming" may be given to it, and the
+        one named "Rowing" may not.
+
+        """
+        user = _login(self.client)[0]
+        self.character = factories.CharacterFactory.create(owner=user)
+        for name in ('Running', 'riding', 'Swimming'):
+            factories.SpellFactory.create(
+                name=name,
+                campaign=self.character.campaign
+            )
+        factories.SpellFactory.create(name='Rowing')
+        self.path = reverse(
+            'gurps-manager-character-id-spells-choices',
+            args=[self.character.id]
+        )
+
+    def test_login_required(self):
+        """Ensure user must be logged in to GET this URL."""
+        _test_login_required(self, self.path)
+
+    def test_post(self):
+        """POST ``self.path``."""
+        response = self.client.post(self.path)
+        self.assertEqual(response.status_code, 405)
+
+    def test_get(self):
+        """GET ``self.path``."""
+        _test_choices(self, {}, ['riding', 'Running', 'Swimming'])
+        _test_choices(self, {'q': 'R'}, ['riding', 'Running'])
+        _test_choices(self, {'q': 'run'}, ['Running'])
+        _test_choices(self, {'q': 'x'}, [])
+
+    def test_get_bad_id(self):
+        """GET ``self.path`` with a bad ID."""
+        self.character.delete()
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_failure(self):
+        """Let some other user own ``self.character``, then GET ``self.path``.""" # pylint: disable=C0301
+        self.character.owner = factories.UserFactory.create()
+        self.character.save()
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 403)
+
 class CharacterIdSpellsTestCase(TestCase):
     """Tests for the ``character/<id>/spells/`` path."""
     def setUp(self):
@@ -1250,13 +1461,7 @@ class CharacterIdSpellsTestCase(TestCase):
             'characterspell_set-MAX_NUM_FORMS': ['10'],
         }
         response = self.client.post(self.path, data)
-        self.assertRedirects(
-            response,
-            reverse(
-                'gurps-manager-character-id-spells-update-form',
-                args=[self.character.id]
-            )
-        )
+        _test_rerendered(self, response, views.CharacterIdSpellsUpdateForm)
 
     def test_post_failure_v2(self):
         """Update a character's spells, but without the rights to do so."""
@@ -1270,6 +1475,30 @@ class CharacterIdSpellsTestCase(TestCase):
         response = self.client.get(self.path)
         self.assertEqual(response.status_code, 200)
 
+    def test_get_query_count(self):
+        """Ensure the number of queries made does not grow with the table."""
+        _test_query_count(
+            self,
+            self.path,
+            lambda: factories.CharacterSpellFactory.create_batch(
+                3,
+                character=self.character
+            )
+        )
+
+    def test_get_sorted_by_score(self):
+        """GET ``self.path`` with the table sorted by score."""
+        factories.CharacterSpellFactory.create_batch(
+            5,
+            character=self.character
+        )
+        response = self.client.get(self.path, {'sort': '-score'})
+        self.assertEqual(response.status_code, 200)
+        scores = [
+            row.record.score() for row in response.context['table'].rows
+        ]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
     def test_get_bad_id(self):
         """GET ``self.path`` with a bad ID."""
         self.character.delete()
@@ -1345,6 +1574,58 @@ class CharacterIdPossessionsUpdateFormTestCase(TestCase):
         response = self.client.delete(self.path, {'_method': 'DELETE'})
         self.assertEqual(response.status_code, 405)
 
+class CharacterIdPossessionsChoicesTestCase(TestCase):
+    """Tests for the ``character/<id>/possessions/choices/`` path."""
+    def setUp(self):
+        """Create a character, several items and set ``self.path``.
+
+        The created character is accessible as ``self.character``. The items
+        named "Running", "riding" and "Swimming" may be given to it, and the
+        one named "Rowing" may not.
+
+        """
+        user = _login(self.client)[0]
+        self.character = factories.CharacterFactory.create(owner=user)
+        for name in ('Running', 'riding', 'Swimming'):
+            factories.ItemFactory.create(
+                name=name,
+                campaign=self.character.campaign
+            )
+        factories.ItemFactory.create(name='Rowing')
+        self.path = reverse(
+            'gurps-manager-character-id-possessions-choices',
+            args=[self.character.id]
+        )
+
+    def test_login_required(self):
+        """Ensure user must be logged in to GET this URL."""
+        _test_login_required(self, self.path)
+
+    def test_post(self):
+        """POST ``self.path``."""
+        response = self.client.post(self.path)
+        self.assertEqual(response.status_code, 405)
+
+    def test_get(self):
+        """GET ``self.path``."""
+        _test_choices(self, {}, ['riding', 'Running', 'Swimming'])
+        _test_choices(self, {'q': 'R'}, ['riding', 'Running'])
+        _test_choices(self, {'q': 'run'}, ['Running'])
+        _test_choices(self, {'q': 'x'}, [])
+
+    def test_get_bad_id(self):
+        """GET ``self.path`` with a bad ID."""
+        self.character.delete()
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_failure(self):
+        """Let some other user own ``self.character``, then GET ``self.path``.""" # pylint: disable=C0301
+        self.character.owner = factories.UserFactory.create()
+        self.character.save()
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 403)
+
 class CharacterIdPossessionsTestCase(TestCase):
     """Tests for the ``character/<id>/possessions/`` path."""
     def setUp(self):
@@ -1404,12 +1685,10 @@ class CharacterIdPossessionsTestCase(TestCase):
             'possession_set-0-quantity': ['-1'],
         }
         response = self.client.post(self.path, data)
-        self.assertRedirects(
+        _test_rerendered(
+            self,
             response,
-            reverse(
-                'gurps-manager-character-id-possessions-update-form',
-                args=[self.character.id]
-            )
+            views.CharacterIdPossessionsUpdateForm
         )
 
     def test_post_failure_v2(self):
@@ -1427,6 +1706,17 @@ class CharacterIdPossessionsTestCase(TestCase):
         response = self.client.get(self.path)
         self.assertEqual(response.status_code, 200)
 
+    def test_get_query_count(self):
+        """Ensure the number of queries made does not grow with the table."""
+        _test_query_count(
+            self,
+            self.path,
+            lambda: factories.PossessionFactory.create_batch(
+                3,
+                character=self.character
+            )
+        )
+
     def test_get_bad_id(self):
         """GET ``self.path`` with a bad ID."""
         self.character.delete()
@@ -1557,13 +1847,7 @@ class CharacterIdTraitsTestCase(TestCase):
             'trait_set-0-points': ['-1'],
         }
         response = self.client.post(self.path, data)
-        self.assertRedirects(
-            response,
-            reverse(
-                'gurps-manager-character-id-traits-update-form',
-                args=[self.character.id]
-            )
-        )
+        _test_rerendered(self, response, views.CharacterIdTraitsUpdateForm)
 
     def test_post_failure_v3(self):
         """Create a trait for a character, but without rights to do so."""
@@ -1716,12 +2000,10 @@ class CharacterIdHitLocationsTestCase(TestCase):
             'hitlocation_set-0-damage_taken': ['-1'],
         }
         response = self.client.post(self.path, data)
-        self.assertRedirects(
+        _test_rerendered(
+            self,
             response,
-            reverse(
-                'gurps-manager-character-id-hit-locations-update-form',
-                args=[self.character.id]
-            )
+            views.CharacterIdHitLocationsUpdateForm
         )
 
     def test_post_failure_v3(self):
@@ -1766,6 +2048,74 @@ class CharacterIdHitLocationsTestCase(TestCase):
         response = self.client.delete(self.path, {'_method': 'DELETE'})
         self.assertEqual(response.status_code, 405)
 
+class ProfileTestCase(TestCase):
+    """Tests for the ``admin/profiles/`` paths."""
+    NAME = '20140501-123015-000005-gurps-manager-index.txt'
+
+    def setUp(self):
+        """Log in as a superuser, and write a profile to a new directory."""
+        self.user = _login(self.client)[0]
+        self.user.is_staff = True
+        self.user.is_superuser = True
+        self.user.save()
+        self.directory = tempfile.mkdtemp()
+        with open(
+            os.path.join(self.directory, self.NAME),
+            'w',
+            encoding='utf-8'
+        ) as handle:
+            handle.write('GET /gurps-manager/\n')
+        self.path = reverse('gurps-manager-profile')
+
+    def tearDown(self):
+        """Remove the directory of profiles."""
+        shutil.rmtree(self.directory)
+
+    def _get(self, path):
+        """GET ``path``, with profiles read from ``self.directory``."""
+        with self.settings(GURPS_MANAGER_PROFILE_DIR=self.directory):
+            return self.client.get(path)
+
+    def test_get(self):
+        """List the profiles."""
+        response = self._get(self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.NAME)
+
+    def test_get_name(self):
+        """Download a profile."""
+        response = self._get(
+            reverse('gurps-manager-profile-name', args=[self.NAME])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'GET /gurps-manager/\n')
+
+    def test_get_bad_name(self):
+        """Download a profile which does not exist."""
+        response = self._get(
+            reverse('gurps-manager-profile-name', args=['nonexistent.prof'])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_failure(self):
+        """List the profiles as a staff member who is not a superuser."""
+        self.user.is_superuser = False
+        self.user.save()
+        response = self._get(self.path)
+        self.assertEqual(response.status_code, 403)
+        response = self._get(
+            reverse('gurps-manager-profile-name', args=[self.NAME])
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_login_required(self):
+        """Ensure an ordinary user is sent to the admin login page."""
+        self.user.is_staff = False
+        self.user.is_superuser = False
+        self.user.save()
+        response = self._get(self.path)
+        self.assertNotContains(response, self.NAME, status_code=200)
+
 def _login(client):
     """Create a user and log it in to ``client``.
 
@@ -1797,3 +2147,45 @@ def _test_login_required(test_case, url=None):
         test_case.client.get(url),
         '{}?next={}'.format(reverse('gurps-manager-login'), url)
     )
+
+def _test_rerendered(test_case, response, view):
+    """Assert that ``response`` re-renders the form of ``view`` with errors.
+
+    ``test_case`` is an instance of a ``TestCase`` subclass. ``view`` is a view
+    class with a ``template_name``. Invalid submissions should be answered
+    directly, without a redirect and without writing to the session.
+
+    """
+    test_case.assertEqual(response.status_code, 200)
+    test_case.assertTemplateUsed(response, view.template_name)
+    test_case.assertNotIn('form_data', test_case.client.session)
+
+def _test_choices(test_case, data, names):
+    """GET ``test_case.path`` with query parameters ``data``.
+
+    ``test_case`` is an instance of a ``TestCase`` subclass. Assert that the
+    response is a JSON list of choices with names ``names``, in that order.
+
+    """
+    response = test_case.client.get(test_case.path, data)
+    test_case.assertEqual(response.status_code, 200)
+    test_case.assertEqual(response['Content-Type'], 'application/json')
+    choices = json.loads(response.content.decode('utf-8'))
+    test_case.assertEqual([choice['text'] for choice in choices], names)
+
+def _test_query_count(test_case, url, add_rows):
+    """Call ``add_rows`` and GET ``url``, twice.
+
+    ``test_case`` is an instance of a ``TestCase`` subclass. ``add_rows`` is a
+    function which adds rows to the page at ``url``. Both requests should make
+    the same number of queries. (Rows are added before the first request, as
+    Django skips some queries when there is nothing to fetch.)
+
+    """
+    add_rows()
+    with CaptureQueriesContext(connection) as queries:
+        test_case.client.get(url)
+    add_rows()
+    with test_case.assertNumQueries(len(queries)):
+        response = test_case.client.get(url)
+    test_case.assertEqual(response.status_code, 200)
@@ -6,7 +6,20 @@ https://docs.djangoproject.com/en/1.6/topics/testing/overview/
 
 """
 from doctest import DocTestSuite
-from gurps_manager import factories, models, tables, views, forms
+from gurps_manager import (
+    access,
+    factories,
+    forms,
+    matrix,
+    middleware,
+    models,
+    profiling,
+    sessions,
+    sheets,
+    sqlite,
+    tables,
+    views,
+)
 
 def load_tests(loader, tests, ignore): # pylint: disable=W0613
     """Create a suite of doctests from this Django application."""
@@ -15,4 +28,11 @@ def load_tests(loader, tests, ignore): # pylint: disable=W0613
     tests.addTests(DocTestSuite(tables))
     tests.addTests(DocTestSuite(views))
     tests.addTests(DocTestSuite(forms))
+    tests.addTests(DocTestSuite(matrix))
+    tests.addTests(DocTestSuite(sheets))
+    tests.addTests(DocTestSuite(access))
+    tests.addTests(DocTestSuite(sessions))
+    tests.addTests(DocTestSuite(sqlite))
+    tests.addTests(DocTestSuite(middleware))
+    tests.addTests(DocTestSuite(profiling))
     return tests
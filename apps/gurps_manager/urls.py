@@ -17,6 +17,7 @@ URL                                            POST     GET    PUT      DELETE
 ``campaign/<id>/delete-form/``                          *
 ``campaign/<id>/items/``                       *        *
 ``campaign/<id>/items/update-form/``                    *
+``campaign/<id>/skill-matrix/``                         *
 ``campaign/<id>/spells/``                      *        *
 ``campaign/<id>/spells/update-form/``                   *
 ``character/``                                 *        *
@@ -26,10 +27,13 @@ URL                                            POST     GET    PUT      DELETE
 ``character/<id>/hit-locations/``              *        *
 ``character/<id>/hit-locations/update-form/``           *
 ``character/<id>/possessions/``                *        *
+``character/<id>/possessions/choices/``                 *
 ``character/<id>/possessions/update-form/``             *
 ``character/<id>/skills/``                     *        *
+``character/<id>/skills/choices/``                      *
 ``character/<id>/skills/update-form/``                  *
 ``character/<id>/spells/``                     *        *
+``character/<id>/spells/choices/``                      *
 ``character/<id>/spells/update-form/``                  *
 ``character/<id>/traits/``                     *        *
 ``character/<id>/traits/update-form/``                  *
@@ -63,6 +67,7 @@ curious are encouraged to do some research.
 """
 from django.conf.urls import patterns, url
 from django.contrib.auth.decorators import login_required
+from django.core.urlresolvers import reverse
 from gurps_manager import views
 
 # WARNING! URL names must be unique in all django apps. If any URLs have the
@@ -115,6 +120,11 @@ urlpatterns = patterns( # pylint: disable=C0103
         login_required(views.CampaignIdItemsUpdateForm.as_view()),
         name='gurps-manager-campaign-id-items-update-form',
     ),
+    url(
+        r'^campaign/(\d+)/skill-matrix/$',
+        login_required(views.CampaignIdSkillMatrix.as_view()),
+        name='gurps-manager-campaign-id-skill-matrix',
+    ),
     url(
         r'^campaign/(\d+)/spells/$',
         login_required(views.CampaignIdSpells.as_view()),
@@ -162,6 +172,11 @@ urlpatterns = patterns( # pylint: disable=C0103
         login_required(views.CharacterIdSkillsUpdateForm.as_view()),
         name='gurps-manager-character-id-skills-update-form',
     ),
+    url(
+        r'^character/(\d+)/skills/choices/$',
+        login_required(views.CharacterIdSkillsChoices.as_view()),
+        name='gurps-manager-character-id-skills-choices',
+    ),
     url(
         r'^character/(\d+)/spells/$',
         login_required(views.CharacterIdSpells.as_view()),
@@ -172,6 +187,11 @@ urlpatterns = patterns( # pylint: disable=C0103
         login_required(views.CharacterIdSpellsUpdateForm.as_view()),
         name='gurps-manager-character-id-spells-update-form',
     ),
+    url(
+        r'^character/(\d+)/spells/choices/$',
+        login_required(views.CharacterIdSpellsChoices.as_view()),
+        name='gurps-manager-character-id-spells-choices',
+    ),
     url(
         r'^character/(\d+)/possessions/$',
         login_required(views.CharacterIdPossessions.as_view()),
@@ -182,6 +202,11 @@ urlpatterns = patterns( # pylint: disable=C0103
         login_required(views.CharacterIdPossessionsUpdateForm.as_view()),
         name='gurps-manager-character-id-possessions-update-form',
     ),
+    url(
+        r'^character/(\d+)/possessions/choices/$',
+        login_required(views.CharacterIdPossessionsChoices.as_view()),
+        name='gurps-manager-character-id-possessions-choices',
+    ),
     url(
         r'^character/(\d+)/traits/$',
         login_required(views.CharacterIdTraits.as_view()),
@@ -203,3 +228,57 @@ urlpatterns = patterns( # pylint: disable=C0103
         name='gurps-manager-character-id-hit-locations-update-form',
     ),
 )
+
+# The most SQL queries that a request to each of these URLs should make,
+# including the queries made by middleware. ``gurps_manager.middleware`` logs a
+# warning whenever a request goes over budget. A page whose query count grows
+# with the number of rows it shows will soon do so. URLs not listed here have
+# no budget.
+QUERY_BUDGETS = {
+    'gurps-manager-index': 5,
+    'gurps-manager-login': 5,
+    'gurps-manager-campaign': 10,
+    'gurps-manager-campaign-id': 10,
+    'gurps-manager-campaign-id-items': 10,
+    'gurps-manager-campaign-id-items-update-form': 10,
+    'gurps-manager-campaign-id-skill-matrix': 15,
+    'gurps-manager-campaign-id-spells': 10,
+    'gurps-manager-campaign-id-spells-update-form': 10,
+    'gurps-manager-character': 10,
+    'gurps-manager-character-id': 15,
+    'gurps-manager-character-id-hit-locations': 10,
+    'gurps-manager-character-id-hit-locations-update-form': 10,
+    'gurps-manager-character-id-possessions': 10,
+    'gurps-manager-character-id-possessions-choices': 5,
+    'gurps-manager-character-id-possessions-update-form': 10,
+    'gurps-manager-character-id-skills': 10,
+    'gurps-manager-character-id-skills-choices': 5,
+    'gurps-manager-character-id-skills-update-form': 10,
+    'gurps-manager-character-id-spells': 10,
+    'gurps-manager-character-id-spells-choices': 5,
+    'gurps-manager-character-id-spells-update-form': 10,
+    'gurps-manager-character-id-traits': 10,
+    'gurps-manager-character-id-traits-update-form': 10,
+}
+
+def named_urls(campaign_id, character_id):
+    """Yield the name and path of each named URL in ``urlpatterns``.
+
+    URLs which take an ID are given ``campaign_id`` or ``character_id``, as the
+    URL's name implies. Commands which request every page, such as
+    ``benchmark`` and ``audit_indexes``, use this so that no page is missed.
+
+    """
+    for pattern in urlpatterns:
+        url_name = pattern.name
+        if url_name is None:
+            continue
+        args = []
+        if pattern.regex.groups:
+            if url_name.startswith('gurps-manager-campaign-'):
+                args = [campaign_id]
+            elif url_name.startswith('gurps-manager-character-'):
+                args = [character_id]
+            else:
+                continue
+        yield url_name, reverse(url_name, args=args)
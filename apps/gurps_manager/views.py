@@ -7,9 +7,21 @@ from django import http
 from django.shortcuts import render
 from django_tables2 import RequestConfig
 from django.views.generic.base import View
-from gurps_manager import forms, models, tables
+from gurps_manager import (
+    access,
+    forms,
+    matrix,
+    models,
+    profiling,
+    sheets,
+    tables,
+)
+import copy
 import json
 
+# The most choices that a ``*Choices`` view returns.
+MAX_CHOICES = 20
+
 # pylint: disable=E1101
 # Instance of 'CampaignForm' has no 'is_valid' member (no-member)
 # pylint: disable=R0201
@@ -23,27 +35,24 @@ class Index(View):
 
 class Login(View):
     """Handle a request for ``login/``."""
+    template_name = 'gurps_manager/login.html'
+
     def get(self, request):
         """Return a form for logging in."""
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            form = forms.LoginForm()
-        else:
-            form = forms.LoginForm(json.loads(form_data))
-        return render(request, 'gurps_manager/login.html', {'form': form})
+        form = forms.LoginForm()
+        return render(request, self.template_name, {'form': form})
 
     def post(self, request):
         """Log in user.
 
-        If login suceeds, redirect user to ``index`` view. Otherwise, redirect
-        user to ``login`` view.
+        If login suceeds, redirect user to ``index`` view. Otherwise, re-render
+        the login form with its errors.
 
         """
         # Check validity of submitted data
         form = forms.LoginForm(request.POST)
         if not form.is_valid():
-            request.session['form_data'] = json.dumps(form.data)
-            return http.HttpResponseRedirect(reverse('gurps-manager-login'))
+            return render(request, Login.template_name, {'form': form})
 
         # Check for invalid credentials.
         user = auth.authenticate(
@@ -54,16 +63,14 @@ class Login(View):
             form._errors[NON_FIELD_ERRORS] = form.error_class([
                 'Credentials are invalid.'
             ])
-            request.session['form_data'] = json.dumps(form.data)
-            return http.HttpResponseRedirect(reverse('gurps-manager-login'))
+            return render(request, Login.template_name, {'form': form})
 
         # Check for inactive user
         if not user.is_active:
             form._errors[NON_FIELD_ERRORS] = form.error_class([
                 'Account is inactive.'
             ])
-            request.session['form_data'] = json.dumps(form.data)
-            return http.HttpResponseRedirect(reverse('gurps-manager-login'))
+            return render(request, Login.template_name, {'form': form})
 
         # Everything checks out. Let 'em in.
         auth.login(request, user)
@@ -89,7 +96,7 @@ class Campaign(View):
         """Create a new item.
 
         If creation succeeds, rediret user to ``CampaignId`` view. Otherwise,
-        redirect user to ``CampaignCreateForm`` view.
+        re-render the ``CampaignCreateForm`` form with its errors.
 
         """
         form = forms.CampaignForm(request.POST)
@@ -100,11 +107,11 @@ class Campaign(View):
                 args=[new_campaign.id]
             ))
         else:
-            # Put form data into session. Destination view will use it.
-            request.session['form_data'] = json.dumps(form.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-campaign-create-form'
-            ))
+            return render(
+                request,
+                CampaignCreateForm.template_name,
+                {'form': form}
+            )
 
     def get(self, request):
         """Return a list of all campaigns viewable by a user."""
@@ -120,16 +127,14 @@ class Campaign(View):
 
 class CampaignCreateForm(View):
     """Handle a request for ``campaign/create-form/``."""
+    template_name = 'gurps_manager/campaign_templates/campaign-create-form.html' # pylint: disable=C0301
+
     def get(self, request):
         """Return a form for creating a campaign."""
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            form = forms.CampaignForm()
-        else:
-            form = forms.CampaignForm(json.loads(form_data))
+        form = forms.CampaignForm()
         return render(
             request,
-            'gurps_manager/campaign_templates/campaign-create-form.html',
+            self.template_name,
             {'form': form}
         )
 
@@ -138,7 +143,7 @@ class CampaignId(View):
     def get(self, request, campaign_id):
         """Return information about campaign ``campaign_id``."""
         campaign = _get_model_object_or_404(models.Campaign, campaign_id)
-        if campaign not in _viewable_campaigns(request.user):
+        if not _user_can_view_campaign(request.user, campaign):
             return http.HttpResponseForbidden(
                 'Error: you do not have the rights to view this campaign.'
             )
@@ -152,7 +157,7 @@ class CampaignId(View):
         """Update campaign ``campaign_id``.
 
         If update suceeds, redirect user to ``CampaignId`` view. Otherwise,
-        redirect user to ``CampaignIdUpdateForm`` view.
+        re-render the ``CampaignIdUpdateForm`` form with its errors.
 
         """
         campaign = _get_model_object_or_404(models.Campaign, campaign_id)
@@ -160,6 +165,9 @@ class CampaignId(View):
             return http.HttpResponseForbidden(
                 'Error: you do not own this campaign.'
             )
+        # Validating the form changes ``campaign``. Show the saved campaign in
+        # the page's title and links if the form is re-rendered.
+        saved_campaign = copy.copy(campaign)
         form = forms.CampaignForm(request.POST, instance=campaign)
         if form.is_valid():
             form.save()
@@ -168,11 +176,11 @@ class CampaignId(View):
                 args=[campaign_id]
             ))
         else:
-            request.session['form_data'] = json.dumps(form.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-campaign-id-update-form',
-                args=[campaign_id]
-            ))
+            return render(
+                request,
+                CampaignIdUpdateForm.template_name,
+                {'campaign': saved_campaign, 'form': form}
+            )
 
     def delete(self, request, campaign_id): #pylint: disable=W0613
         """Delete campaign ``campaign_id``.
@@ -195,6 +203,8 @@ class CampaignId(View):
 
 class CampaignIdUpdateForm(View):
     """Handle a request for ``campaign/<id>/update-form``."""
+    template_name = 'gurps_manager/campaign_templates/campaign-id-update-form.html' # pylint: disable=C0301
+
     def get(self, request, campaign_id):
         """Return a form for updating campaign ``campaign_id``."""
         campaign = _get_model_object_or_404(models.Campaign, campaign_id)
@@ -202,19 +212,17 @@ class CampaignIdUpdateForm(View):
             return http.HttpResponseForbidden(
                 'Error: you do not own this campaign.'
             )
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            form = forms.CampaignForm(instance=campaign)
-        else:
-            form = forms.CampaignForm(json.loads(form_data))
+        form = forms.CampaignForm(instance=campaign)
         return render(
             request,
-            'gurps_manager/campaign_templates/campaign-id-update-form.html',
+            self.template_name,
             {'campaign': campaign, 'form': form}
         )
 
 class CampaignIdDeleteForm(View):
     """Handle a request for ``campaign/<id>/delete-form``."""
+    template_name = 'gurps_manager/campaign_templates/campaign-id-delete-form.html' # pylint: disable=C0301
+
     def get(self, request, campaign_id):
         """Return a form for deleting campaign ``campaign_id``."""
         campaign = _get_model_object_or_404(models.Campaign, campaign_id)
@@ -224,7 +232,7 @@ class CampaignIdDeleteForm(View):
             )
         return render(
             request,
-            'gurps_manager/campaign_templates/campaign-id-delete-form.html',
+            self.template_name,
             {'campaign': campaign}
         )
 
@@ -234,7 +242,7 @@ class Character(View):
         """Create a new item.
 
         If creation succeeds, rediret user to ``CharacterId`` view. Otherwise,
-        redirect user to ``CharacterCreateForm`` view.
+        re-render the ``CharacterCreateForm`` form with its errors.
 
         """
         form = forms.CharacterForm(request.POST)
@@ -245,11 +253,11 @@ class Character(View):
                 args=[new_character.id]
             ))
         else:
-            # Put form data into session. Destination view will use it.
-            request.session['form_data'] = json.dumps(form.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-character-create-form'
-            ))
+            return render(
+                request,
+                CharacterCreateForm.template_name,
+                {'form': form}
+            )
 
     def get(self, request):
         """Return information about several characters.
@@ -257,7 +265,7 @@ class Character(View):
         Only show characters that ``_viewable_characters`` returns.
 
         """
-        characters = _viewable_characters(request.user)
+        characters = _viewable_characters(request.user).with_point_totals()
         character_table_cls = tables.character_table(request.user)
         table = character_table_cls(characters)
         RequestConfig(request).configure(table)
@@ -271,22 +279,35 @@ class CharacterId(View):
     """Handle a request for ``character/<id>/``."""
     def get(self, request, character_id):
         """Return information about character ``character_id``."""
-        character = _get_model_object_or_404(models.Character, character_id)
-        if character not in _viewable_characters(request.user):
+        # Check access before fetching the rest of the sheet, so that refused
+        # requests stay cheap.
+        try:
+            character = models.Character.objects.select_related(
+                'campaign',
+                'owner'
+            ).get(id=character_id)
+        except models.Character.DoesNotExist:
+            raise http.Http404
+        if not _user_can_view_character(request.user, character):
             return http.HttpResponseForbidden(
                 'Error: you do not have the rights to view this character.'
             )
+        sheet = sheets.CharacterSheet.prefetch(character)
         return render(
             request,
             'gurps_manager/character_templates/character-id.html',
-            {'character': character, 'user': request.user}
+            {
+                'character': sheet.character,
+                'sheet': sheet,
+                'user': request.user,
+            }
         )
 
     def put(self, request, character_id):
         """Update character ``character_id``.
 
         If update suceeds, redirect user to ``CharacterId`` view. Otherwise,
-        redirect user to ``CharacterIdUpdateForm`` view.
+        re-render the ``CharacterIdUpdateForm`` form with its errors.
 
         """
         # Does the requested character exist, and is the user authorized to
@@ -297,7 +318,10 @@ class CharacterId(View):
                 'Error: you do not own this character.'
             )
 
-        # Attempt to save changes. Reply.
+        # Attempt to save changes. Reply. Validating the form changes
+        # ``character``, so show the saved character in the page's title and
+        # links if the form is re-rendered.
+        saved_character = copy.copy(character)
         form = forms.CharacterForm(request.POST, instance=character)
         if form.is_valid():
             form.save()
@@ -306,11 +330,11 @@ class CharacterId(View):
                 args=[character_id]
             ))
         else:
-            request.session['form_data'] = json.dumps(form.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-character-id-update-form',
-                args=[character_id]
-            ))
+            return render(
+                request,
+                CharacterIdUpdateForm.template_name,
+                {'character': saved_character, 'form': form}
+            )
 
     def delete(self, request, character_id): #pylint: disable=W0613
         """Delete character ``character_id``.
@@ -333,21 +357,21 @@ class CharacterId(View):
 
 class CharacterCreateForm(View):
     """Handle a request for ``character/create-form/``."""
+    template_name = 'gurps_manager/character_templates/character-create-form.html' # pylint: disable=C0301
+
     def get(self, request):
         """Return a form for creating a character."""
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            form = forms.CharacterForm()
-        else:
-            form = forms.CharacterForm(json.loads(form_data))
+        form = forms.CharacterForm()
         return render(
             request,
-            'gurps_manager/character_templates/character-create-form.html',
+            self.template_name,
             {'form': form}
         )
 
 class CharacterIdUpdateForm(View):
     """Handle a request for ``character/<id>/update-form``."""
+    template_name = 'gurps_manager/character_templates/character-id-update-form.html' # pylint: disable=C0301
+
     def get(self, request, character_id):
         """Return a form for updating character ``character_id``."""
         # Does the requested character exist, and is the user authorized to
@@ -359,19 +383,17 @@ class CharacterIdUpdateForm(View):
             )
 
         # Populate and return an update form.
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            form = forms.CharacterForm(instance=character)
-        else:
-            form = forms.CharacterForm(json.loads(form_data))
+        form = forms.CharacterForm(instance=character)
         return render(
             request,
-            'gurps_manager/character_templates/character-id-update-form.html',
+            self.template_name,
             {'character': character, 'form': form}
         )
 
 class CharacterIdDeleteForm(View):
     """Handle a request for ``character/<id>/delete-form``."""
+    template_name = 'gurps_manager/character_templates/character-id-delete-form.html' # pylint: disable=C0301
+
     def get(self, request, character_id):
         """Return a form for deleting character ``character_id``."""
         character = _get_model_object_or_404(models.Character, character_id)
@@ -381,7 +403,7 @@ class CharacterIdDeleteForm(View):
             )
         return render(
             request,
-            'gurps_manager/character_templates/character-id-delete-form.html',
+            self.template_name,
             {'character': character}
         )
 
@@ -398,7 +420,9 @@ class CharacterIdSkills(View):
 
         # Reply.
         table = tables.CharacterSkillTable(
-            models.CharacterSkill.objects.filter(character=character_id)
+            models.CharacterSkill.objects.filter( # pylint: disable=E1101
+                character=character_id
+            ).with_scores()
         )
         RequestConfig(request).configure(table)
         return render(
@@ -426,15 +450,16 @@ class CharacterIdSkills(View):
                 args=[character_id]
             ))
         else:
-            # Put formset data into session. Destination view will use it.
-            request.session['form_data'] = json.dumps(formset.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-character-id-skills-update-form',
-                args=[character_id]
-            ))
+            return render(
+                request,
+                CharacterIdSkillsUpdateForm.template_name,
+                {'character': character, 'formset': formset}
+            )
 
 class CharacterIdSkillsUpdateForm(View):
     """Handle a request for ``character/<id>/skills/update-form``."""
+    template_name = 'gurps_manager/character_templates/character-id-skills-update-form.html' # pylint: disable=C0301
+
     def get(self, request, character_id):
         """Return a form for updating character ``character_id``'s skills."""
         # Check whether the character exists, and whether we own it.
@@ -446,19 +471,25 @@ class CharacterIdSkillsUpdateForm(View):
 
         # Generate a form.
         formset_cls = forms.character_skill_formset(character)
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            formset = formset_cls(instance=character)
-        else:
-            formset = formset_cls(json.loads(form_data))
+        formset = formset_cls(instance=character)
 
         # Reply.
         return render(
             request,
-            'gurps_manager/character_templates/character-id-skills-update-form.html', # pylint: disable=C0301
+            self.template_name,
             {'character': character, 'formset': formset}
         )
 
+class CharacterIdSkillsChoices(View):
+    """Handle a request for ``character/<id>/skills/choices/``."""
+    def get(self, request, character_id):
+        """Return the skills character ``character_id`` may be given, as JSON.
+
+        See ``_choices_response``.
+
+        """
+        return _choices_response(request, character_id, forms.skill_choices)
+
 class CharacterIdSpells(View):
     """Handle a request for ``character/<id>/spells``."""
     def get(self, request, character_id):
@@ -472,7 +503,9 @@ class CharacterIdSpells(View):
 
         # Reply.
         table = tables.CharacterSpellTable(
-            models.CharacterSpell.objects.filter(character=character_id)
+            models.CharacterSpell.objects.filter( # pylint: disable=E1101
+                character=character_id
+            ).with_scores()
         )
         RequestConfig(request).configure(table)
         return render(
@@ -500,15 +533,16 @@ class CharacterIdSpells(View):
                 args=[character_id]
             ))
         else:
-            # Put formset data into session. Destination view will use it.
-            request.session['form_data'] = json.dumps(formset.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-character-id-spells-update-form',
-                args=[character_id]
-            ))
+            return render(
+                request,
+                CharacterIdSpellsUpdateForm.template_name,
+                {'character': character, 'formset': formset}
+            )
 
 class CharacterIdSpellsUpdateForm(View):
     """Handle a request for ``character/<id>/spells/update-form``."""
+    template_name = 'gurps_manager/character_templates/character-id-spells-update-form.html' # pylint: disable=C0301
+
     def get(self, request, character_id):
         """Return a form for updating character ``character_id``'s spells."""
         # Check whether the character exists, and whether the user owns it.
@@ -520,19 +554,25 @@ class CharacterIdSpellsUpdateForm(View):
 
         # Generate a form.
         formset_cls = forms.character_spell_formset(character)
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            formset = formset_cls(instance=character)
-        else:
-            formset = formset_cls(json.loads(form_data))
+        formset = formset_cls(instance=character)
 
         # Reply.
         return render(
             request,
-            'gurps_manager/character_templates/character-id-spells-update-form.html', # pylint: disable=C0301
+            self.template_name,
             {'character': character, 'formset': formset}
         )
 
+class CharacterIdSpellsChoices(View):
+    """Handle a request for ``character/<id>/spells/choices/``."""
+    def get(self, request, character_id):
+        """Return the spells character ``character_id`` may be given, as JSON.
+
+        See ``_choices_response``.
+
+        """
+        return _choices_response(request, character_id, forms.spell_choices)
+
 class CharacterIdPossessions(View):
     """Handle a request for ``character/<id>/possessions``."""
     def get(self, request, character_id):
@@ -574,15 +614,16 @@ class CharacterIdPossessions(View):
                 args=[character_id]
             ))
         else:
-            # Put formset data into session. Destination view will use it.
-            request.session['form_data'] = json.dumps(formset.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-character-id-possessions-update-form',
-                args=[character_id]
-            ))
+            return render(
+                request,
+                CharacterIdPossessionsUpdateForm.template_name,
+                {'character': character, 'formset': formset}
+            )
 
 class CharacterIdPossessionsUpdateForm(View):
     """Handle a request for ``character/<id>/possessions/update-form``."""
+    template_name = 'gurps_manager/character_templates/character-id-possessions-update-form.html' # pylint: disable=C0301
+
     def get(self, request, character_id):
         """Return a form for updating character ``character_id``'s possessions.""" # pylint: disable=C0301
         # Check whether the character exists, and whether the user owns it.
@@ -594,19 +635,25 @@ class CharacterIdPossessionsUpdateForm(View):
 
         # Generate a form.
         formset_cls = forms.possession_formset(character)
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            formset = formset_cls(instance=character)
-        else:
-            formset = formset_cls(json.loads(form_data))
+        formset = formset_cls(instance=character)
 
         # Reply.
         return render(
             request,
-            'gurps_manager/character_templates/character-id-possessions-update-form.html', # pylint: disable=C0301
+            self.template_name,
             {'character': character, 'formset': formset}
         )
 
+class CharacterIdPossessionsChoices(View):
+    """Handle a request for ``character/<id>/possessions/choices/``."""
+    def get(self, request, character_id):
+        """Return the items character ``character_id`` may be given, as JSON.
+
+        See ``_choices_response``.
+
+        """
+        return _choices_response(request, character_id, forms.item_choices)
+
 class CharacterIdTraits(View):
     """Handle a request for ``character/<id>/traits/``."""
     def get(self, request, character_id):
@@ -648,15 +695,16 @@ class CharacterIdTraits(View):
                 args=[character_id]
             ))
         else:
-            # Put formset data into session. Destination view will use it.
-            request.session['form_data'] = json.dumps(formset.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-character-id-traits-update-form',
-                args=[character_id]
-            ))
+            return render(
+                request,
+                CharacterIdTraitsUpdateForm.template_name,
+                {'character': character, 'formset': formset}
+            )
 
 class CharacterIdTraitsUpdateForm(View):
     """Handle a request for ``character/<id>/traits/update-form``."""
+    template_name = 'gurps_manager/character_templates/character-id-traits-update-form.html' # pylint: disable=C0301
+
     def get(self, request, character_id):
         """Return a form for updating character ``character_id``'s traits.""" # pylint: disable=C0301
         # Check whether the character exists, and whether the user owns it.
@@ -668,16 +716,12 @@ class CharacterIdTraitsUpdateForm(View):
 
         # Generate a form.
         formset_cls = forms.trait_formset()
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            formset = formset_cls(instance=character)
-        else:
-            formset = formset_cls(json.loads(form_data))
+        formset = formset_cls(instance=character)
 
         # Reply.
         return render(
             request,
-            'gurps_manager/character_templates/character-id-traits-update-form.html', # pylint: disable=C0301
+            self.template_name,
             {'character': character, 'formset': formset}
         )
 
@@ -722,15 +766,16 @@ class CharacterIdHitLocations(View):
                 args=[character_id]
             ))
         else:
-            # Put formset data into session. Destination view will use it.
-            request.session['form_data'] = json.dumps(formset.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-character-id-hit-locations-update-form',
-                args=[character_id]
-            ))
+            return render(
+                request,
+                CharacterIdHitLocationsUpdateForm.template_name,
+                {'character': character, 'formset': formset}
+            )
 
 class CharacterIdHitLocationsUpdateForm(View):
     """Handle a request for ``character/<id>/hit-locations/update-form``."""
+    template_name = 'gurps_manager/character_templates/character-id-hit-locations-update-form.html' # pylint: disable=C0301
+
     def get(self, request, character_id):
         """Return a form for updating character ``character_id``'s hit-locations.""" # pylint: disable=C0301
         # Check whether the character exists, and whether the user owns it.
@@ -742,16 +787,12 @@ class CharacterIdHitLocationsUpdateForm(View):
 
         # Generate a form.
         formset_cls = forms.hit_location_formset()
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            formset = formset_cls(instance=character)
-        else:
-            formset = formset_cls(json.loads(form_data))
+        formset = formset_cls(instance=character)
 
         # Reply.
         return render(
             request,
-            'gurps_manager/character_templates/character-id-hit-locations-update-form.html', # pylint: disable=C0301
+            self.template_name,
             {'character': character, 'formset': formset}
         )
 
@@ -796,15 +837,16 @@ class CampaignIdItems(View):
                 args=[campaign_id]
             ))
         else:
-            # Put formset data into session. Destination view will use it.
-            request.session['form_data'] = json.dumps(formset.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-campaign-id-items-update-form',
-                args=[campaign_id]
-            ))
+            return render(
+                request,
+                CampaignIdItemsUpdateForm.template_name,
+                {'campaign': campaign, 'formset': formset}
+            )
 
 class CampaignIdItemsUpdateForm(View):
     """Handle a request for ``campaign/<id>/items/update-form``."""
+    template_name = 'gurps_manager/campaign_templates/campaign-id-items-update-form.html' # pylint: disable=C0301
+
     def get(self, request, campaign_id):
         """Return a form for updating campaign ``campaign_id``'s items.""" # pylint: disable=C0301
         # Check whether the campaign exists, and whether the user owns it.
@@ -816,16 +858,12 @@ class CampaignIdItemsUpdateForm(View):
 
         # Generate a form.
         formset_cls = forms.campaign_items_formset()
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            formset = formset_cls(instance=campaign)
-        else:
-            formset = formset_cls(json.loads(form_data))
+        formset = formset_cls(instance=campaign)
 
         # Reply.
         return render(
             request,
-            'gurps_manager/campaign_templates/campaign-id-items-update-form.html', # pylint: disable=C0301
+            self.template_name,
             {'campaign': campaign, 'formset': formset}
         )
 
@@ -870,15 +908,16 @@ class CampaignIdSpells(View):
                 args=[campaign_id]
             ))
         else:
-            # Put formset data into session. Destination view will use it.
-            request.session['form_data'] = json.dumps(formset.data)
-            return http.HttpResponseRedirect(reverse(
-                'gurps-manager-campaign-id-spells-update-form',
-                args=[campaign_id]
-            ))
+            return render(
+                request,
+                CampaignIdSpellsUpdateForm.template_name,
+                {'campaign': campaign, 'formset': formset}
+            )
 
 class CampaignIdSpellsUpdateForm(View):
     """Handle a request for ``campaign/<id>/spells/update-form``."""
+    template_name = 'gurps_manager/campaign_templates/campaign-id-spells-update-form.html' # pylint: disable=C0301
+
     def get(self, request, campaign_id):
         """Return a form for updating campaign ``campaign_id``'s spells.""" # pylint: disable=C0301
         # Check whether the campaign exists, and whether the user owns it.
@@ -890,19 +929,82 @@ class CampaignIdSpellsUpdateForm(View):
 
         # Generate a form.
         formset_cls = forms.campaign_spells_formset()
-        form_data = request.session.pop('form_data', None)
-        if form_data is None:
-            formset = formset_cls(instance=campaign)
-        else:
-            formset = formset_cls(json.loads(form_data))
+        formset = formset_cls(instance=campaign)
 
         # Reply.
         return render(
             request,
-            'gurps_manager/campaign_templates/campaign-id-spells-update-form.html', # pylint: disable=C0301
+            self.template_name,
             {'campaign': campaign, 'formset': formset}
         )
 
+class CampaignIdSkillMatrix(View):
+    """Handle a request for ``campaign/<id>/skill-matrix/``."""
+    def get(self, request, campaign_id):
+        """Return every character's score in every skill and spell.
+
+        Only characters in campaign ``campaign_id`` are shown.
+
+        """
+        # Check whether the campaign exists, and whether the user owns it.
+        campaign = _get_model_object_or_404(models.Campaign, campaign_id)
+        if not _user_owns_campaign(request.user, campaign):
+            return http.HttpResponseForbidden(
+                'Error: you do not own this campaign.'
+            )
+
+        # Generate a reply.
+        return render(
+            request,
+            'gurps_manager/campaign_templates/campaign-id-skill-matrix.html',
+            {
+                'campaign': campaign,
+                'skill_matrix': matrix.campaign_skill_matrix(campaign),
+                'spell_matrix': matrix.campaign_spell_matrix(campaign),
+            }
+        )
+
+class Profile(View):
+    """Handle a request for ``admin/profiles/``."""
+    def get(self, request):
+        """Return a list of the profiles written by ``ProfileMiddleware``."""
+        if not request.user.is_superuser:
+            return http.HttpResponseForbidden(
+                'Error: only superusers may view profiles.'
+            )
+        return render(
+            request,
+            'gurps_manager/profile.html',
+            {'profiles': profiling.profile_files(), 'title': 'Profiles'}
+        )
+
+class ProfileName(View):
+    """Handle a request for ``admin/profiles/<name>``."""
+    def get(self, request, name):
+        """Return profile file ``name``."""
+        if not request.user.is_superuser:
+            return http.HttpResponseForbidden(
+                'Error: only superusers may view profiles.'
+            )
+        path = profiling.profile_file_path(name)
+        if path is None:
+            raise http.Http404
+        with open(path, 'rb') as handle:
+            content = handle.read()
+        if name.endswith('.txt'):
+            return http.HttpResponse(
+                content,
+                content_type='text/plain; charset=utf-8'
+            )
+        response = http.HttpResponse(
+            content,
+            content_type='application/octet-stream'
+        )
+        response['Content-Disposition'] = 'attachment; filename={}'.format(
+            name
+        )
+        return response
+
 def _decode_request(request):
     """Determine what HTTP method ``request.method`` represents.
 
@@ -929,6 +1031,55 @@ def _decode_request(request):
         return request.POST.get('_method', 'POST')
     return request.method
 
+def _choices_response(request, character_id, choices):
+    """Return some of the choices available to character ``character_id``.
+
+    ``choices`` is a function such as ``forms.skill_choices``. Only choices
+    whose names start with the ``q`` query parameter are returned, ignoring
+    case. At most ``MAX_CHOICES`` are returned, ordered by name. The response
+    is a JSON list of objects with an ``id`` and a ``text``.
+
+    """
+    character = _get_model_object_or_404(models.Character, character_id)
+    if not _user_owns_character(request.user, character):
+        return http.HttpResponseForbidden(
+            'Error: you do not own this character.'
+        )
+    queryset = choices(character)
+    key_range = _key_range(request.GET.get('q', ''))
+    if key_range is not None:
+        queryset = queryset.filter(key__gte=key_range[0], key__lt=key_range[1])
+    results = [
+        {'id': id_, 'text': name}
+        for id_, name in queryset.order_by('key', 'id').values_list(
+            'id',
+            'name'
+        )[:MAX_CHOICES]
+    ]
+    return http.HttpResponse(
+        json.dumps(results),
+        content_type='application/json'
+    )
+
+def _key_range(prefix):
+    """Return the range of keys which start with ``prefix``.
+
+    ``prefix`` is normalized as names are. A ``(lower, upper)`` tuple is
+    returned, where ``lower`` is inclusive and ``upper`` is exclusive, or
+    ``None`` if ``prefix`` is blank. Unlike a ``LIKE`` clause, a range can be
+    found with an index by every database.
+
+    >>> _key_range(' Ru')
+    ('ru', 'rv')
+    >>> _key_range('') is None
+    True
+
+    """
+    lower = models.Skill.normalize_name(prefix.strip())
+    if not lower:
+        return None
+    return lower, lower[:-1] + chr(ord(lower[-1]) + 1)
+
 def _get_model_object_or_404(model, object_id):
     """Return an object of type ``model`` with ID ``object_id``.
 
@@ -976,11 +1127,9 @@ def _user_owns_character(user, character):
     True
 
     """
-    if character.owner == user or character.campaign.owner == user:
-        return True
-    elif user.is_superuser:
+    if user.is_superuser or character.owner_id == user.id:
         return True
-    return False
+    return access.get_access_map(user).owns_character(character)
 
 def _user_owns_campaign(user, campaign):
     """Check whether ``user`` owns ``campaign``, directly or indirectly.
@@ -1000,14 +1149,42 @@ def _user_owns_campaign(user, campaign):
     True
 
     """
-    if campaign.owner == user:
+    if campaign.owner_id == user.id:
         return True
     elif user.is_superuser:
         return True
     return False
 
+def _user_can_view_character(user, character):
+    """Check whether ``user`` can view ``character``.
+
+    Return ``True`` if ``character`` would be among the characters returned by
+    ``_viewable_characters(user)``. Else, return ``False``. See
+    ``access.get_access_map``.
+
+    >>> from gurps_manager import factories
+    >>> character = factories.CharacterFactory.create()
+    >>> other_character = factories.CharacterFactory.create(
+    ...     campaign=character.campaign
+    ... )
+    >>> _user_can_view_character(character.campaign.owner, character)
+    True
+    >>> _user_can_view_character(other_character.owner, character)
+    True
+    >>> other_user = factories.UserFactory.create()
+    >>> _user_can_view_character(other_user, character)
+    False
+    >>> other_user.is_superuser = True
+    >>> _user_can_view_character(other_user, character)
+    True
+
+    """
+    if user.is_superuser or character.owner_id == user.id:
+        return True
+    return access.get_access_map(user).can_view_character(character)
+
 def _viewable_characters(user):
-    """Return a list of characters that ``user`` can view.
+    """Return a queryset of characters that ``user`` can view.
 
     ``user`` is a ``User`` model object. That is, ``user`` is a user of the
     application.
@@ -1047,37 +1224,63 @@ def _viewable_characters(user):
     True
 
     """
-    # The user owns these characters directly, or the user is the game master
-    # for these characters.
-    characters = models.Character.objects.filter(
+    if user.is_superuser:
+        return models.Character.objects.all()
+    return models.Character.objects.filter(
+        campaign__in=_participating_campaigns(user).values('id')
+    )
+
+def _participating_campaigns(user):
+    """Return a queryset of campaigns that ``user`` takes part in.
+
+    ``user`` takes part in a campaign if they are its game master or if they own
+    a character in it. The queryset may contain duplicates, so it is best used
+    as a subquery or with ``exists()``.
+
+    """
+    return models.Campaign.objects.filter(
         Q(owner__exact=user) |
-        Q(campaign__owner__exact=user)
+        Q(character__owner__exact=user)
     )
 
-    # find all campaigns that the above characters belong to
-    campaigns = set()
-    for character in characters:
-        campaigns.add(character.campaign)
+def _user_can_view_campaign(user, campaign):
+    """Check whether ``user`` can view ``campaign``.
 
-    # finally, find all "related" characters
-    if user.is_superuser:
-        return models.Character.objects.all()
-    else:
-        return models.Character.objects.filter(campaign__in=campaigns)
+    Return ``True`` if ``campaign`` would be among the campaigns returned by
+    ``_viewable_campaigns(user)``. Else, return ``False``. See
+    ``access.get_access_map``.
+
+    >>> from gurps_manager import factories
+    >>> character = factories.CharacterFactory.create()
+    >>> _user_can_view_campaign(character.campaign.owner, character.campaign)
+    True
+    >>> _user_can_view_campaign(character.owner, character.campaign)
+    True
+    >>> other_user = factories.UserFactory.create()
+    >>> _user_can_view_campaign(other_user, character.campaign)
+    False
+    >>> other_user.is_superuser = True
+    >>> _user_can_view_campaign(other_user, character.campaign)
+    True
+
+    """
+    if user.is_superuser or campaign.owner_id == user.id:
+        return True
+    return access.get_access_map(user).can_view_campaign(campaign)
 
 def _viewable_campaigns(user):
-    """Return a list of campaigns that ``user`` can view.
+    """Return a queryset of campaigns that ``user`` can view.
 
     ``user`` is a ``User`` model object. That is, ``user`` is a user of the
     application.
 
     Only return campaigns that fulfill one of the following conditions:
-    * the user owns that character
-    * the user is the game master for that character's campaign
+    * the user owns a character in that campaign
+    * the user is the game master for that campaign
     * the user is an Admin
 
-    Additionally, include other campaigns in the same campaigns as the
-    campaigns above.
+    The queryset is not evaluated, so it can be sorted and paginated by the
+    database.
 
     >>> from gurps_manager import factories
     >>> user = factories.UserFactory.create()
@@ -1086,6 +1289,13 @@ def _viewable_campaigns(user):
     >>> campaigns = _viewable_campaigns(user)
     >>> campaign in campaigns
     True
+    >>> character = factories.CharacterFactory.create(campaign=campaign)
+    >>> _ = factories.CharacterFactory.create(
+    ...     campaign=campaign,
+    ...     owner=character.owner
+    ... )
+    >>> list(_viewable_campaigns(character.owner)) == [campaign]
+    True
     >>> campaigns = _viewable_campaigns(other_user)
     >>> campaign in campaigns
     False
@@ -1095,17 +1305,6 @@ def _viewable_campaigns(user):
     True
 
     """
-
-    characters = models.Character.objects.filter(owner=user)
-    participating_campaigns = set()
-    for character in characters:
-        participating_campaigns.add(character.campaign)
-
-    owned_campaigns = set()
-    for campaign in models.Campaign.objects.filter(owner__exact=user):
-        owned_campaigns.add(campaign)
-
     if user.is_superuser:
         return models.Campaign.objects.all()
-    else:
-        return participating_campaigns.union(owned_campaigns)
+    return _participating_campaigns(user).distinct()
@@ -41,9 +41,44 @@ DATABASES = {
         'PASSWORD': '',
         'HOST': '',
         'PORT': '',
+        # Keep each connection open for this many seconds, rather than opening
+        # a new one for every request. New SQLite connections are tuned by
+        # ``gurps_manager.sqlite``.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+CACHES = {
+    # See: https://docs.djangoproject.com/en/dev/topics/cache/
+    #
+    # The cache MUST be shared by every process serving this application, as
+    # it holds each user's rights and sessions. When one process takes a right
+    # away or logs a user out, the others must see it. Files on a local disk
+    # are shared by every process on one machine. If several machines serve
+    # this application, use a backend they all reach, such as memcached. Do
+    # not use the local-memory cache, which is private to each process, unless
+    # a single process serves every request.
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.abspath(os.path.join(
+            os.path.dirname(__file__),
+            '..',
+            '..',
+            'cache',
+        )),
+    }
+}
+
+# See: https://docs.djangoproject.com/en/dev/topics/http/sessions/
+#
+# Sessions are read through the cache and written to the database, and only
+# when their data changes. See the ``gurps_manager.sessions`` module. Sessions
+# hold little more than the ID of the logged-in user, so they could instead be
+# kept in signed cookies, which never touch the database, by setting this to
+# ``django.contrib.sessions.backends.signed_cookies``. Doing so requires that
+# ``SECRET_KEY`` be kept secret.
+SESSION_ENGINE = 'gurps_manager.sessions'
+
 # Local time zone for this installation. Choices can be found here:
 # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
 # although not all choices may be available on all operating systems.
@@ -102,10 +137,14 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE_CLASSES = (
+    # Listed first, so the queries made by the other middleware are counted.
+    'gurps_manager.middleware.QueryCountMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Listed last, so only the view is profiled.
+    'gurps_manager.middleware.ProfileMiddleware',
 )
 
 
@@ -128,7 +167,10 @@ LOGGING = {
             'level': 'ERROR',
             'filters': ['require_debug_false'],
             'class': 'django.utils.log.AdminEmailHandler'
-        }
+        },
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
     },
     'loggers': {
         'django.request': {
@@ -136,5 +178,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        # Warn about requests which go over their query budget. Set the level
+        # to INFO to log the query count and time of every request.
+        'gurps_manager.middleware': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
     }
 }
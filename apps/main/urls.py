@@ -4,13 +4,15 @@ This table summarizes what URLs are available for use and what types of HTTP
 requests can be accepted by each. Details about each URL, including arguments,
 are given after the table.
 
-================== ======== ====== ======== ========
-URL                POST     GET    PUT      DELETE
-                   (create) (read) (update) (delete)
-================== ======== ====== ======== ========
-``/``                       *
-``gurps-manager/``          *
-================== ======== ====== ======== ========
+============================ ======== ====== ======== ========
+URL                          POST     GET    PUT      DELETE
+                             (create) (read) (update) (delete)
+============================ ======== ====== ======== ========
+``/``                                 *
+``gurps-manager/``                    *
+``admin/profiles/``                   *
+``admin/profiles/<name>``             *
+============================ ======== ====== ======== ========
 
 ``/``
     ``GET`` requests return a redirect to ``GET gurps-manager/``.
@@ -19,14 +21,30 @@ URL                POST     GET    PUT      DELETE
     ``GET`` requests are forwarded to the ``gurps_manager`` django app. See
     module ``gurps_manager.urls`` for details on what URLs it handles.
 
+``admin/profiles/``
+    ``GET`` requests return a list of the profiles written by
+    ``gurps_manager.middleware.ProfileMiddleware``. Only superusers may view
+    this list, or download a profile from ``admin/profiles/<name>``.
+
 """
 from django.conf.urls import patterns, include, url
 from django.contrib import admin
+from gurps_manager import views
 admin.autodiscover()
 
 urlpatterns = patterns( # pylint: disable=C0103
     '',
     url(r'^$', 'main.views.index'),
     url(r'^gurps-manager/', include('gurps_manager.urls')),
+    url(
+        r'^admin/profiles/$',
+        admin.site.admin_view(views.Profile.as_view()),
+        name='gurps-manager-profile'
+    ),
+    url(
+        r'^admin/profiles/([\w-]+\.(?:prof|txt))$',
+        admin.site.admin_view(views.ProfileName.as_view()),
+        name='gurps-manager-profile-name'
+    ),
     url(r'^admin/', include(admin.site.urls)),
 )
@@ -0,0 +1,32 @@
+-- Add the columns introduced since the first release to an existing database.
+--
+-- ``syncdb`` only creates missing tables, so a database created by an earlier
+-- release lacks these columns. Apply this file once, then add the new indexes
+-- and fill in the cached stats. See "Upgrading a Database" in README.rst.
+--
+-- The statements work with both SQLite and MySQL. Backticks quote ``key``,
+-- which is a reserved word in MySQL.
+
+-- Character stats cached by ``Character.rebuild_cached_stats``. They are NULL
+-- until ``manage.py rebuild_character_stats`` is run.
+ALTER TABLE gurps_manager_character ADD COLUMN cached_skill_points real;
+ALTER TABLE gurps_manager_character ADD COLUMN cached_spell_points real;
+ALTER TABLE gurps_manager_character ADD COLUMN cached_advantage_points integer;
+ALTER TABLE gurps_manager_character
+    ADD COLUMN cached_disadvantage_points integer;
+ALTER TABLE gurps_manager_character ADD COLUMN cached_possession_weight real;
+ALTER TABLE gurps_manager_character ADD COLUMN cached_possession_value real;
+ALTER TABLE gurps_manager_character ADD COLUMN cached_remaining_points real;
+
+-- Normalized names, as returned by ``Skill.normalize_name``. SQLite's LOWER
+-- only folds ASCII letters. Save any skill, spell or item whose name has other
+-- letters again to correct its key.
+ALTER TABLE gurps_manager_skill
+    ADD COLUMN `key` varchar(50) NOT NULL DEFAULT '';
+ALTER TABLE gurps_manager_spell
+    ADD COLUMN `key` varchar(50) NOT NULL DEFAULT '';
+ALTER TABLE gurps_manager_item
+    ADD COLUMN `key` varchar(50) NOT NULL DEFAULT '';
+UPDATE gurps_manager_skill SET `key` = LOWER(name);
+UPDATE gurps_manager_spell SET `key` = LOWER(name);
+UPDATE gurps_manager_item SET `key` = LOWER(name);